@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized Analytics for PSLR Platform
+Columnar fetch of stored PSLR vectors and batched per-model / per-concept statistics
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from models import db, PSLRAnalysis
+
+DIMENSIONS = ('P', 'S', 'L', 'R')
+
+# Upper triangle (incl. diagonal) of the 4×4 covariance, filled by one bincount each
+_COV_PAIRS = [(i, j) for i in range(4) for j in range(i, 4)]
+
+
+class VectorColumns:
+    """Column arrays for a set of analyses: vectors (n, 4) plus int-encoded labels"""
+
+    def __init__(self, vectors: np.ndarray, model_ids: np.ndarray, models: np.ndarray,
+                 concept_ids: np.ndarray, concepts: np.ndarray):
+        self.vectors = vectors
+        self.model_ids = model_ids
+        self.models = models
+        self.concept_ids = concept_ids
+        self.concepts = concepts
+
+    def __len__(self):
+        return len(self.vectors)
+
+
+def fetch_vectors(language: Optional[str] = None, models: Optional[List[str]] = None,
+                  since: Optional[datetime] = None, until: Optional[datetime] = None,
+                  chunk_size: int = 50000) -> VectorColumns:
+    """
+    Load (model, concept, P, S, L, R) columns into NumPy arrays.
+
+    Rows are streamed from a server-side cursor in ``chunk_size`` partitions
+    and transposed per partition, so no ORM objects are built and the text
+    columns are never read.
+    """
+    stmt = select(PSLRAnalysis.model, PSLRAnalysis.concept, PSLRAnalysis.p_value,
+                  PSLRAnalysis.s_value, PSLRAnalysis.l_value, PSLRAnalysis.r_value)
+    if language:
+        stmt = stmt.where(PSLRAnalysis.language == language)
+    if models:
+        stmt = stmt.where(PSLRAnalysis.model.in_(models))
+    if since:
+        stmt = stmt.where(PSLRAnalysis.created_at >= since)
+    if until:
+        stmt = stmt.where(PSLRAnalysis.created_at < until)
+
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    model_parts, concept_parts, vector_parts = [], [], []
+    for partition in result.partitions():
+        model_col, concept_col, *values = zip(*partition)
+        model_parts.append(np.array(model_col, dtype=object))
+        concept_parts.append(np.array(concept_col, dtype=object))
+        vector_parts.append(np.array(values, dtype=np.float64).T)
+
+    if not vector_parts:
+        empty = np.empty(0, dtype=np.int64)
+        return VectorColumns(np.empty((0, 4)), empty, np.empty(0, dtype=object),
+                             empty, np.empty(0, dtype=object))
+
+    models_arr, model_ids = np.unique(np.concatenate(model_parts), return_inverse=True)
+    concepts_arr, concept_ids = np.unique(np.concatenate(concept_parts), return_inverse=True)
+    return VectorColumns(np.concatenate(vector_parts), model_ids, models_arr, concept_ids, concepts_arr)
+
+
+def group_moments(vectors: np.ndarray, group_ids: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """Per-group counts, means, covariance (G, 4, 4) and compositional centroid"""
+    counts = np.bincount(group_ids, minlength=n_groups).astype(np.float64)
+    safe = np.maximum(counts, 1)[:, None]
+
+    means = np.stack([np.bincount(group_ids, weights=vectors[:, k], minlength=n_groups)
+                      for k in range(4)], axis=1) / safe
+
+    centered = vectors - means[group_ids]
+    cov = np.empty((n_groups, 4, 4))
+    for i, j in _COV_PAIRS:
+        cov[:, i, j] = cov[:, j, i] = np.bincount(
+            group_ids, weights=centered[:, i] * centered[:, j], minlength=n_groups
+        ) / safe[:, 0]
+
+    # Simplex-aware centroid: closed geometric mean (Aitchison), rescaled to P+S+L+R = 2
+    logs = np.log(np.clip(vectors / 2.0, 1e-6, None))
+    log_means = np.stack([np.bincount(group_ids, weights=logs[:, k], minlength=n_groups)
+                          for k in range(4)], axis=1) / safe
+    geometric = np.exp(log_means)
+    centroid = 2.0 * geometric / geometric.sum(axis=1, keepdims=True)
+
+    return {'counts': counts, 'means': means, 'covariance': cov, 'centroid': centroid}
+
+
+def concept_spread(columns: VectorColumns) -> Dict[str, np.ndarray]:
+    """
+    Cross-model spread per concept.
+
+    Analyses are first averaged per (concept, model); the spread of a
+    concept is the population standard deviation of those model means per
+    dimension. Concepts seen by fewer than two models have zero spread.
+    """
+    n_models = len(columns.models)
+    pair_keys = columns.concept_ids * n_models + columns.model_ids
+    pairs, pair_ids = np.unique(pair_keys, return_inverse=True)
+    pair_means = group_moments(columns.vectors, pair_ids, len(pairs))['means']
+
+    pair_concepts = pairs // n_models
+    n_concepts = len(columns.concepts)
+    model_counts = np.bincount(pair_concepts, minlength=n_concepts).astype(np.float64)
+    safe = np.maximum(model_counts, 1)[:, None]
+
+    sums = np.stack([np.bincount(pair_concepts, weights=pair_means[:, k], minlength=n_concepts)
+                     for k in range(4)], axis=1)
+    sq_sums = np.stack([np.bincount(pair_concepts, weights=pair_means[:, k] ** 2, minlength=n_concepts)
+                        for k in range(4)], axis=1)
+    variance = np.clip(sq_sums / safe - (sums / safe) ** 2, 0, None)
+    spread = np.sqrt(variance)
+
+    return {'model_counts': model_counts, 'spread': spread, 'total': spread.sum(axis=1)}
+
+
+def _vector_dict(values) -> Dict[str, float]:
+    return {dim: round(float(v), 4) for dim, v in zip(DIMENSIONS, values)}
+
+
+def summarize(columns: VectorColumns, top: int = 20) -> Dict[str, Any]:
+    """Per-model statistics and the concepts the models disagree on most"""
+    if len(columns) == 0:
+        return {'total_analyses': 0, 'models': {}, 'concepts': {'total': 0, 'top_spread': []}}
+
+    moments = group_moments(columns.vectors, columns.model_ids, len(columns.models))
+    models = {}
+    for g, name in enumerate(columns.models):
+        models[name] = {
+            'count': int(moments['counts'][g]),
+            'mean': _vector_dict(moments['means'][g]),
+            'variance': _vector_dict(np.diagonal(moments['covariance'][g])),
+            'covariance': np.round(moments['covariance'][g], 6).tolist(),
+            'centroid': _vector_dict(moments['centroid'][g])
+        }
+
+    spread = concept_spread(columns)
+    candidates = np.flatnonzero(spread['model_counts'] >= 2)
+    order = candidates[np.argsort(-spread['total'][candidates], kind='stable')][:top]
+    top_spread = [{
+        'concept': columns.concepts[c],
+        'models': int(spread['model_counts'][c]),
+        'spread': _vector_dict(spread['spread'][c]),
+        'total': round(float(spread['total'][c]), 4)
+    } for c in order]
+
+    return {
+        'total_analyses': len(columns),
+        'dimensions': list(DIMENSIONS),
+        'models': models,
+        'concepts': {
+            'total': len(columns.concepts),
+            'multi_model': int(len(candidates)),
+            'top_spread': top_spread
+        }
+    }
+
+
+class PairMeans:
+    """
+    Running per-(model, concept) sums and counts of stored vectors.
+
+    ``refresh()`` folds in only new analyses (a primary-key range scan), at
+    most once per ``min_interval`` seconds, and tells subscribers which
+    (model, concept) cells changed. Label indexes are append-only, so they
+    are stable for subscribers.
+
+    IDs are not committed in order under concurrent writers (PostgreSQL
+    hands out a lower id to a transaction that may commit after a higher
+    one was read), so each refresh re-reads the last ``lookback`` ids and
+    folds in the ones it has not seen. A row committed later than that is
+    only picked up by a rebuild (a fresh PairMeans, e.g. a worker restart);
+    raise ``lookback`` (REFRESH_LOOKBACK_IDS) if writers hold many ids open.
+    """
+
+    def __init__(self, min_interval: float = 2.0, chunk_size: int = 50000, lookback: int = 5000):
+        self.min_interval = min_interval
+        self.chunk_size = chunk_size
+        self.lookback = lookback
+        self.models: List[str] = []
+        self.concepts: List[str] = []
+        self._model_index: Dict[str, int] = {}
+        self._concept_index: Dict[str, int] = {}
+        self.sums = np.zeros((0, 0, 4))
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.last_id = 0
+        self._recent: set = set()  # folded ids within ``lookback`` of last_id
+        self._checked_at = float('-inf')
+        self._subscribers: List[Callable[[np.ndarray, np.ndarray], None]] = []
+        self.lock = threading.RLock()
+
+    def subscribe(self, callback: Callable[[np.ndarray, np.ndarray], None]):
+        """``callback(model_idx, concept_idx)`` runs under ``lock`` after each change"""
+        self._subscribers.append(callback)
+
+    def model_id(self, model: str) -> Optional[int]:
+        return self._model_index.get(model)
+
+    def concept_id(self, concept: str) -> Optional[int]:
+        return self._concept_index.get(concept)
+
+    def means(self, model_idx=slice(None), concept_idx=slice(None)) -> np.ndarray:
+        counts = self.counts[model_idx, concept_idx]
+        return self.sums[model_idx, concept_idx] / np.maximum(counts, 1)[..., None]
+
+    def refresh(self, force: bool = False) -> int:
+        """Catch up with new analyses; returns the number of rows folded in"""
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.min_interval:
+                return 0
+            self._checked_at = now
+
+            stmt = select(PSLRAnalysis.id, PSLRAnalysis.model, PSLRAnalysis.concept, PSLRAnalysis.p_value,
+                          PSLRAnalysis.s_value, PSLRAnalysis.l_value, PSLRAnalysis.r_value) \
+                .where(PSLRAnalysis.id > max(self.last_id - self.lookback, 0)).order_by(PSLRAnalysis.id)
+            result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=self.chunk_size))
+
+            added = 0
+            changed = set()
+            for partition in result.partitions():
+                partition = [row for row in partition if row[0] not in self._recent]
+                if not partition:
+                    continue
+                ids, models, concepts, *values = zip(*partition)
+                model_idx = np.array([self._label(self._model_index, self.models, m) for m in models])
+                concept_idx = np.array([self._label(self._concept_index, self.concepts, c) for c in concepts])
+                self._grow()
+                np.add.at(self.sums, (model_idx, concept_idx), np.array(values, dtype=np.float64).T)
+                np.add.at(self.counts, (model_idx, concept_idx), 1)
+                changed.update(zip(model_idx.tolist(), concept_idx.tolist()))
+                self.last_id = max(self.last_id, ids[-1])
+                self._recent.update(ids)
+                added += len(ids)
+            db.session.commit()
+            horizon = self.last_id - self.lookback
+            self._recent = {i for i in self._recent if i > horizon}
+
+            if changed:
+                cells = np.array(sorted(changed))
+                for callback in self._subscribers:
+                    callback(cells[:, 0], cells[:, 1])
+            return added
+
+    @staticmethod
+    def _label(index: Dict[str, int], labels: List[str], label: str) -> int:
+        i = index.get(label)
+        if i is None:
+            i = index[label] = len(labels)
+            labels.append(label)
+        return i
+
+    def _grow(self):
+        # Capacity doubles, so amortised growth is O(1) per new label
+        shape = self.counts.shape
+        need = (len(self.models), len(self.concepts))
+        if need[0] <= shape[0] and need[1] <= shape[1]:
+            return
+        capacity = (max(need[0], shape[0] * 2 if need[0] > shape[0] else shape[0], 4),
+                    max(need[1], shape[1] * 2 if need[1] > shape[1] else shape[1], 64))
+        sums = np.zeros(capacity + (4,))
+        counts = np.zeros(capacity, dtype=np.int64)
+        sums[:shape[0], :shape[1]] = self.sums
+        counts[:shape[0], :shape[1]] = self.counts
+        self.sums, self.counts = sums, counts
+
+    def shape(self) -> Tuple[int, int]:
+        return len(self.models), len(self.concepts)
@@ -15,36 +15,157 @@ Author: PSLR Research Team
 License: MIT
 """
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, render_template_string, request, jsonify, Response, stream_with_context, url_for
 from flask_cors import CORS
 from flask_migrate import Migrate
+import click
 import os
 import json
+import math
 import time
+import atexit
+import asyncio
 from datetime import datetime
 from typing import Dict, List, Any
 import re
 
 # Import our modules
 from config import get_config
-from models import db, PSLRAnalysis, BatchExperiment
-from llm_clients import PSLRAnalyzer
+from models import db, PSLRAnalysis, BatchExperiment, BatchItem, AnalysisJob
+from llm_clients import PSLRAnalyzer, client_registry, configure_base_urls
+from cache import AnalysisCache, LRUCache
+from batch import BatchRunner, MODES as BATCH_MODES
+from ingest import BulkWriter, row_from_record
+from packing import PackingTuner
+from ratelimit import ProviderGovernor
+from resilience import ProviderGuard
+from singleflight import SingleFlight
+import analytics
+import blobs
+import divergence
+import export
+import history
+import metrics
+import search
+import similar
+import snapshot
+import stats
+from jobs import JobQueue, sse_event
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object(get_config())
 
 # Initialize extensions
-CORS(app, origins=app.config['CORS_ORIGINS'])
+CORS(app, origins=app.config['CORS_ORIGINS'], expose_headers=['X-Next-Cursor', 'Link'])
 db.init_app(app)
 migrate = Migrate(app, db)
 
-# Create tables on startup
+# Create tables on startup (and seed the stats counters on a new database)
 with app.app_context():
     db.create_all()
+    stats.get_stats()
+    search.ensure_search_index()
 
-# Initialize PSLR Analyzer
-analyzer = PSLRAnalyzer()
+# Periodic reconciliation of the incremental /api/stats counters
+if app.config['STATS_RECONCILE_INTERVAL'] > 0:
+    stats.StatsReconciler(app, app.config['STATS_RECONCILE_INTERVAL']).start()
+stats_cache = LRUCache(max_size=1, ttl=app.config['STATS_CACHE_TTL'])
+
+# Prometheus stage / request histograms (GET /metrics)
+metrics.configure(app.config['METRICS_ENABLED'])
+
+
+@app.before_request
+def start_request_timer():
+    request.environ['pslr.started'] = time.perf_counter()
+
+
+@app.after_request
+def record_request_latency(response):
+    started = request.environ.get('pslr.started')
+    if started is not None:
+        # Route templates (not raw paths) keep the endpoint label bounded
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe_request(endpoint, request.method, response.status_code,
+                                time.perf_counter() - started)
+    return response
+
+
+# Provider SDK clients are pooled per worker
+client_registry.configure(
+    pool_size=app.config['LLM_POOL_SIZE'],
+    timeout=app.config['LLM_TIMEOUT'],
+    connect_timeout=app.config['LLM_CONNECT_TIMEOUT'],
+    idle_ttl=app.config['LLM_CLIENT_IDLE_TTL'],
+    max_clients=app.config['LLM_MAX_CLIENTS']
+)
+configure_base_urls(json.loads(app.config['PROVIDER_BASE_URLS'] or '{}'))
+
+# Initialize PSLR Analyzer (with result cache)
+analysis_cache = None
+if app.config['CACHE_ENABLED']:
+    analysis_cache = AnalysisCache(
+        max_size=app.config['CACHE_MAX_SIZE'],
+        ttl=app.config['CACHE_TTL'],
+        redis_url=app.config['REDIS_URL'],
+        version=PSLRAnalyzer.PROMPT_VERSION
+    )
+analysis_singleflight = None
+if app.config['SINGLEFLIGHT_ENABLED']:
+    analysis_singleflight = SingleFlight(
+        redis_url=app.config['REDIS_URL'],
+        lock_ttl=app.config['SINGLEFLIGHT_LOCK_TTL']
+    )
+provider_governor = None
+if app.config['RATELIMIT_ENABLED']:
+    provider_governor = ProviderGovernor.from_config(app.config)
+analyzer = PSLRAnalyzer(
+    cache=analysis_cache,
+    max_workers=app.config['ANALYZER_MAX_WORKERS'],
+    singleflight=analysis_singleflight,
+    governor=provider_governor,
+    guard=ProviderGuard.from_config(app.config),
+    packing=PackingTuner(
+        initial=app.config['PACKING_INITIAL_SIZE'],
+        max_size=app.config['PACKING_MAX_SIZE'],
+        max_output_tokens=app.config['PACKING_MAX_OUTPUT_TOKENS'],
+        failure_threshold=app.config['PACKING_FAILURE_THRESHOLD']
+    )
+)
+
+# Compression for reasoning / raw_response blobs
+blobs.configure(app.config['BLOB_CODEC'], app.config['BLOB_COMPRESSION_LEVEL'])
+
+# Buffered analysis inserts (flushed on size / interval)
+ingest_writer = BulkWriter(
+    app,
+    batch_size=app.config['INGEST_BATCH_SIZE'],
+    flush_interval=app.config['INGEST_FLUSH_INTERVAL'],
+    durability=app.config['INGEST_DURABILITY'],
+    use_copy=app.config['INGEST_USE_COPY']
+)
+atexit.register(ingest_writer.close)
+
+# Background runner for batch experiments
+batch_runner = BatchRunner(
+    app,
+    analyzer,
+    ingest_writer,
+    max_workers=app.config['BATCH_MAX_WORKERS'],
+    batch_transport=app.config['PROVIDER_BATCH_TRANSPORT'],
+    batch_dir=app.config['PROVIDER_BATCH_DIR'],
+    poll_interval=app.config['PROVIDER_BATCH_POLL_INTERVAL']
+)
+
+# Background queue for async (202) analyses
+job_queue = JobQueue(app, analyzer, ingest_writer, max_workers=app.config['JOB_MAX_WORKERS'])
+
+# Per-(concept, model) means and the nearest-neighbour index over them
+pair_means = analytics.PairMeans(min_interval=app.config['SIMILAR_REFRESH_INTERVAL'],
+                                  lookback=app.config['REFRESH_LOOKBACK_IDS'])
+similar_index = similar.SimilarityIndex(pair_means, cell=app.config['SIMILAR_GRID_CELL'])
+divergence_tracker = divergence.DivergenceTracker(pair_means)
 
 # HTML Template (same as before, with DB integration)
 HTML_TEMPLATE = '''
@@ -406,8 +527,19 @@ HTML_TEMPLATE = '''
                     
                     this.loading = true;
                     
+                    // Placeholder card that fills in as P/S/L/R stream in
+                    this.results.unshift({
+                        id: 'live',
+                        model_name: this.selectedModel,
+                        concept: this.concept,
+                        language: 'en',
+                        timestamp: new Date().toISOString(),
+                        result: { P: 0, S: 0, L: 0, R: 0, reasoning: '' }
+                    });
+                    const live = this.results[0];
+                    
                     try {
-                        const response = await fetch('/api/analyze', {
+                        const response = await fetch('/api/analyze/stream', {
                             method: 'POST',
                             headers: { 'Content-Type': 'application/json' },
                             body: JSON.stringify({
@@ -418,16 +550,51 @@ HTML_TEMPLATE = '''
                             })
                         });
                         
-                        const result = await response.json();
+                        if (!response.ok) {
+                            const error = await response.json();
+                            throw new Error(error.error);
+                        }
+                        
+                        const reader = response.body.getReader();
+                        const decoder = new TextDecoder();
+                        let buffer = '';
+                        let result = null;
                         
-                        if (result.success) {
-                            this.results.unshift(result);
+                        while (true) {
+                            const { value, done } = await reader.read();
+                            if (done) break;
+                            buffer += decoder.decode(value, { stream: true });
+                            
+                            let boundary;
+                            while ((boundary = buffer.indexOf('\\n\\n')) >= 0) {
+                                const message = buffer.slice(0, boundary);
+                                buffer = buffer.slice(boundary + 2);
+                                
+                                const eventLine = message.split('\\n').find(l => l.startsWith('event: '));
+                                const dataLine = message.split('\\n').find(l => l.startsWith('data: '));
+                                if (!eventLine || !dataLine) continue;
+                                const event = eventLine.slice(7);
+                                const data = JSON.parse(dataLine.slice(6));
+                                
+                                if (event === 'field') {
+                                    live.result[data.key] = data.value;
+                                    updateSphere(live.result);
+                                } else if (event === 'result') {
+                                    result = data;
+                                }
+                            }
+                        }
+                        
+                        if (result && result.success) {
+                            this.results[0] = result;
                             updateSphere(result.result);
                             this.loadStats();
                         } else {
-                            alert('분석 실패: ' + result.error);
+                            this.results.shift();
+                            alert('분석 실패: ' + (result ? result.error : 'No response'));
                         }
                     } catch (error) {
+                        if (this.results[0] === live) this.results.shift();
                         alert('오류: ' + error.message);
                     } finally {
                         this.loading = false;
@@ -436,7 +603,7 @@ HTML_TEMPLATE = '''
                 
                 async loadHistory() {
                     try {
-                        let url = '/api/history?limit=20';
+                        let url = '/api/history?limit=20&fields=id,concept,language,model,model_name,timestamp,result,reasoning';
                         if (this.historyFilter) url += `&model=${this.historyFilter}`;
                         if (this.conceptFilter) url += `&concept=${this.conceptFilter}`;
 
@@ -467,72 +634,396 @@ def analyze_concept():
     model = data.get('model', 'gpt-4o')
     language = data.get('language', 'en')
     api_key = data.get('api_key', '')
+    use_cache = not data.get('no_cache', False)
     
     if not concept or not api_key:
         return jsonify({"success": False, "error": "Missing required fields"}), 400
     
+    if model not in PSLRAnalyzer.MODEL_CLIENTS:
+        return jsonify({"success": False, "error": f"Unknown model: {model}"}), 400
+    
+    # Async mode: queue the analysis and return a job handle immediately
+    if data.get('async') or request.args.get('async', type=int):
+        job = job_queue.submit(concept, language, model, api_key, use_cache=use_cache)
+        response = jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": url_for('get_job', job_id=job.id),
+            "events_url": url_for('stream_job', job_id=job.id)
+        })
+        response.headers['Location'] = url_for('get_job', job_id=job.id)
+        return response, 202
+    
     # Perform analysis
-    result = analyzer.analyze(concept, language, model, api_key)
-    
-    if result['success']:
-        # Save to database
-        analysis = PSLRAnalysis(
-            concept=concept,
-            language=language,
-            model=model,
-            model_name=result['model_name'],
-            p_value=result['result']['P'],
-            s_value=result['result']['S'],
-            l_value=result['result']['L'],
-            r_value=result['result']['R'],
-            reasoning=result['result']['reasoning'],
-            raw_response=result.get('raw_response', ''),
-            response_time=result.get('response_time', 0)
-        )
-        
-        db.session.add(analysis)
-        db.session.commit()
-        
-        # Return with database ID
-        result['id'] = analysis.id
+    result = analyzer.analyze(concept, language, model, api_key, use_cache=use_cache)
+    
+    # Cached answers are not new samples, so only fresh results are stored
+    if result['success'] and not result['cached']:
+        save_analysis(result)
     
     return jsonify(result)
 
 
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_concept_stream():
+    """Analyze a concept, relaying tokens and parsed P/S/L/R fields over SSE"""
+    data = request.json
+    concept = data.get('concept', '').strip()
+    model = data.get('model', 'gpt-4o')
+    language = data.get('language', 'en')
+    api_key = data.get('api_key', '')
+    use_cache = not data.get('no_cache', False)
+    
+    if not concept or not api_key:
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+    
+    if model not in PSLRAnalyzer.MODEL_CLIENTS:
+        return jsonify({"success": False, "error": f"Unknown model: {model}"}), 400
+    
+    def generate():
+        for event, payload in analyzer.analyze_stream(concept, language, model, api_key,
+                                                      use_cache=use_cache):
+            if event == 'result' and payload['success'] and not payload['cached']:
+                save_analysis(payload)
+            yield sse_event(event, payload)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Poll an async analysis job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Server-sent events for an async analysis job"""
+    if job_queue.get(job_id) is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    
+    # A stream holds its request thread for up to JOB_SSE_TIMEOUT, which on a
+    # single-threaded (sync) worker blocks every other request to that worker
+    if not request.environ.get('wsgi.multithread') and not app.config['JOB_SSE_FORCE']:
+        status_url = url_for('get_job', job_id=job_id)
+        response = jsonify({"success": False, "status_url": status_url,
+                            "error": "Job events need threaded workers (GUNICORN_THREADS > 1); poll status_url"})
+        response.headers['Location'] = status_url
+        return response, 501
+    events = job_queue.events(job_id, timeout=app.config['JOB_SSE_TIMEOUT'])
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/analyze/compare', methods=['POST'])
+def compare_models():
+    """Analyze one concept with several models concurrently and save the results"""
+    data = request.json
+    concept = data.get('concept', '').strip()
+    language = data.get('language', 'en')
+    models = data.get('models') or list(PSLRAnalyzer.MODEL_CLIENTS)
+    api_keys = data.get('api_keys', {})
+    timeout = data.get('timeout', app.config['COMPARE_TIMEOUT'])
+    use_cache = not data.get('no_cache', False)
+    
+    if not concept:
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+    
+    try:
+        if isinstance(timeout, bool):
+            raise ValueError
+        timeout = float(timeout)
+        if not timeout > 0 or math.isinf(timeout):
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "timeout must be a positive number of seconds"}), 400
+    timeout = min(timeout, app.config['COMPARE_MAX_TIMEOUT'])
+    
+    unknown = [m for m in models if m not in PSLRAnalyzer.MODEL_CLIENTS]
+    if unknown:
+        return jsonify({"success": False, "error": f"Unknown models: {', '.join(unknown)}"}), 400
+    
+    missing = [m for m in models if not api_keys.get(m)]
+    if missing:
+        return jsonify({"success": False, "error": f"Missing API keys for: {', '.join(missing)}"}), 400
+    
+    start_time = time.time()
+    results = asyncio.run(analyzer.analyze_many(concept, language, models, api_keys,
+                                                timeout=timeout, use_cache=use_cache))
+    elapsed = int((time.time() - start_time) * 1000)
+    
+    for result in results.values():
+        if result['success'] and not result['cached']:
+            save_analysis(result)
+    
+    return jsonify({
+        "success": any(r['success'] for r in results.values()),
+        "concept": concept,
+        "language": language,
+        "results": [results[m] for m in models],
+        "elapsed_time": elapsed
+    })
+
+
+def save_analysis(result: Dict[str, Any]):
+    """Store a successful analyzer result and attach its database ID"""
+    with metrics.stage(result['model'], 'db_write'):
+        ticket = ingest_writer.submit([PSLRAnalysis.row_values(result)])
+    
+    # Return with database ID (not yet known in async durability mode)
+    if ticket.done:
+        result['id'] = ticket.wait()[0]
+
+
+@app.route('/api/batch', methods=['POST'])
+def create_batch():
+    """Create a concept × model batch experiment and start running it"""
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Request body must be a JSON object"}), 400
+    concepts = data.get('concepts', [])
+    models = data.get('models') or list(PSLRAnalyzer.MODEL_CLIENTS)
+    language = data.get('language', 'en')
+    api_keys = data.get('api_keys', {})
+    use_cache = data.get('use_cache', False)
+    mode = data.get('mode', 'realtime')
+    
+    if not concepts or not api_keys:
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+    
+    if not isinstance(concepts, list) or not all(isinstance(c, str) for c in concepts):
+        return jsonify({"success": False, "error": "concepts must be a list of strings"}), 400
+    if not isinstance(models, list) or not all(isinstance(m, str) for m in models):
+        return jsonify({"success": False, "error": "models must be a list of strings"}), 400
+    if not isinstance(api_keys, dict) or not all(isinstance(k, str) for k in api_keys.values()):
+        return jsonify({"success": False, "error": "api_keys must map model names to strings"}), 400
+    
+    if mode not in BATCH_MODES:
+        return jsonify({"success": False, "error": f"mode must be one of {', '.join(BATCH_MODES)}"}), 400
+    
+    unknown = [m for m in models if m not in PSLRAnalyzer.MODEL_CLIENTS]
+    if unknown:
+        return jsonify({"success": False, "error": f"Unknown models: {', '.join(unknown)}"}), 400
+    
+    experiment = batch_runner.create(
+        name=data.get('name') or f"Batch {datetime.utcnow().isoformat(timespec='seconds')}",
+        description=data.get('description'),
+        concepts=concepts,
+        models=models,
+        language=language,
+        mode=mode
+    )
+    batch_runner.start(experiment.id, api_keys, use_cache=use_cache)
+    
+    return jsonify({"success": True, "experiment": experiment.to_dict()}), 202
+
+
+@app.route('/api/batch', methods=['GET'])
+def list_batches():
+    """List recent batch experiments"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    experiments = BatchExperiment.query.order_by(BatchExperiment.id.desc()).limit(limit).all()
+    return jsonify([e.to_dict() for e in experiments])
+
+
+@app.route('/api/batch/<int:experiment_id>', methods=['GET'])
+def get_batch(experiment_id):
+    """Get batch experiment status, optionally with its failed items"""
+    experiment = db.get_or_404(BatchExperiment, experiment_id)
+    response = experiment.to_dict()
+    response['running'] = batch_runner.is_running(experiment_id)
+    
+    if request.args.get('failures', type=int):
+        failed = BatchItem.query.filter_by(experiment_id=experiment_id, status='failed').limit(100).all()
+        response['failures'] = [item.to_dict() for item in failed]
+    
+    return jsonify(response)
+
+
+@app.route('/api/batch/<int:experiment_id>/resume', methods=['POST'])
+def resume_batch(experiment_id):
+    """Resume an interrupted or partially failed experiment from its checkpoint"""
+    data = request.json or {}
+    api_keys = data.get('api_keys', {})
+    experiment = db.get_or_404(BatchExperiment, experiment_id)
+    
+    if not api_keys:
+        return jsonify({"success": False, "error": "Missing required fields"}), 400
+    
+    # A 'running' experiment may still be owned by another worker; require force
+    if experiment.status == 'running' and not data.get('force', False):
+        return jsonify({"success": False, "error": "Experiment is running (pass force to take over)"}), 409
+    
+    if not batch_runner.start(experiment_id, api_keys, use_cache=data.get('use_cache', False)):
+        return jsonify({"success": False, "error": "Experiment is already running"}), 409
+    
+    return jsonify({"success": True, "experiment": experiment.to_dict()}), 202
+
+
 @app.route('/api/history', methods=['GET'])
 def get_history():
-    """Get analysis history from database"""
-    limit = request.args.get('limit', 20, type=int)
+    """Get analysis history from database (keyset-paginated, newest first)"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), app.config['HISTORY_MAX_LIMIT']))
     model = request.args.get('model', None)
     concept = request.args.get('concept', None)
+    cursor = request.args.get('cursor', None)
+    compact = bool(request.args.get('compact', 0, type=int))
     
-    query = PSLRAnalysis.query
+    concept_filter = None
+    if concept:
+        concept_filter = search.concept_filter(concept, mode=request.args.get('concept_mode', 'contains'))
     
-    if model:
-        query = query.filter_by(model=model)
+    try:
+        fields = history.parse_fields(request.args.get('fields'))
+        items, next_cursor = history.query_history(limit, fields=fields, cursor=cursor, model=model,
+                                                   concept_filter=concept_filter, compact=compact)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     
-    if concept:
-        query = query.filter(PSLRAnalysis.concept.ilike(f'%{concept}%'))
+    response = jsonify(items)
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{url_for("get_history", **args)}>; rel="next"'
+    return response
+
+
+@app.route('/api/concepts/search', methods=['GET'])
+def search_concepts():
+    """Indexed concept search / autocomplete, ranked"""
+    term = request.args.get('q', '')
+    mode = request.args.get('mode', 'contains')
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
     
-    analyses = query.order_by(PSLRAnalysis.created_at.desc()).limit(limit).all()
+    if mode not in ('contains', 'prefix'):
+        return jsonify({"success": False, "error": "mode must be 'contains' or 'prefix'"}), 400
     
-    return jsonify([a.to_dict() for a in analyses])
+    return jsonify(search.search_concepts(term, mode=mode, limit=limit))
 
 
-@app.route('/api/stats', methods=['GET'])
-def get_stats():
-    """Get platform statistics"""
-    total_analyses = PSLRAnalysis.query.count()
-    total_concepts = db.session.query(PSLRAnalysis.concept).distinct().count()
-    total_models = db.session.query(PSLRAnalysis.model).distinct().count()
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """Per-model PSLR statistics and per-concept cross-model spread"""
+    models = request.args.get('model')
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        since = datetime.fromisoformat(since) if since else None
+        until = datetime.fromisoformat(until) if until else None
+    except ValueError:
+        return jsonify({"success": False, "error": "since/until must be ISO 8601 dates"}), 400
+    
+    columns = analytics.fetch_vectors(
+        language=request.args.get('language'),
+        models=models.split(',') if models else None,
+        since=since,
+        until=until
+    )
+    top = max(1, min(request.args.get('top', 20, type=int), app.config['ANALYTICS_MAX_TOP']))
+    return jsonify(analytics.summarize(columns, top=top))
+
+
+@app.route('/api/similar', methods=['GET'])
+def similar_concepts():
+    """Concepts with the closest mean PSLR vector (per model, or pooled across models)"""
+    concept = request.args.get('concept', '').strip()
+    if not concept:
+        return jsonify({"success": False, "error": "concept is required"}), 400
+    model = request.args.get('model') or None
+    k = min(max(request.args.get('k', 10, type=int), 1), app.config['SIMILAR_MAX_K'])
+    
+    started = time.perf_counter()
+    pair_means.refresh()
+    result = similar_index.query(concept, model=model, k=k)
+    if result is None:
+        return jsonify({"success": False, "error": "Unknown concept or model"}), 404
+    result['took_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return jsonify(result)
+
+
+@app.route('/api/divergence', methods=['GET'])
+def model_divergence():
+    """Model×model divergence over shared concepts and the most divergent concepts"""
+    metric = request.args.get('metric', 'l1').lower()
+    if metric not in divergence.METRICS:
+        return jsonify({"success": False, "error": f"metric must be one of {', '.join(divergence.METRICS)}"}), 400
+    model_a = request.args.get('model_a') or None
+    model_b = request.args.get('model_b') or None
+    if bool(model_a) != bool(model_b):
+        return jsonify({"success": False, "error": "model_a and model_b must be given together"}), 400
+    top = max(1, min(request.args.get('top', 20, type=int), app.config['DIVERGENCE_MAX_TOP']))
+    min_models = max(2, request.args.get('min_models', 2, type=int))
     
+    started = time.perf_counter()
+    pair_means.refresh()
+    ranking = divergence_tracker.ranking(metric, top=top, model_a=model_a, model_b=model_b,
+                                         min_models=min_models)
+    if ranking is None:
+        return jsonify({"success": False, "error": "Unknown model"}), 404
     return jsonify({
-        'total_analyses': total_analyses,
-        'total_concepts': total_concepts,
-        'total_models': total_models
+        **divergence_tracker.matrix(metric),
+        'ranking': ranking,
+        'took_ms': round((time.perf_counter() - started) * 1000, 3)
     })
 
 
+@app.route('/api/export', methods=['GET'])
+def export_analyses():
+    """Stream the whole (filtered) dataset as NDJSON, CSV or Parquet"""
+    fmt = request.args.get('format', 'ndjson')
+    try:
+        since = request.args.get('since')
+        until = request.args.get('until')
+        since = datetime.fromisoformat(since) if since else None
+        until = datetime.fromisoformat(until) if until else None
+        chunks = export.stream_export(
+            fmt,
+            include_text=request.args.get('text', '').lower() in ('1', 'true'),
+            model=request.args.get('model'),
+            language=request.args.get('language'),
+            since=since,
+            until=until
+        )
+    except export.ExportError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except ValueError:
+        return jsonify({"success": False, "error": "since/until must be ISO 8601 dates"}), 400
+    
+    mimetype, extension = export.FORMATS[fmt]
+    filename = f"pslr-analyses-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"',
+                             'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    """Get platform statistics (incrementally maintained counters)"""
+    platform_stats = stats_cache.get('stats')
+    if platform_stats is None:
+        platform_stats = stats.get_stats()
+        stats_cache.set('stats', platform_stats)
+    
+    return jsonify(platform_stats)
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get result cache hit/miss counters for this worker"""
+    if analysis_cache is None:
+        return jsonify({'enabled': False})
+    cache_stats = dict(analysis_cache.stats(), enabled=True)
+    if analysis_singleflight is not None:
+        cache_stats['coalescing'] = analysis_singleflight.stats()
+    return jsonify(cache_stats)
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -540,11 +1031,26 @@ def health_check():
         # Check database connection
         from sqlalchemy import text
         db.session.execute(text('SELECT 1'))
-        return jsonify({'status': 'healthy', 'database': 'connected'})
+        return jsonify({
+            'status': 'healthy',
+            'database': 'connected',
+            'ingest': ingest_writer.stats(),
+            'ratelimit': provider_governor.stats() if provider_governor is not None else None,
+            'providers': analyzer.guard.stats(),
+            'packing': analyzer.packing.stats()
+        })
     except Exception as e:
         return jsonify({'status': 'unhealthy', 'error': str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus exposition (all gunicorn workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    if not metrics.enabled():
+        return jsonify({'error': 'Metrics are disabled (METRICS_ENABLED / prometheus_client)'}), 404
+    return Response(metrics.exposition(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route('/paper')
 def paper():
     """Link to paper"""
@@ -573,6 +1079,94 @@ def init_db():
     print("✅ Database initialized successfully!")
 
 
+@app.cli.command('ingest-replay')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per insert transaction')
+def ingest_replay(path, batch_size):
+    """Bulk insert analyses from an NDJSON file of analyzer results or history items"""
+    writer = BulkWriter(app, batch_size=batch_size, flush_interval=1.0, durability='async',
+                        use_copy=app.config['INGEST_USE_COPY'])
+    tickets = []
+    chunk = []
+    skipped = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('success') is False or record.get('cached') or 'result' not in record:
+                skipped += 1
+                continue
+            chunk.append(row_from_record(record))
+            if len(chunk) >= batch_size:
+                tickets.append(writer.submit(chunk))
+                chunk = []
+    if chunk:
+        tickets.append(writer.submit(chunk))
+    writer.close()
+    
+    failed = sum(len(t.rows) for t in tickets if t.error is not None)
+    written = sum(len(t.rows) for t in tickets) - failed
+    print(f"✅ Replayed {written} analyses ({skipped} skipped, {failed} failed) in {writer.stats()['flushes']} flushes")
+
+
+@app.cli.command('backfill-blobs')
+@click.option('--chunk-size', default=1000, show_default=True, help='Rows per transaction')
+def backfill_blobs(chunk_size):
+    """Move inline reasoning/raw_response text into the compressed blob table"""
+    with db.engine.connect() as connection:
+        if not blobs.has_inline_columns(connection):
+            print("✅ Nothing to backfill (inline columns already dropped)")
+            return
+        
+        def commit_chunk(moved):
+            connection.commit()
+            print(f"  moved {moved} rows")
+        
+        moved = blobs.backfill(connection, chunk_size=chunk_size, on_chunk=commit_chunk)
+        connection.commit()
+    print(f"✅ Backfilled {moved} analyses; run 'flask db upgrade' to drop the inline columns")
+
+
+@app.cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(list(export.FORMATS)), default='ndjson', show_default=True)
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default='-', help='File path, or - for stdout')
+@click.option('--model', help='Comma-separated model keys')
+@click.option('--language')
+@click.option('--since', type=click.DateTime(), help='created_at >= (ISO date)')
+@click.option('--until', type=click.DateTime(), help='created_at < (ISO date)')
+@click.option('--text', is_flag=True, help='Include reasoning and raw_response')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows fetched per cursor partition')
+def export_command(fmt, output, model, language, since, until, text, chunk_size):
+    """Stream analyses to a file with constant memory"""
+    try:
+        chunks = export.stream_export(fmt, chunk_size=chunk_size, include_text=text,
+                                      model=model, language=language, since=since, until=until)
+    except export.ExportError as e:
+        raise click.ClickException(str(e))
+    
+    with click.open_file(output, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+
+@app.cli.command('snapshot')
+@click.option('--path', default=None, help='Snapshot directory (default: SNAPSHOT_DIR)')
+@click.option('--full', is_flag=True, help='Rebuild instead of appending new rows')
+def snapshot_command(path, full):
+    """Refresh the memory-mapped PSLR vector snapshot"""
+    result = snapshot.refresh(path or app.config['SNAPSHOT_DIR'], full=full,
+                              lookback=app.config['REFRESH_LOOKBACK_IDS'])
+    print(f"✅ Snapshot: +{result['added']} rows ({result['rows']} total, last id {result['last_id']})")
+
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats():
+    """Recompute the /api/stats counters from the analysis table"""
+    stats.reconcile()
+    print(f"✅ Stats reconciled: {stats.get_stats()}")
+
+
 if __name__ == '__main__':
     # Create tables if they don't exist
     with app.app_context():
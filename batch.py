@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch Experiment Runner for PSLR Platform
+Runs concept × model grids on a bounded thread pool with per-item checkpoints
+"""
+
+import os
+import copy
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import update
+
+import provider_batch
+from models import db, PSLRAnalysis, BatchExperiment, BatchItem
+
+MODES = ('realtime', 'provider_batch', 'packed')
+
+
+class BatchRunner:
+    """
+    Executes BatchExperiment work items in a background thread.
+    
+    Every (concept, model) pair is a BatchItem row. A pair is marked
+    ``completed`` in the same transaction that stores its analysis, so a
+    crashed or redeployed run can be resumed and only the pairs that are
+    still pending or failed are sent to the providers again. Checkpoints go
+    through the BulkWriter without waiting, so many pairs share one commit.
+    
+    API keys are only held in memory for the lifetime of a run and must be
+    supplied again on resume.
+    
+    In ``provider_batch`` mode the pairs of models whose provider has a
+    batch API are sent as one JSONL batch per model (cheaper, higher
+    limits, hours of latency); the batch id is saved in the experiment
+    summary so a resumed run polls it instead of submitting again. Other
+    models (and those whose installed SDK predates its batch endpoint) run
+    in real time as usual.
+    
+    In ``packed`` mode the pairs are grouped per (model, language) and
+    several concepts are scored per provider call, as many as the
+    analyzer's packing tuner currently allows; workers pull the next pack
+    when they finish one, so size changes apply immediately.
+    """
+    
+    def __init__(self, app, analyzer, writer, max_workers: int = 4, batch_transport: str = 'provider',
+                 batch_dir: str = 'provider_batches', poll_interval: float = 30.0):
+        self.app = app
+        self.analyzer = analyzer
+        self.writer = writer
+        self.max_workers = max_workers
+        self.batch_transport = batch_transport
+        self.batch_dir = batch_dir
+        self.poll_interval = poll_interval
+        self._threads: Dict[int, threading.Thread] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, name: str, concepts: List[str], models: List[str], language: str = 'en',
+               description: Optional[str] = None, mode: str = 'realtime') -> BatchExperiment:
+        """Create an experiment and its pending work items"""
+        concepts = list(dict.fromkeys(c.strip() for c in concepts if c and c.strip()))
+        models = list(dict.fromkeys(models))
+        
+        experiment = BatchExperiment(
+            name=name,
+            description=description,
+            total_concepts=len(concepts),
+            total_models=len(models),
+            total_analyses=len(concepts) * len(models),
+            status='pending',
+            progress=0,
+            summary={'mode': mode}
+        )
+        db.session.add(experiment)
+        db.session.flush()
+        
+        db.session.add_all([
+            BatchItem(experiment_id=experiment.id, concept=concept, language=language, model=model)
+            for concept in concepts
+            for model in models
+        ])
+        db.session.commit()
+        return experiment
+    
+    def is_running(self, experiment_id: int) -> bool:
+        with self._lock:
+            thread = self._threads.get(experiment_id)
+            return thread is not None and thread.is_alive()
+    
+    def start(self, experiment_id: int, api_keys: Dict[str, str], use_cache: bool = True) -> bool:
+        """Run (or resume) an experiment in the background; False if already running here"""
+        with self._lock:
+            thread = self._threads.get(experiment_id)
+            if thread is not None and thread.is_alive():
+                return False
+            thread = threading.Thread(
+                target=self._run,
+                args=(experiment_id, dict(api_keys), use_cache),
+                name=f'pslr-batch-{experiment_id}',
+                daemon=True
+            )
+            self._threads[experiment_id] = thread
+            thread.start()
+            return True
+    
+    def _run(self, experiment_id: int, api_keys: Dict[str, str], use_cache: bool):
+        with self.app.app_context():
+            experiment = db.session.get(BatchExperiment, experiment_id)
+            try:
+                self._execute(experiment, api_keys, use_cache)
+            except Exception as e:
+                db.session.rollback()
+                experiment = db.session.get(BatchExperiment, experiment_id)
+                experiment.status = 'failed'
+                experiment.summary = dict(experiment.summary or {}, error=str(e))
+                db.session.commit()
+            finally:
+                db.session.remove()
+    
+    def _execute(self, experiment: BatchExperiment, api_keys: Dict[str, str], use_cache: bool):
+        items = BatchItem.query.filter(
+            BatchItem.experiment_id == experiment.id,
+            BatchItem.status != 'completed'
+        ).all()
+        
+        experiment.status = 'running'
+        experiment.completed_at = None
+        db.session.commit()
+        
+        # Work units are plain tuples so the pool threads never touch the session
+        work = [(item.id, item.status, item.concept, item.language, item.model) for item in items]
+        counts = self._counts(experiment.id)
+        progress = {'experiment_id': experiment.id, 'total': experiment.total_analyses or 0,
+                    'summary': dict(experiment.summary or {}), 'lock': threading.Lock()}
+        
+        batched: Dict[str, list] = {}
+        if progress['summary'].get('mode') == 'provider_batch':
+            for unit in work:
+                model = unit[4]
+                if api_keys.get(model) and provider_batch.supports(model, self.batch_transport):
+                    batched.setdefault(model, []).append(unit)
+            work = [unit for unit in work if unit[4] not in batched]
+        
+        packs: Dict[tuple, deque] = {}
+        if progress['summary'].get('mode') == 'packed':
+            for unit in work:
+                if api_keys.get(unit[4]):
+                    packs.setdefault((unit[4], unit[3]), deque()).append(unit)
+            work = [unit for unit in work if (unit[4], unit[3]) not in packs]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pslr-batch') as pool:
+            batch_futures = [pool.submit(self._run_provider_batch, progress, model, units, api_keys[model], counts)
+                             for model, units in batched.items()]
+            batch_futures += [pool.submit(self._run_packed, progress, queue, api_keys[model], use_cache, counts)
+                              for (model, _), queue in packs.items()
+                              for _ in range(min(self.max_workers, len(queue)))]
+            futures = {
+                pool.submit(self._analyze, concept, language, model, api_keys.get(model), use_cache): (item_id, status)
+                for item_id, status, concept, language, model in work
+            }
+            for future in as_completed(futures):
+                item_id, status = futures[future]
+                with progress['lock']:
+                    self._checkpoint(progress, item_id, status, future.result(), counts)
+            for future in batch_futures:
+                future.result()
+        
+        self.writer.flush()
+        self._finish(experiment)
+    
+    def _run_provider_batch(self, progress: Dict[str, Any], model: str, units: List[tuple],
+                            api_key: str, counts: Dict[str, int]):
+        """Submit (or re-poll) one model's provider batch and checkpoint every returned pair"""
+        transport = provider_batch.get_transport(model, api_key, kind=self.batch_transport)
+        statuses = {f'item-{item_id}': (item_id, status) for item_id, status, _, _, _ in units}
+        items = [(f'item-{item_id}', concept, language) for item_id, _, concept, language, _ in units]
+        request_path = os.path.join(self.batch_dir, f"experiment-{progress['experiment_id']}-{model}-"
+                                                    f"{datetime.utcnow():%Y%m%d%H%M%S}.jsonl")
+        
+        def on_submit(batch_id: str):
+            with progress['lock']:
+                progress['summary'].setdefault('provider_batches', {})[model] = batch_id
+                self._save_summary(progress, counts)
+        
+        previous = progress['summary'].get('provider_batches', {}).get(model)
+        for custom_id, result in self.analyzer.analyze_batch(model, items, transport, request_path,
+                                                             poll_interval=self.poll_interval,
+                                                             batch_id=previous, on_submit=on_submit):
+            item_id, status = statuses[custom_id]
+            with progress['lock']:
+                self._checkpoint(progress, item_id, status, result, counts)
+        
+        # Consumed: a later resume submits the remaining failures as a new batch
+        with progress['lock']:
+            progress['summary'].get('provider_batches', {}).pop(model, None)
+            self._save_summary(progress, counts)
+    
+    def _run_packed(self, progress: Dict[str, Any], queue: deque, api_key: str, use_cache: bool,
+                    counts: Dict[str, int]):
+        """Pull packs of one (model, language) group until it is drained, checkpointing each pair"""
+        while True:
+            with progress['lock']:
+                if not queue:
+                    return
+                model, language = queue[0][4], queue[0][3]
+                size = self.analyzer.packing.size(model) if self.analyzer.packing is not None else len(queue)
+                units = [queue.popleft() for _ in range(min(size, len(queue)))]
+            by_concept = {concept: (item_id, status) for item_id, status, concept, _, _ in units}
+            results = self.analyzer.analyze_packed(list(by_concept), language, model, api_key,
+                                                   use_cache=use_cache)
+            with progress['lock']:
+                for concept, (item_id, status) in by_concept.items():
+                    self._checkpoint(progress, item_id, status, results[concept], counts)
+    
+    def _save_summary(self, progress: Dict[str, Any], counts: Dict[str, int]):
+        summary = copy.deepcopy(dict(progress['summary'], **counts))
+        
+        def store(connection, ids):
+            connection.execute(update(BatchExperiment)
+                               .where(BatchExperiment.id == progress['experiment_id'])
+                               .values(summary=summary))
+        
+        self.writer.submit([], after=store, wait=True)
+    
+    def _analyze(self, concept: str, language: str, model: str, api_key: Optional[str],
+                 use_cache: bool) -> Dict[str, Any]:
+        if not api_key:
+            return {"success": False, "error": f"Missing API key for {model}"}
+        return self.analyzer.analyze(concept, language, model, api_key, use_cache=use_cache)
+    
+    def _checkpoint(self, progress: Dict[str, Any], item_id: int, previous: str,
+                    result: Dict[str, Any], counts: Dict[str, int]):
+        """Queue one finished pair; its row and item/progress updates commit together"""
+        rows = []
+        values = {'attempts': BatchItem.attempts + 1}
+        if result['success']:
+            # A cache hit is not a new sample, so it completes the pair without a new row
+            if not result.get('cached'):
+                rows.append(PSLRAnalysis.row_values(result))
+            values.update(status='completed', error=None)
+        else:
+            values.update(status='failed', error=result.get('error'))
+        
+        counts[previous] -= 1
+        counts[values['status']] += 1
+        total = progress['total']
+        percent = int(100 * counts['completed'] / total) if total else 100
+        summary = copy.deepcopy(dict(progress['summary'], **counts))
+        
+        def store(connection, ids):
+            if ids:
+                values['analysis_id'] = ids[0]
+            connection.execute(update(BatchItem).where(BatchItem.id == item_id).values(**values))
+            connection.execute(update(BatchExperiment)
+                               .where(BatchExperiment.id == progress['experiment_id'])
+                               .values(progress=percent, summary=summary))
+        
+        self.writer.submit(rows, after=store, wait=False)
+    
+    def _finish(self, experiment: BatchExperiment):
+        db.session.refresh(experiment)  # summary was updated through the writer during the run
+        counts = self._counts(experiment.id)
+        experiment.summary = dict(experiment.summary or {}, **counts)
+        experiment.status = 'completed' if counts['completed'] or not counts['failed'] else 'failed'
+        experiment.completed_at = datetime.utcnow()
+        db.session.commit()
+    
+    @staticmethod
+    def _counts(experiment_id: int) -> Dict[str, int]:
+        rows = db.session.query(BatchItem.status, db.func.count(BatchItem.id)).filter(
+            BatchItem.experiment_id == experiment_id
+        ).group_by(BatchItem.status).all()
+        counts = {'completed': 0, 'failed': 0, 'pending': 0}
+        counts.update({status: count for status, count in rows})
+        return counts
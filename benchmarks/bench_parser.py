@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parser Micro-benchmark
+Compares the legacy regex extraction with response_parser on the sample corpus
+
+Usage:
+    python benchmarks/bench_parser.py [--iterations 2000] [--corpus PATH] [--json]
+    python benchmarks/bench_parser.py --export-corpus PATH [--limit 1000]
+
+--export-corpus dumps raw_response rows from the configured DATABASE_URL
+into corpus format so the benchmark can be re-run on production samples.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_clients import PSLRAnalyzer  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_corpus.jsonl')
+
+
+def legacy_parse(response_text):
+    """parse_response as it was before response_parser (for comparison)"""
+    json_match = re.search(r'\{[^}]+\}', response_text, re.DOTALL)
+    if not json_match:
+        raise ValueError("No JSON found in response")
+    return PSLRAnalyzer.normalize_result(json.loads(json_match.group(0)))
+
+
+def load_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def matches(result, expected):
+    if expected is None:
+        return result is None
+    if result is None:
+        return False
+    normalized = PSLRAnalyzer.normalize_result(expected)
+    return all(abs(result[k] - normalized[k]) < 0.011 for k in 'PSLR')
+
+
+def run(parse, samples, iterations):
+    correct = 0
+    for sample in samples:
+        try:
+            result = parse(sample['raw_response'])
+        except (ValueError, TypeError):
+            result = None
+        correct += matches(result, sample['expected'])
+
+    total_bytes = sum(len(s['raw_response'].encode('utf-8')) for s in samples) * iterations
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for sample in samples:
+            try:
+                parse(sample['raw_response'])
+            except (ValueError, TypeError):
+                pass
+    elapsed = time.perf_counter() - start
+
+    return {
+        'success_rate': round(correct / len(samples), 4),
+        'responses_per_sec': round(len(samples) * iterations / elapsed),
+        'mb_per_sec': round(total_bytes / elapsed / 1e6, 2)
+    }
+
+
+STRESS_CASES = {
+    # Prose full of unmatched braces before a fenced JSON block
+    'unbalanced': lambda size: ('Consider the set {a, b, c and the map {x: y ' * (size // 44)) +
+    '\n```json\n{"P": 0.5, "S": 0.5, "L": 0.5, "R": 0.5, "reasoning": "x"}\n```',
+    # A response cut off before any closing brace (worst case for the regex)
+    'truncated': lambda size: '{"P": 0.5, "reasoning": "nested {' * (size // 33),
+    # Deeply nested invalid braces around a valid answer (every span fails to parse)
+    'nested': lambda size: '{ a ' * (size // 6) + '} ' * (size // 6) +
+    '{"P": 0.5, "S": 0.5, "L": 0.5, "R": 0.5, "reasoning": "x"}',
+}
+
+
+def stress(parse, text):
+    start = time.perf_counter()
+    try:
+        parse(text)
+        ok = True
+    except (ValueError, TypeError):
+        ok = False
+    return {'bytes': len(text), 'seconds': round(time.perf_counter() - start, 4), 'parsed': ok}
+
+
+def export_corpus(path, limit):
+    from app import app
+    from models import PSLRAnalysis, PSLRAnalysisBlob
+    from sqlalchemy.orm import contains_eager
+    analyzer = PSLRAnalyzer()
+    count = 0
+    with app.app_context(), open(path, 'w', encoding='utf-8') as f:
+        rows = PSLRAnalysis.query.join(PSLRAnalysis.blob).options(contains_eager(PSLRAnalysis.blob)) \
+            .filter(PSLRAnalysisBlob.raw_response.isnot(None)) \
+            .order_by(PSLRAnalysis.id.desc()).limit(limit)
+        for row in rows:
+            f.write(json.dumps({
+                'id': f'db-{row.id}',
+                'model': row.model,
+                'raw_response': row.raw_response,
+                'expected': {'P': row.p_value, 'S': row.s_value, 'L': row.l_value, 'R': row.r_value}
+            }, ensure_ascii=False) + '\n')
+            count += 1
+    print(f"Exported {count} samples to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--stress-size', type=int, default=100_000)
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    parser.add_argument('--export-corpus', metavar='PATH')
+    parser.add_argument('--limit', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.export_corpus:
+        export_corpus(args.export_corpus, args.limit)
+        return
+
+    samples = load_corpus(args.corpus)
+    analyzer = PSLRAnalyzer()
+    report = {
+        'samples': len(samples),
+        'iterations': args.iterations,
+        'legacy': run(legacy_parse, samples, args.iterations),
+        'scanner': run(analyzer.parse_response, samples, args.iterations),
+        'stress': {
+            case: {
+                'legacy': stress(legacy_parse, build(args.stress_size)),
+                'scanner': stress(analyzer.parse_response, build(args.stress_size))
+            }
+            for case, build in STRESS_CASES.items()
+        }
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Corpus: {report['samples']} samples × {report['iterations']} iterations")
+    print(f"{'parser':<10}{'success':>10}{'resp/s':>12}{'MB/s':>10}")
+    for name in ('legacy', 'scanner'):
+        r = report[name]
+        print(f"{name:<10}{r['success_rate']:>10.1%}{r['responses_per_sec']:>12,}{r['mb_per_sec']:>10}")
+    for case, results in report['stress'].items():
+        print(f"\nStress '{case}' ({results['scanner']['bytes']:,} bytes):")
+        for name in ('legacy', 'scanner'):
+            r = results[name]
+            print(f"  {name:<10}{r['seconds']:>8}s  parsed={r['parsed']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake LLM Provider
+Local stub speaking the OpenAI, Anthropic and Gemini wire formats for load tests
+
+Usage:
+    python benchmarks/fake_provider.py [--port 8900] [--latency-ms 800] [--distribution lognormal]
+        [--spread 0.5] [--ttfb-fraction 0.3] [--error-rate 0.01] [--error-status 500]
+        [--latency claude=1200 ...] [--seed 1]
+
+Point the platform at it with the printed PROVIDER_BASE_URLS. Requests are
+routed by path (``/chat/completions``, ``/v1/messages``,
+``:generateContent`` / ``:streamGenerateContent``), so every model can
+share one server; non-streaming and SSE streaming calls are supported.
+Answers are deterministic PSLR JSON derived from the prompt (a JSON array
+for packed prompts). GET /_stats returns request and error counts per
+model, POST /_reset clears them.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+PACKED_LINE = re.compile(r'^\d+\. (.+)$', re.MULTILINE)
+GEMINI_PATH = re.compile(r'/models/([^/:]+):(generateContent|streamGenerateContent)$')
+
+
+class Latency:
+    """
+    Call latency in seconds drawn from a distribution around ``median_ms``.
+
+    ``spread`` is the relative width: the half-range for uniform, the
+    relative standard deviation for normal and sigma of the underlying
+    normal for lognormal (whose median is then ``median_ms``). exponential
+    uses ``median_ms`` as the median too.
+    """
+
+    def __init__(self, median_ms: float, distribution: str = 'lognormal', spread: float = 0.5,
+                 rng: random.Random = None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution}")
+        self.median = median_ms / 1000.0
+        self.distribution = distribution
+        self.spread = spread
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        m, s = self.median, self.spread
+        with self._lock:
+            if self.distribution == 'fixed':
+                value = m
+            elif self.distribution == 'uniform':
+                value = self.rng.uniform(m * (1 - s), m * (1 + s))
+            elif self.distribution == 'normal':
+                value = self.rng.gauss(m, m * s)
+            elif self.distribution == 'lognormal':
+                value = m * self.rng.lognormvariate(0, s)
+            else:
+                value = self.rng.expovariate(math.log(2) / m) if m > 0 else 0.0
+        return max(0.0, value)
+
+
+def pslr_answer(user_prompt: str) -> str:
+    """Deterministic PSLR JSON for a prompt; packed prompts get one element per listed concept"""
+    def scores(text):
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        weights = [1 + b for b in digest[:4]]
+        return {k: round(2.0 * w / sum(weights), 2) for k, w in zip('PSLR', weights)}
+
+    concepts = PACKED_LINE.findall(user_prompt)
+    if concepts:
+        return json.dumps([dict(concept=c, reasoning='Fake provider answer', **scores(c)) for c in concepts])
+    return json.dumps(dict(scores(user_prompt), reasoning='Fake provider answer'))
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def chunks(text: str, count: int = 4):
+    size = max(1, -(-len(text) // count))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class ProviderStats:
+    def __init__(self):
+        self.requests = {}
+        self.errors = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, model: str, error: bool):
+        with self._lock:
+            self.requests[model] = self.requests.get(model, 0) + 1
+            if error:
+                self.errors[model] = self.errors.get(model, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'errors': dict(self.errors),
+                    'uptime': round(time.time() - self.started, 1)}
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.errors.clear()
+            self.started = time.time()
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeProvider/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, delay: float = 0.0):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if delay:
+            time.sleep(delay)  # headers (first byte) already sent; the body is "generated"
+        self.wfile.write(body)
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _sse(self, data, event: str = None):
+        frame = (f'event: {event}\n' if event else '') + f'data: {data if isinstance(data, str) else json.dumps(data)}\n\n'
+        self.wfile.write(frame.encode('utf-8'))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/_stats':
+            return self._send_json(200, self.server.stats.snapshot())
+        self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': {'message': 'Invalid JSON body'}})
+
+        if path == '/_reset':
+            self.server.stats.reset()
+            return self._send_json(200, {'reset': True})
+        if path.endswith('/chat/completions'):
+            return self._openai(body)
+        if path.endswith('/v1/messages'):
+            return self._anthropic(body)
+        match = GEMINI_PATH.search(path)
+        if match:
+            return self._gemini(body, match.group(1), stream=match.group(2) == 'streamGenerateContent')
+        self._send_json(404, {'error': {'message': f'Unknown endpoint {path}'}})
+
+    def _plan(self, family: str, model: str):
+        """(total latency, error?) for one call; sleeps the time to first byte"""
+        server = self.server
+        total = server.latency_for(family, model).sample()
+        error = server.error_rate > 0 and server.rng_random() < server.error_rate
+        server.stats.record(model, error)
+        time.sleep(total * (1.0 if error else server.ttfb_fraction))
+        return total * (1 - server.ttfb_fraction), error
+
+    def _openai(self, body):
+        model = body.get('model', 'gpt-4o')
+        user = next((m['content'] for m in reversed(body.get('messages', [])) if m.get('role') == 'user'), '')
+        system = next((m['content'] for m in body.get('messages', []) if m.get('role') == 'system'), '')
+        remaining, error = self._plan('openai', model)
+        status = self.server.error_status
+        if error:
+            kind = 'rate_limit_exceeded' if status == 429 else 'server_error'
+            return self._send_json(status, {'error': {'message': 'Injected failure', 'type': kind, 'code': kind}})
+
+        text = pslr_answer(user)
+        usage = {'prompt_tokens': estimate_tokens(system) + estimate_tokens(user),
+                 'completion_tokens': estimate_tokens(text)}
+        usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:24]}'
+        created = int(time.time())
+        if not body.get('stream'):
+            return self._send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                             'finish_reason': 'stop', 'logprobs': None}],
+                'usage': usage
+            }, delay=remaining)
+
+        self._start_sse()
+        parts = chunks(text)
+        base = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model}
+        for i, part in enumerate(parts):
+            if i:
+                time.sleep(remaining / len(parts))
+            delta = {'role': 'assistant', 'content': part} if i == 0 else {'content': part}
+            self._sse(dict(base, choices=[{'index': 0, 'delta': delta, 'finish_reason': None}]))
+        self._sse(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+        if (body.get('stream_options') or {}).get('include_usage'):
+            self._sse(dict(base, choices=[], usage=usage))
+        self._sse('[DONE]')
+
+    def _anthropic(self, body):
+        model = body.get('model', 'claude')
+        messages = body.get('messages', [])
+        user = messages[-1]['content'] if messages else ''
+        if isinstance(user, list):
+            user = ''.join(block.get('text', '') for block in user)
+        system = body.get('system') or ''
+        if isinstance(system, list):
+            system = ''.join(block.get('text', '') for block in system)
+        remaining, error = self._plan('anthropic', model)
+        status = self.server.error_status
+        if error:
+            kind = 'rate_limit_error' if status == 429 else 'api_error'
+            return self._send_json(status, {'type': 'error', 'error': {'type': kind, 'message': 'Injected failure'}})
+
+        text = pslr_answer(user)
+        usage = {'input_tokens': estimate_tokens(system) + estimate_tokens(user),
+                 'output_tokens': estimate_tokens(text),
+                 'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0}
+        message = {'id': f'msg_{uuid.uuid4().hex[:24]}', 'type': 'message', 'role': 'assistant', 'model': model,
+                   'stop_reason': 'end_turn', 'stop_sequence': None}
+        if not body.get('stream'):
+            return self._send_json(200, dict(message, content=[{'type': 'text', 'text': text}], usage=usage),
+                                   delay=remaining)
+
+        self._start_sse()
+        start = dict(message, content=[], stop_reason=None, usage=dict(usage, output_tokens=1))
+        self._sse({'type': 'message_start', 'message': start}, 'message_start')
+        self._sse({'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}},
+                  'content_block_start')
+        parts = chunks(text)
+        for i, part in enumerate(parts):
+            if i:
+                time.sleep(remaining / len(parts))
+            self._sse({'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': part}},
+                      'content_block_delta')
+        self._sse({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+        self._sse({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                   'usage': {'output_tokens': usage['output_tokens']}}, 'message_delta')
+        self._sse({'type': 'message_stop'}, 'message_stop')
+
+    def _gemini(self, body, model: str, stream: bool):
+        contents = body.get('contents') or [{}]
+        user = ''.join(part.get('text', '') for part in contents[-1].get('parts', []))
+        system = ''.join(part.get('text', '') for part in (body.get('systemInstruction') or {}).get('parts', []))
+        remaining, error = self._plan('gemini', model)
+        status = self.server.error_status
+        if error:
+            kind = 'RESOURCE_EXHAUSTED' if status == 429 else 'INTERNAL'
+            return self._send_json(status, {'error': {'code': status, 'message': 'Injected failure', 'status': kind}})
+
+        text = pslr_answer(user)
+        usage = {'promptTokenCount': estimate_tokens(system) + estimate_tokens(user),
+                 'candidatesTokenCount': estimate_tokens(text)}
+        usage['totalTokenCount'] = usage['promptTokenCount'] + usage['candidatesTokenCount']
+
+        def response(part, finish=None):
+            candidate = {'content': {'role': 'model', 'parts': [{'text': part}]}, 'index': 0}
+            if finish:
+                candidate['finishReason'] = finish
+            return {'candidates': [candidate], 'usageMetadata': usage, 'modelVersion': model}
+
+        if not stream:
+            return self._send_json(200, response(text, 'STOP'), delay=remaining)
+        self._start_sse()
+        parts = chunks(text)
+        for i, part in enumerate(parts):
+            if i:
+                time.sleep(remaining / len(parts))
+            self._sse(response(part, 'STOP' if i == len(parts) - 1 else None))
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, latency_ms: float = 800.0, distribution: str = 'lognormal', spread: float = 0.5,
+                 ttfb_fraction: float = 0.3, error_rate: float = 0.0, error_status: int = 500,
+                 overrides: dict = None, seed: int = None):
+        super().__init__(address, FakeProviderHandler)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.distribution = distribution
+        self.spread = spread
+        self.ttfb_fraction = ttfb_fraction
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.default_latency = Latency(latency_ms, distribution, spread, self._rng)
+        # Overrides by wire format (openai / anthropic / gemini) or request model name
+        self.overrides = {name: Latency(ms, distribution, spread, self._rng)
+                          for name, ms in (overrides or {}).items()}
+        self.stats = ProviderStats()
+
+    def latency_for(self, family: str, model: str) -> Latency:
+        return self.overrides.get(model) or self.overrides.get(family) or self.default_latency
+
+    def rng_random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+
+def base_urls(host: str, port: int) -> dict:
+    """PROVIDER_BASE_URLS for every platform model pointing at a fake provider"""
+    root = f'http://{host}:{port}'
+    return {'gpt-4o': f'{root}/v1', 'deepseek': f'{root}/v1', 'grok': f'{root}/v1',
+            'claude': root, 'gemini': root}
+
+
+def parse_overrides(values):
+    overrides = {}
+    for value in values or []:
+        name, _, ms = value.partition('=')
+        if not ms:
+            raise argparse.ArgumentTypeError(f"--latency expects NAME=MS, got {value!r}")
+        overrides[name] = float(ms)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=800.0, help='median call latency')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--spread', type=float, default=0.5)
+    parser.add_argument('--ttfb-fraction', type=float, default=0.3,
+                        help='share of the latency before the first byte (rest is generation)')
+    parser.add_argument('--latency', action='append', metavar='NAME=MS',
+                        help='median override per wire format (openai/anthropic/gemini) or model name')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = FakeProviderServer((args.host, args.port), args.latency_ms, args.distribution, args.spread,
+                                args.ttfb_fraction, args.error_rate, args.error_status,
+                                parse_overrides(args.latency), args.seed)
+    host, port = server.server_address[:2]
+    print(f"Fake provider on http://{host}:{port}", file=sys.stderr)
+    print(f"PROVIDER_BASE_URLS='{json.dumps(base_urls(host, port))}'", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Platform Load Test
+Drives /api/analyze, /api/history and /api/stats under gunicorn worker settings against a fake provider
+
+Usage:
+    python benchmarks/loadtest.py [--configs 1x1,2x1,4x1,2x4] [--duration 20] [--warmup 3]
+        [--concurrency 16] [--mix analyze=6,history=3,stats=1] [--models gpt-4o,deepseek]
+        [--latency-ms 800] [--distribution lognormal] [--error-rate 0.01]
+        [--json] [--output results.json] [--baseline previous.json --tolerance 0.1]
+
+Each config is WORKERSxTHREADS[:WORKER_CLASS] and maps to the env
+variables gunicorn.conf.py reads (WEB_CONCURRENCY, GUNICORN_THREADS,
+GUNICORN_WORKER_CLASS). Every config gets a fresh SQLite database (seeded
+with --seed-rows analyses so /api/history has pages to read) unless
+--database-url is given, and gunicorn is started with the production
+config file. benchmarks/fake_provider.py runs in its own process, so no
+provider is called and no API key is needed.
+
+The report lists throughput and latency percentiles per endpoint, the
+calls the fake provider saw and the mean per-stage times from /metrics.
+With --baseline, runs are compared with an earlier report by config, and
+the exit status is 1 if throughput dropped or p95 latency grew by more
+than --tolerance.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_provider import DISTRIBUTIONS, base_urls  # noqa: E402
+
+ENDPOINTS = ('analyze', 'history', 'stats')
+PERCENTILES = (50, 90, 95, 99)
+STAGE_SAMPLE = re.compile(r'^pslr_stage_seconds_(sum|count)\{provider="([^"]*)",stage="([^"]*)"\} (\S+)$')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def parse_config(spec: str) -> dict:
+    shape, _, worker_class = spec.partition(':')
+    workers, _, threads = shape.partition('x')
+    return {'label': spec, 'workers': int(workers), 'threads': int(threads or 1),
+            'worker_class': worker_class or 'sync'}
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name} (expected {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def wait_http(port: int, path: str, timeout: float, process: subprocess.Popen = None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Process exited with {process.returncode} before {path} answered")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', path)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for http://127.0.0.1:{port}{path}")
+
+
+def get_json(port: int, path: str, method: str = 'GET'):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.request(method, path, body=b'' if method == 'POST' else None)
+    return json.loads(conn.getresponse().read() or b'null')
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))]
+
+
+def summarize(samples, seconds: float) -> dict:
+    latencies = sorted(ms for _, ms in samples)
+    errors = sum(1 for ok, _ in samples if not ok)
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / seconds, 2) if seconds else 0.0,
+        'latency_ms': {'mean': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                       'max': round(latencies[-1], 2) if latencies else None}
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        summary['latency_ms'][f'p{p}'] = round(value, 2) if value is not None else None
+    return summary
+
+
+class LoadGenerator:
+    """Closed-loop clients: each thread keeps one keep-alive connection and sends the next request when answered"""
+
+    def __init__(self, port: int, concurrency: int, mix: dict, models, label: str, seed: int = 0):
+        self.port = port
+        self.concurrency = concurrency
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.models = models
+        self.label = label
+        self.seed = seed
+        self.recording = False
+        self.stop = threading.Event()
+        self.samples = {name: [] for name in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    def _request(self, conn, name: str, rng: random.Random, counter: int):
+        if name == 'analyze':
+            body = json.dumps({
+                # Unique concepts, so every analysis is a cache miss and a provider call
+                'concept': f'loadtest {self.label} {rng.random():.12f} {counter}',
+                'model': self.models[counter % len(self.models)],
+                'api_key': 'loadtest'
+            })
+            conn.request('POST', '/api/analyze', body=body, headers={'Content-Type': 'application/json'})
+        elif name == 'history':
+            conn.request('GET', '/api/history?limit=20')
+        else:
+            conn.request('GET', '/api/stats')
+        response = conn.getresponse()
+        payload = response.read()
+        if response.status != 200:
+            return False
+        if name == 'analyze':
+            return bool(json.loads(payload).get('success'))
+        return True
+
+    def _client(self, index: int):
+        rng = random.Random(self.seed * 1000 + index)
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=180)
+        counter = 0
+        while not self.stop.is_set():
+            name = rng.choices(self.names, self.weights)[0]
+            counter += 1
+            started = time.perf_counter()
+            try:
+                ok = self._request(conn, name, rng, counter)
+            except (OSError, http.client.HTTPException, ValueError):
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=180)
+            elapsed = (time.perf_counter() - started) * 1000
+            if self.recording:
+                with self._lock:
+                    self.samples[name].append((ok, elapsed))
+        conn.close()
+
+    def run(self, warmup: float, duration: float, on_measure=None) -> float:
+        threads = [threading.Thread(target=self._client, args=(i,), daemon=True) for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        time.sleep(warmup)
+        if on_measure is not None:
+            on_measure()
+        self.recording = True
+        started = time.perf_counter()
+        time.sleep(duration)
+        self.recording = False
+        measured = time.perf_counter() - started
+        self.stop.set()
+        for thread in threads:
+            thread.join(timeout=200)
+        return measured
+
+
+def seed_database(env: dict, rows: int, models, workdir: str):
+    """Create the schema (once, before workers race for it) and insert ``rows`` analyses"""
+    path = os.path.join(workdir, 'seed.ndjson')
+    rng = random.Random(0)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            weights = [rng.random() + 0.01 for _ in range(4)]
+            values = [round(2 * w / sum(weights), 2) for w in weights]
+            model = models[i % len(models)]
+            f.write(json.dumps({
+                'success': True, 'concept': f'seed concept {i % max(1, rows // 4)}', 'language': 'en',
+                'model': model, 'model_name': model, 'response_time': 800,
+                'raw_response': '{}', 'result': dict(zip('PSLR', values), reasoning='seed')
+            }) + '\n')
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'ingest-replay', path],
+                   cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stage_means(port: int) -> dict:
+    """Mean ms per (provider, stage) from /metrics (whole run, warmup included)"""
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        conn.request('GET', '/metrics')
+        response = conn.getresponse()
+        text = response.read().decode('utf-8')
+        if response.status != 200:
+            return {}
+    except OSError:
+        return {}
+    totals = {}
+    for line in text.splitlines():
+        match = STAGE_SAMPLE.match(line)
+        if match:
+            kind, provider, stage, value = match.groups()
+            totals.setdefault(provider, {}).setdefault(stage, {})[kind] = float(value)
+    return {provider: {stage: round(1000 * v['sum'] / v['count'], 3) for stage, v in stages.items()
+                       if v.get('count')}
+            for provider, stages in totals.items()}
+
+
+def run_config(config: dict, args, provider_port: int) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"pslr-loadtest-{config['label'].replace(':', '-')}-")
+    port = free_port()
+    env = dict(os.environ,
+               SECRET_KEY=os.environ.get('SECRET_KEY', 'loadtest'),
+               DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(workdir, 'pslr.db')}",
+               WEB_CONCURRENCY=str(config['workers']),
+               GUNICORN_THREADS=str(config['threads']),
+               GUNICORN_WORKER_CLASS=config['worker_class'],
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'),
+               PROVIDER_BASE_URLS=json.dumps(base_urls('127.0.0.1', provider_port)),
+               CACHE_ENABLED='true' if args.cache else 'false')
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+    if args.database_url is None:
+        seed_database(env, args.seed_rows, args.models, workdir)
+
+    log = open(os.path.join(workdir, 'gunicorn.log'), 'w')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py',
+                               '--bind', f'127.0.0.1:{port}'],
+                              cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_http(port, '/health', args.startup_timeout, server)
+        generator = LoadGenerator(port, args.concurrency, args.mix, args.models, config['label'], args.seed)
+        measured = generator.run(args.warmup, args.duration,
+                                 on_measure=lambda: get_json(provider_port, '/_reset', 'POST'))
+        provider = get_json(provider_port, '/_stats')
+        stages = stage_means(port)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        log.close()
+
+    endpoints = {name: summarize(samples, measured) for name, samples in generator.samples.items() if samples}
+    everything = [s for samples in generator.samples.values() for s in samples]
+    return {
+        'config': config,
+        'duration': round(measured, 2),
+        'total': summarize(everything, measured),
+        'endpoints': endpoints,
+        'provider': provider,
+        'stages_ms': stages,
+        'log': log.name
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float):
+    """Regressions of ``report`` against ``baseline`` (runs matched by config label)"""
+    previous = {run['config']['label']: run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in report['runs']:
+        label = run['config']['label']
+        before = previous.get(label)
+        if before is None:
+            continue
+        old, new = before['total']['throughput_rps'], run['total']['throughput_rps']
+        if old and new < old * (1 - tolerance):
+            regressions.append({'config': label, 'metric': 'throughput_rps', 'baseline': old, 'current': new})
+        for name, summary in run['endpoints'].items():
+            old_p95 = before.get('endpoints', {}).get(name, {}).get('latency_ms', {}).get('p95')
+            new_p95 = summary['latency_ms']['p95']
+            if old_p95 and new_p95 and new_p95 > old_p95 * (1 + tolerance):
+                regressions.append({'config': label, 'metric': f'{name}.p95_ms', 'baseline': old_p95,
+                                    'current': new_p95})
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict):
+    print(f"Load test @ {report['git_commit']}: concurrency {report['settings']['concurrency']}, "
+          f"{report['settings']['duration']}s per config, provider median {report['settings']['latency_ms']:g} ms")
+    header = f"{'config':<14}{'endpoint':<10}{'req/s':>9}{'err%':>7}" + ''.join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+    print(header)
+    for run in report['runs']:
+        rows = [('total', run['total'])] + list(run['endpoints'].items())
+        for name, s in rows:
+            latency = s['latency_ms']
+            print(f"{run['config']['label']:<14}{name:<10}{s['throughput_rps']:>9}{s['error_rate']:>7.1%}"
+                  + ''.join(f"{latency[f'p{p}'] if latency[f'p{p}'] is not None else '-':>9}" for p in PERCENTILES))
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['config']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', default='1x1,2x1,4x1,2x4', help='comma-separated WORKERSxTHREADS[:CLASS]')
+    parser.add_argument('--duration', type=float, default=20.0, help='measured seconds per config')
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--concurrency', type=int, default=16, help='closed-loop client threads')
+    parser.add_argument('--mix', default='analyze=6,history=3,stats=1')
+    parser.add_argument('--models', default='gpt-4o', help='models /api/analyze rotates through')
+    parser.add_argument('--cache', action='store_true', help='keep the result cache on (concepts are unique anyway)')
+    parser.add_argument('--seed-rows', type=int, default=2000, help='analyses inserted into each fresh database')
+    parser.add_argument('--database-url', help='use this database instead of a fresh SQLite file per config')
+    parser.add_argument('--startup-timeout', type=float, default=60.0)
+    parser.add_argument('--latency-ms', type=float, default=800.0, help='fake provider median latency')
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--spread', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='machine-readable output')
+    parser.add_argument('--output', metavar='PATH', help='also write the JSON report here')
+    parser.add_argument('--baseline', metavar='PATH', help='earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+    args.mix = parse_mix(args.mix)
+    args.models = [m.strip() for m in args.models.split(',') if m.strip()]
+    configs = [parse_config(spec.strip()) for spec in args.configs.split(',') if spec.strip()]
+
+    provider_port = free_port()
+    provider = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'fake_provider.py'),
+                                 '--port', str(provider_port), '--latency-ms', str(args.latency_ms),
+                                 '--distribution', args.distribution, '--spread', str(args.spread),
+                                 '--error-rate', str(args.error_rate), '--error-status', str(args.error_status),
+                                 '--seed', str(args.seed)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_http(provider_port, '/_stats', 10, provider)
+        runs = []
+        for config in configs:
+            print(f"Running {config['label']} ...", file=sys.stderr, flush=True)
+            runs.append(run_config(config, args, provider_port))
+    finally:
+        provider.terminate()
+        provider.wait(timeout=10)
+
+    report = {
+        'benchmark': 'loadtest',
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'git_commit': git_commit(),
+        'python': sys.version.split()[0],
+        'settings': {
+            'duration': args.duration, 'warmup': args.warmup, 'concurrency': args.concurrency,
+            'mix': args.mix, 'models': args.models, 'cache': args.cache, 'seed_rows': args.seed_rows,
+            'latency_ms': args.latency_ms, 'distribution': args.distribution, 'spread': args.spread,
+            'error_rate': args.error_rate, 'error_status': args.error_status
+        },
+        'runs': runs
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['regressions'] = compare(report, json.load(f), args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blob Compression for PSLR Platform
+Codecs for the reasoning / raw_response side table and the chunked backfill into it
+"""
+
+import zlib
+from typing import Callable, Optional
+
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ('zlib', 'zstd')
+
+_settings = {'codec': 'zlib', 'level': 6}
+
+# Lightweight table views so the backfill also works from migrations, where the
+# legacy inline columns still exist but are no longer mapped on PSLRAnalysis
+_legacy = sa.table('pslr_analysis', sa.column('id', sa.Integer), sa.column('reasoning', sa.Text),
+                   sa.column('raw_response', sa.Text))
+_blobs = sa.table('pslr_analysis_blobs', sa.column('analysis_id', sa.Integer), sa.column('codec', sa.String),
+                  sa.column('reasoning', sa.LargeBinary), sa.column('raw_response', sa.LargeBinary))
+
+
+def configure(codec: str = 'zlib', level: Optional[int] = None):
+    """Select the codec for new blobs; zstd falls back to zlib when zstandard is missing"""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown blob codec: {codec}")
+    if codec == 'zstd' and zstandard is None:
+        codec = 'zlib'
+    _settings['codec'] = codec
+    _settings['level'] = level if level is not None else (3 if codec == 'zstd' else 6)
+
+
+def default_codec() -> str:
+    return _settings['codec']
+
+
+def compress(text: Optional[str], codec: Optional[str] = None) -> Optional[bytes]:
+    if text is None:
+        return None
+    codec = codec or _settings['codec']
+    data = text.encode('utf-8')
+    level = _settings['level'] if codec == _settings['codec'] else None
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    return zlib.compress(data, 6 if level is None else level)
+
+
+def decompress(data: Optional[bytes], codec: str) -> Optional[str]:
+    if data is None:
+        return None
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed blobs")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return zlib.decompress(data).decode('utf-8')
+
+
+def has_inline_columns(connection) -> bool:
+    columns = {c['name'] for c in sa.inspect(connection).get_columns('pslr_analysis')}
+    return 'raw_response' in columns
+
+
+def backfill(connection, chunk_size: int = 1000, on_chunk: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Move inline reasoning / raw_response text into pslr_analysis_blobs.
+    
+    Works through the table in id order, ``chunk_size`` rows at a time,
+    clearing the inline columns of every moved row, so it can be stopped
+    and re-run. ``on_chunk(moved)`` runs after each chunk (the CLI commits
+    there). Returns the number of rows moved.
+    """
+    codec = _settings['codec']
+    has_text = sa.or_(_legacy.c.reasoning.isnot(None), _legacy.c.raw_response.isnot(None))
+    moved = 0
+    last_id = 0
+    
+    while True:
+        rows = connection.execute(
+            sa.select(_legacy.c.id, _legacy.c.reasoning, _legacy.c.raw_response)
+            .where(_legacy.c.id > last_id, has_text)
+            .order_by(_legacy.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return moved
+        
+        ids = [row.id for row in rows]
+        existing = set(connection.execute(
+            sa.select(_blobs.c.analysis_id).where(_blobs.c.analysis_id.in_(ids))
+        ).scalars())
+        values = [{
+            'analysis_id': row.id,
+            'codec': codec,
+            'reasoning': compress(row.reasoning, codec),
+            'raw_response': compress(row.raw_response, codec)
+        } for row in rows if row.id not in existing]
+        if values:
+            connection.execute(sa.insert(_blobs), values)
+        connection.execute(sa.update(_legacy).where(_legacy.c.id.in_(ids))
+                           .values(reasoning=None, raw_response=None))
+        
+        moved += len(rows)
+        last_id = ids[-1]
+        if on_chunk is not None:
+            on_chunk(moved)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Result Cache for PSLR Analysis
+Two-tier cache (in-process LRU + optional shared Redis) for analyzer results
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCache:
+    """Shared cache tier stored as JSON strings in Redis"""
+
+    def __init__(self, url: str, ttl: float = 3600, prefix: str = 'pslr:cache:'):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.client.setex(self.prefix + key, int(self.ttl if ttl is None else ttl), json.dumps(value))
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+class AnalysisCache:
+    """
+    Cache for successful PSLRAnalyzer results keyed on (concept, language, model).
+
+    Keys also carry ``version`` (PSLRAnalyzer.PROMPT_VERSION), so bumping the
+    prompt template stops serving answers to the old prompt from either
+    tier instead of waiting for their TTL. Lookups go to the local LRU tier first and fall back to Redis when REDIS_URL
+    is configured. Redis errors are counted and treated as misses so a broken
+    shared tier never fails an analysis.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600, redis_url: Optional[str] = None,
+                 version: int = 1):
+        self.version = version
+        self.local = LRUCache(max_size=max_size, ttl=ttl)
+        self.shared = None
+        if redis_url:
+            try:
+                self.shared = RedisCache(redis_url, ttl=ttl)
+            except ImportError:
+                self.shared = None
+        self._stats = {'hits': 0, 'local_hits': 0, 'shared_hits': 0,
+                       'misses': 0, 'bypassed': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(concept: str, language: str, model: str, version: int = 1) -> str:
+        raw = json.dumps([concept.strip(), language, model, version], ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, concept: str, language: str, model: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(concept, language, model, self.version)
+        value = self.local.get(key)
+        if value is not None:
+            self._count('hits')
+            self._count('local_hits')
+            return value
+
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception:
+                self._count('errors')
+                value = None
+            if value is not None:
+                self.local.set(key, value)
+                self._count('hits')
+                self._count('shared_hits')
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, concept: str, language: str, model: str, value: Dict[str, Any]):
+        key = self.make_key(concept, language, model, self.version)
+        self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value)
+            except Exception:
+                self._count('errors')
+
+    def record_bypass(self):
+        self._count('bypassed')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['local_size'] = len(self.local)
+        stats['shared'] = self.shared is not None
+        return stats
@@ -41,8 +41,104 @@ class Config:
     # Redis (optional)
     REDIS_URL = os.getenv('REDIS_URL', None)
     
-    # Rate Limiting
+    # LLM provider connection pools (per worker)
+    LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', 10))
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 60))  # seconds
+    LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 10))  # seconds
+    LLM_CLIENT_IDLE_TTL = float(os.getenv('LLM_CLIENT_IDLE_TTL', 600))  # seconds
+    LLM_MAX_CLIENTS = int(os.getenv('LLM_MAX_CLIENTS', 64))
+    # JSON per model, e.g. {"gpt-4o": "http://127.0.0.1:8900/v1"} (proxies, benchmarks/fake_provider.py)
+    PROVIDER_BASE_URLS = os.getenv('PROVIDER_BASE_URLS', '')
+    
+    # Provider deadlines, hedged requests and circuit breakers
+    PROVIDER_DEADLINE = float(os.getenv('PROVIDER_DEADLINE', 30))  # seconds
+    PROVIDER_DEADLINES = os.getenv('PROVIDER_DEADLINES', '')  # JSON per model, e.g. {"claude": 45}
+    HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'true').lower() == 'true'
+    HEDGE_QUANTILE = float(os.getenv('HEDGE_QUANTILE', 0.95))
+    HEDGE_MIN_DELAY = float(os.getenv('HEDGE_MIN_DELAY', 0.5))  # seconds
+    HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', 0.1))  # max fraction of calls hedged
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5))
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', 30))  # seconds
+    
+    # Prometheus histograms on /metrics (needs prometheus_client)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Concurrent multi-model analysis
+    ANALYZER_MAX_WORKERS = int(os.getenv('ANALYZER_MAX_WORKERS', 16))
+    COMPARE_TIMEOUT = float(os.getenv('COMPARE_TIMEOUT', 60))  # seconds
+    COMPARE_MAX_TIMEOUT = float(os.getenv('COMPARE_MAX_TIMEOUT', 300))  # cap on a request's timeout
+    
+    # Coalesce identical in-flight analyses (across workers when REDIS_URL is set)
+    SINGLEFLIGHT_ENABLED = os.getenv('SINGLEFLIGHT_ENABLED', 'true').lower() == 'true'
+    SINGLEFLIGHT_LOCK_TTL = float(os.getenv('SINGLEFLIGHT_LOCK_TTL', 120))  # seconds
+    
+    # Async analysis jobs
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 8))
+    JOB_SSE_TIMEOUT = float(os.getenv('JOB_SSE_TIMEOUT', 120))  # seconds
+    # Serve job events on single-threaded workers too (gevent / eventlet)
+    JOB_SSE_FORCE = os.getenv('JOB_SSE_FORCE', 'false').lower() == 'true'
+    
+    # Bulk analysis inserts: immediate (commit per row), batched (group commit), async (no wait)
+    INGEST_DURABILITY = os.getenv('INGEST_DURABILITY', 'batched')
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 500))
+    INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL', 0.2))  # seconds
+    INGEST_USE_COPY = os.getenv('INGEST_USE_COPY', 'true').lower() == 'true'
+    
+    # reasoning / raw_response compression (zstd needs the zstandard package, else zlib)
+    BLOB_CODEC = os.getenv('BLOB_CODEC', 'zlib')
+    BLOB_COMPRESSION_LEVEL = int(os.getenv('BLOB_COMPRESSION_LEVEL', 0)) or None  # 0 = codec default
+    
+    # Batch experiments
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+    # Provider batch APIs (mode=provider_batch): 'provider' or the in-process 'local' stand-in
+    PROVIDER_BATCH_TRANSPORT = os.getenv('PROVIDER_BATCH_TRANSPORT', 'provider')
+    PROVIDER_BATCH_DIR = os.getenv('PROVIDER_BATCH_DIR', 'provider_batches')
+    PROVIDER_BATCH_POLL_INTERVAL = float(os.getenv('PROVIDER_BATCH_POLL_INTERVAL', 30))  # seconds
+    # Packed prompts (mode=packed): concepts per call, tuned between 1 and PACKING_MAX_SIZE
+    PACKING_INITIAL_SIZE = int(os.getenv('PACKING_INITIAL_SIZE', 4))
+    PACKING_MAX_SIZE = int(os.getenv('PACKING_MAX_SIZE', 20))
+    PACKING_MAX_OUTPUT_TOKENS = int(os.getenv('PACKING_MAX_OUTPUT_TOKENS', 4096))
+    PACKING_FAILURE_THRESHOLD = float(os.getenv('PACKING_FAILURE_THRESHOLD', 0.1))  # lost fraction that halves the size
+    
+    # /api/history page size cap
+    HISTORY_MAX_LIMIT = int(os.getenv('HISTORY_MAX_LIMIT', 500))
+    
+    # /api/stats counters
+    STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', 5))  # seconds
+    STATS_RECONCILE_INTERVAL = float(os.getenv('STATS_RECONCILE_INTERVAL', 3600))  # seconds, 0 = off
+    
+    # Memory-mapped vector snapshot (flask snapshot)
+    SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+    
+    # Incremental refreshes (snapshot, /api/similar, divergence) re-read this many
+    # ids below their watermark to catch rows that committed out of id order
+    REFRESH_LOOKBACK_IDS = int(os.getenv('REFRESH_LOOKBACK_IDS', 5000))
+    
+    # /api/similar (per-(concept, model) means, refreshed incrementally)
+    SIMILAR_REFRESH_INTERVAL = float(os.getenv('SIMILAR_REFRESH_INTERVAL', 2))  # seconds
+    SIMILAR_GRID_CELL = float(os.getenv('SIMILAR_GRID_CELL', 0.1))
+    SIMILAR_MAX_K = int(os.getenv('SIMILAR_MAX_K', 100))
+    
+    # /api/analytics spread ranking size cap
+    ANALYTICS_MAX_TOP = int(os.getenv('ANALYTICS_MAX_TOP', 100))
+    
+    # /api/divergence ranking size cap
+    DIVERGENCE_MAX_TOP = int(os.getenv('DIVERGENCE_MAX_TOP', 100))
+    
+    # Result cache (in-process LRU, shared through REDIS_URL when set)
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', 2048))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 86400))  # seconds
+    
+    # Rate Limiting (per provider; callers over a limit wait, 0 = unlimited)
     RATELIMIT_STORAGE_URL = REDIS_URL if REDIS_URL else 'memory://'
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    RATELIMIT_RPM = int(os.getenv('RATELIMIT_RPM', 0))
+    RATELIMIT_TPM = int(os.getenv('RATELIMIT_TPM', 0))
+    RATELIMIT_CONCURRENCY = int(os.getenv('RATELIMIT_CONCURRENCY', 0))
+    RATELIMIT_BURST = float(os.getenv('RATELIMIT_BURST', 10))  # seconds of allowance a bucket holds
+    # JSON overrides per model, e.g. {"gpt-4o": {"rpm": 500, "tpm": 30000, "concurrency": 16}}
+    RATELIMIT_PROVIDER_LIMITS = os.getenv('RATELIMIT_PROVIDER_LIMITS', '')
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model Divergence for PSLR Platform
+Incrementally maintained model×model divergence over shared concepts
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from analytics import PairMeans, _vector_dict
+
+METRICS = ('l1', 'kl')
+
+# Smoothing for KL so a zero component does not make the divergence infinite
+KL_EPSILON = 1e-6
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale PSLR vectors (..., 4) to sum 1; all-zero vectors become uniform"""
+    totals = vectors.sum(axis=-1, keepdims=True)
+    return np.where(totals > 0, vectors / np.where(totals > 0, totals, 1), 0.25)
+
+
+def pairwise(p: np.ndarray) -> Dict[str, np.ndarray]:
+    """L1 and KL(p_i || p_j) between every pair of rows of p (C, M, 4) -> (C, M, M) each"""
+    l1 = np.abs(p[:, :, None, :] - p[:, None, :, :]).sum(axis=-1)
+    q = (p + KL_EPSILON) / (1 + 4 * KL_EPSILON)
+    logs = np.log(q)
+    kl = (q[:, :, None, :] * (logs[:, :, None, :] - logs[:, None, :, :])).sum(axis=-1)
+    return {'l1': l1, 'kl': kl}
+
+
+class DivergenceTracker:
+    """
+    Model×model divergence matrices over the concepts both models analysed.
+    
+    Each concept keeps its (M, M) contribution to the matrix sums. When
+    PairMeans reports changed cells, the contributions of just those
+    concepts are recomputed in one batched pass and swapped into the sums
+    (subtract old, add new), so a dashboard view never rescans the table.
+    Matrices and concept rankings are cached until the next change; a
+    ranking is cached once per metric and filter and sliced per ``top``,
+    so the cache stays bounded by the number of models. KL is directional:
+    ``matrix[i][j]`` is KL(model i || model j).
+    """
+    
+    def __init__(self, pair_means: PairMeans):
+        self.pair_means = pair_means
+        self.contributions = {metric: np.zeros((0, 0, 0)) for metric in METRICS}
+        self.shared = np.zeros((0, 0, 0), dtype=bool)
+        self.sums = {metric: np.zeros((0, 0)) for metric in METRICS}
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.version = 0
+        self._cache: Dict[Tuple, Any] = {}
+        pair_means.subscribe(self._on_change)
+    
+    def _grow(self):
+        n_models, n_concepts = self.pair_means.counts.shape
+        old_concepts, old_models = self.shared.shape[:2]
+        if (old_concepts, old_models) == (n_concepts, n_models):
+            return
+        shared = np.zeros((n_concepts, n_models, n_models), dtype=bool)
+        shared[:old_concepts, :old_models, :old_models] = self.shared
+        self.shared = shared
+        for metric in METRICS:
+            contribution = np.zeros((n_concepts, n_models, n_models))
+            contribution[:old_concepts, :old_models, :old_models] = self.contributions[metric]
+            self.contributions[metric] = contribution
+            sums = np.zeros((n_models, n_models))
+            sums[:old_models, :old_models] = self.sums[metric]
+            self.sums[metric] = sums
+        counts = np.zeros((n_models, n_models), dtype=np.int64)
+        counts[:old_models, :old_models] = self.counts
+        self.counts = counts
+    
+    def _on_change(self, model_idx: np.ndarray, concept_idx: np.ndarray):
+        # Runs under pair_means.lock, which also guards every read below
+        means = self.pair_means
+        self._grow()
+        concepts = np.unique(concept_idx)
+        present = means.counts[:, concepts].T > 0  # (C, M)
+        shared = present[:, :, None] & present[:, None, :]
+        shared[:, np.arange(shared.shape[1]), np.arange(shared.shape[1])] = False
+        
+        values = pairwise(normalize(np.swapaxes(means.means(slice(None), concepts), 0, 1)))
+        for metric in METRICS:
+            new = np.where(shared, values[metric], 0.0)
+            self.sums[metric] += new.sum(axis=0) - self.contributions[metric][concepts].sum(axis=0)
+            self.contributions[metric][concepts] = new
+        self.counts += shared.sum(axis=0) - self.shared[concepts].sum(axis=0)
+        self.shared[concepts] = shared
+        self.version += 1
+        self._cache.clear()
+    
+    def _cached(self, key: Tuple, build: Callable[[], Any]) -> Any:
+        with self.pair_means.lock:
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+    
+    def matrix(self, metric: str = 'l1') -> Dict[str, Any]:
+        """Mean divergence per model pair (None where the models share no concept)"""
+        return self._cached(('matrix', metric), lambda: self._matrix(metric))
+    
+    def _matrix(self, metric: str) -> Dict[str, Any]:
+        means = self.pair_means
+        n = len(means.models)
+        counts = self.counts[:n, :n]
+        values = self.sums[metric][:n, :n] / np.maximum(counts, 1)
+        return {
+            'metric': metric,
+            'models': list(means.models),
+            'matrix': [[round(float(values[i, j]), 6) if counts[i, j] else None for j in range(n)]
+                       for i in range(n)],
+            'shared_concepts': counts.tolist()
+        }
+    
+    def ranking(self, metric: str = 'l1', top: int = 20, model_a: Optional[str] = None,
+                model_b: Optional[str] = None, min_models: int = 2) -> Optional[Dict[str, Any]]:
+        """
+        Concepts the models disagree on most.
+        
+        Without a model pair, a concept scores the mean divergence over all
+        model pairs that analysed it (at least ``min_models`` models); with
+        ``model_a`` and ``model_b``, the divergence of that pair. Returns
+        None for an unknown model.
+        """
+        means = self.pair_means
+        with means.lock:
+            pair = None
+            if model_a or model_b:
+                pair = means.model_id(model_a or ''), means.model_id(model_b or '')
+                if None in pair:
+                    return None
+            # Every min_models above the model count ranks nothing; one key covers them
+            min_models = 2 if pair else min(max(min_models, 2), len(means.models) + 1)
+            key = ('ranking', metric, pair, min_models)
+            order, scores, eligible = self._cached(key, lambda: self._ranking(metric, pair, min_models))
+            
+            items = []
+            for c in order[:max(top, 1)]:
+                item = {'concept': means.concepts[c], 'divergence': round(float(scores[c]), 6)}
+                if pair:
+                    a, b = pair
+                    item['vectors'] = {model_a: _vector_dict(means.means(a, c)),
+                                       model_b: _vector_dict(means.means(b, c))}
+                else:
+                    seen = np.flatnonzero(means.counts[:len(means.models), c])
+                    item['models'] = [means.models[m] for m in seen]
+                items.append(item)
+        return {'metric': metric, 'concepts': eligible, 'top': items}
+    
+    def _ranking(self, metric: str, pair: Optional[Tuple[int, int]],
+                 min_models: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Eligible concepts by descending score (ties by concept id), their scores and count"""
+        means = self.pair_means
+        n_concepts = len(means.concepts)
+        contribution = self.contributions[metric][:n_concepts]
+        shared = self.shared[:n_concepts]
+        if pair:
+            a, b = pair
+            scores = contribution[:, a, b]
+            eligible = shared[:, a, b]
+        else:
+            pairs = shared.sum(axis=(1, 2))
+            scores = contribution.sum(axis=(1, 2)) / np.maximum(pairs, 1)
+            models = (means.counts[:len(means.models), :n_concepts] > 0).sum(axis=0)
+            eligible = (pairs > 0) & (models >= min_models)
+        
+        candidates = np.flatnonzero(eligible)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return order, scores.copy(), int(eligible.sum())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dataset Export for PSLR Platform
+Constant-memory streaming of analyses as NDJSON, CSV or Parquet
+"""
+
+import io
+import csv
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+import blobs
+from models import db, PSLRAnalysis, PSLRAnalysisBlob
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+CSV_COLUMNS = ['id', 'concept', 'language', 'model', 'model_name', 'timestamp',
+               'P', 'S', 'L', 'R', 'response_time']
+TEXT_COLUMNS = ['reasoning', 'raw_response']
+
+
+class ExportError(ValueError):
+    pass
+
+
+def check_format(fmt: str):
+    """Raise ExportError for unknown formats or a missing optional dependency"""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format: {fmt} (use {', '.join(FORMATS)})")
+    if fmt == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportError("Parquet export requires pyarrow")
+
+
+def export_query(model: Optional[str] = None, language: Optional[str] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 include_text: bool = False):
+    """Analyses in id order; the blob table is only joined when text is requested"""
+    columns = [PSLRAnalysis.id, PSLRAnalysis.concept, PSLRAnalysis.language, PSLRAnalysis.model,
+               PSLRAnalysis.model_name, PSLRAnalysis.created_at, PSLRAnalysis.p_value,
+               PSLRAnalysis.s_value, PSLRAnalysis.l_value, PSLRAnalysis.r_value,
+               PSLRAnalysis.response_time]
+    if include_text:
+        columns += [PSLRAnalysisBlob.codec, PSLRAnalysisBlob.reasoning, PSLRAnalysisBlob.raw_response]
+    
+    stmt = select(*columns)
+    if include_text:
+        stmt = stmt.outerjoin(PSLRAnalysisBlob, PSLRAnalysisBlob.analysis_id == PSLRAnalysis.id)
+    if model:
+        stmt = stmt.where(PSLRAnalysis.model.in_(model.split(',')))
+    if language:
+        stmt = stmt.where(PSLRAnalysis.language == language)
+    if since:
+        stmt = stmt.where(PSLRAnalysis.created_at >= since)
+    if until:
+        stmt = stmt.where(PSLRAnalysis.created_at < until)
+    return stmt.order_by(PSLRAnalysis.id)
+
+
+def iter_records(stmt, include_text: bool = False, chunk_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield flat records one partition at a time.
+    
+    Rows come from a server-side cursor (``stream_results``) in
+    ``chunk_size`` partitions, so at most one partition is held in memory.
+    """
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+    for partition in result.partitions():
+        records = []
+        for row in partition:
+            record = {
+                'id': row.id,
+                'concept': row.concept,
+                'language': row.language,
+                'model': row.model,
+                'model_name': row.model_name,
+                'timestamp': row.created_at.isoformat(),
+                'P': row.p_value,
+                'S': row.s_value,
+                'L': row.l_value,
+                'R': row.r_value,
+                'response_time': row.response_time
+            }
+            if include_text:
+                codec = row.codec
+                record['reasoning'] = blobs.decompress(row.reasoning, codec) if codec else None
+                record['raw_response'] = blobs.decompress(row.raw_response, codec) if codec else None
+            records.append(record)
+        yield records
+
+
+def _ndjson(partitions: Iterator[List[Dict[str, Any]]], include_text: bool) -> Iterator[str]:
+    # Same shape as /api/history items, so exports can be fed to `flask ingest-replay`
+    for records in partitions:
+        lines = []
+        for record in records:
+            item = {key: record[key] for key in ('id', 'concept', 'language', 'model', 'model_name', 'timestamp')}
+            item['result'] = {'P': record['P'], 'S': record['S'], 'L': record['L'], 'R': record['R']}
+            item['response_time'] = record['response_time']
+            if include_text:
+                item['result']['reasoning'] = record['reasoning']
+                item['raw_response'] = record['raw_response']
+            lines.append(json.dumps(item, ensure_ascii=False))
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+
+def _csv(partitions: Iterator[List[Dict[str, Any]]], include_text: bool) -> Iterator[str]:
+    columns = CSV_COLUMNS + (TEXT_COLUMNS if include_text else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator='\n')
+    writer.writeheader()
+    for records in partitions:
+        writer.writerows(records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet(partitions: Iterator[List[Dict[str, Any]]], include_text: bool) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    fields = [('id', pa.int64()), ('concept', pa.string()), ('language', pa.string()),
+              ('model', pa.string()), ('model_name', pa.string()), ('timestamp', pa.timestamp('us')),
+              ('P', pa.float64()), ('S', pa.float64()), ('L', pa.float64()), ('R', pa.float64()),
+              ('response_time', pa.int32())]
+    if include_text:
+        fields += [('reasoning', pa.string()), ('raw_response', pa.string())]
+    schema = pa.schema(fields)
+    
+    sink = _ChunkSink()
+    # One row group per cursor partition keeps memory flat on both ends
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for records in partitions:
+            for record in records:
+                record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+_WRITERS = {'ndjson': _ndjson, 'csv': _csv, 'parquet': _parquet}
+
+
+def stream_export(fmt: str, chunk_size: int = 5000, include_text: bool = False, **filters) -> Iterator[Any]:
+    """Encoded export chunks (str for ndjson/csv, bytes for parquet)"""
+    check_format(fmt)
+    stmt = export_query(include_text=include_text, **filters)
+    return _WRITERS[fmt](iter_records(stmt, include_text=include_text, chunk_size=chunk_size), include_text)
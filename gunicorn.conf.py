@@ -1,6 +1,8 @@
 # Gunicorn configuration for production
 
 import os
+import glob
+import tempfile
 
 # Server socket
 bind = "0.0.0.0:5000"
@@ -8,11 +10,19 @@ backlog = 2048
 
 # Worker processes
 workers = int(os.getenv('WEB_CONCURRENCY', 4))
-worker_class = 'sync'
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+# threads > 1 switches sync workers to gthread, so SSE streams don't pin a whole worker
+# (/api/jobs/<id>/events answers 501 on single-threaded workers)
+threads = int(os.getenv('GUNICORN_THREADS', 4))
 worker_connections = 1000
 timeout = 120
 keepalive = 5
 
+# Prometheus multiprocess mode: each worker writes its histograms to files
+# here and /metrics aggregates them, so any worker can answer a scrape.
+# Set before the workers import prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'pslr-metrics'))
+
 # Logging
 accesslog = '-'
 errorlog = '-'
@@ -33,3 +43,21 @@ tmp_upload_dir = None
 # SSL (if needed)
 keyfile = None
 certfile = None
+
+
+# Server hooks
+def on_starting(server):
+    # Files left by a previous master would be summed into the new one's metrics
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(name)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live-gauge files (its histogram samples are kept)
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
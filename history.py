@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+History Queries for PSLR Platform
+Keyset pagination on (created_at, id) with column projections
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+
+import blobs
+from models import db, PSLRAnalysis, PSLRAnalysisBlob
+
+# Output field -> columns it needs (id/created_at are always loaded for the cursor)
+FIELD_COLUMNS = {
+    'id': [],
+    'concept': [PSLRAnalysis.concept],
+    'language': [PSLRAnalysis.language],
+    'model': [PSLRAnalysis.model],
+    'model_name': [PSLRAnalysis.model_name],
+    'timestamp': [],
+    'result': [PSLRAnalysis.p_value, PSLRAnalysis.s_value, PSLRAnalysis.l_value, PSLRAnalysis.r_value],
+    'reasoning': [PSLRAnalysisBlob.codec, PSLRAnalysisBlob.reasoning],
+    'response_time': [PSLRAnalysis.response_time],
+    'raw_response': [PSLRAnalysisBlob.codec, PSLRAnalysisBlob.raw_response],
+}
+
+# Same shape as PSLRAnalysis.to_dict()
+FULL_FIELDS = tuple(FIELD_COLUMNS)
+
+COMPACT_FIELDS = ('id', 'concept', 'model', 'timestamp', 'result')
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, analysis_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{analysis_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, analysis_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorError(f"Invalid cursor: {cursor}") from e
+
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    if not fields:
+        return FULL_FIELDS
+    names = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in names if f not in FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def query_history(limit: int, fields: Sequence[str] = FULL_FIELDS, cursor: Optional[str] = None,
+                  model: Optional[str] = None, concept_filter=None,
+                  compact: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of analyses, newest first.
+    
+    Only the columns behind the requested fields are selected, so list
+    views never touch the blob table; reasoning/raw_response join it for
+    the page only. Returns the page and the cursor for the next one (None
+    on the last page).
+    """
+    if compact:
+        fields = COMPACT_FIELDS
+    
+    columns = [PSLRAnalysis.id, PSLRAnalysis.created_at]
+    for field in fields:
+        columns.extend(c for c in FIELD_COLUMNS[field] if c not in columns)
+    
+    stmt = select(*columns)
+    if PSLRAnalysisBlob.codec in columns:
+        stmt = stmt.outerjoin(PSLRAnalysisBlob, PSLRAnalysisBlob.analysis_id == PSLRAnalysis.id)
+    if model:
+        stmt = stmt.where(PSLRAnalysis.model == model)
+    if concept_filter is not None:
+        stmt = stmt.where(concept_filter)
+    if cursor:
+        created_at, analysis_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            PSLRAnalysis.created_at < created_at,
+            and_(PSLRAnalysis.created_at == created_at, PSLRAnalysis.id < analysis_id)
+        ))
+    
+    # One extra row tells us whether another page exists
+    stmt = stmt.order_by(PSLRAnalysis.created_at.desc(), PSLRAnalysis.id.desc()).limit(limit + 1)
+    rows = db.session.execute(stmt).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    serialize = _compact_row if compact else _row_serializer(fields)
+    return [serialize(row) for row in rows], next_cursor
+
+
+def _compact_row(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'concept': row.concept,
+        'model': row.model,
+        't': row.created_at.isoformat(),
+        'v': [row.p_value, row.s_value, row.l_value, row.r_value]
+    }
+
+
+def _row_serializer(fields: Sequence[str]):
+    wanted = set(fields)
+    
+    def serialize(row) -> Dict[str, Any]:
+        item = {}
+        for field in fields:
+            if field == 'timestamp':
+                item['timestamp'] = row.created_at.isoformat()
+            elif field == 'result':
+                item['result'] = {'P': row.p_value, 'S': row.s_value, 'L': row.l_value, 'R': row.r_value}
+                if 'reasoning' in wanted:
+                    item['result']['reasoning'] = blobs.decompress(row.reasoning, row.codec)
+            elif field == 'reasoning':
+                if 'result' not in wanted:
+                    item['reasoning'] = blobs.decompress(row.reasoning, row.codec)
+            elif field == 'raw_response':
+                item['raw_response'] = blobs.decompress(row.raw_response, row.codec)
+            else:
+                item[field] = getattr(row, field)
+        return item
+    
+    return serialize
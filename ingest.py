@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk Ingestion for PSLR Platform
+Buffered multi-row (or COPY) inserts of analysis results with configurable durability
+"""
+
+import io
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, text
+
+import blobs
+from models import db, PSLRAnalysis, PSLRAnalysisBlob
+from stats import record_inserts
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ('immediate', 'batched', 'async')
+
+_TABLE = PSLRAnalysis.__table__
+_BLOB_TABLE = PSLRAnalysisBlob.__table__
+COLUMNS = [column.name for column in _TABLE.columns if column.name != 'id']
+BLOB_FIELDS = ('reasoning', 'raw_response')
+
+
+def row_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for an analyzer result or an /api/history item"""
+    row = PSLRAnalysis.row_values(record)
+    if record.get('timestamp'):
+        row['created_at'] = datetime.fromisoformat(record['timestamp'])
+    return row
+
+
+def _copy_value(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()  # bytea hex input
+    return str(value)
+
+
+def _copy_field(value: Any) -> str:
+    """
+    One field of a CSV COPY line.
+
+    CSV COPY reads an unquoted empty field as NULL and a quoted one as an
+    empty string, so None is left bare and everything else is quoted.
+    """
+    if value is None:
+        return ''
+    return '"' + _copy_value(value).replace('"', '""') + '"'
+
+
+def copy_buffer(columns: List[str], rows: List[Dict[str, Any]]) -> io.StringIO:
+    """CSV input for ``COPY ... FROM STDIN WITH (FORMAT csv)``"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+class IngestTicket:
+    """Rows handed to a BulkWriter; resolves once they are committed (or failed)"""
+    
+    def __init__(self, rows: List[Dict[str, Any]], blob_rows: List[Optional[Dict[str, Any]]],
+                 after: Optional[Callable] = None):
+        self.rows = rows
+        self.blob_rows = blob_rows
+        self.after = after
+        self.ids: List[Optional[int]] = []
+        self.error: Optional[BaseException] = None
+        self._done = threading.Event()
+    
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> List[Optional[int]]:
+        """Block until the rows are committed; returns their IDs in submit order"""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Ingest flush did not complete in time")
+        if self.error is not None:
+            raise self.error
+        return self.ids
+    
+    def _resolve(self, ids: Optional[List[Optional[int]]] = None, error: Optional[BaseException] = None):
+        self.ids = ids or []
+        self.error = error
+        self._done.set()
+
+
+class BulkWriter:
+    """
+    Buffers PSLRAnalysis rows and writes them in multi-row transactions.
+    
+    A flush is one transaction holding every buffered row as a single
+    executemany INSERT ... RETURNING (or ``COPY`` with pre-allocated IDs on
+    PostgreSQL), their compressed reasoning / raw_response blobs, the
+    matching /api/stats counter updates and each ticket's
+    ``after(connection, ids)`` callback, so callers can commit
+    their own bookkeeping together with the rows. Buffers flush when they
+    reach ``batch_size`` rows or when the oldest row is ``flush_interval``
+    seconds old.
+    
+    Durability modes:
+    
+    - ``immediate``: every submit is its own transaction, written inline.
+    - ``batched``: group commit; submitters block until the flush holding
+      their rows has committed, so a returned call is durable.
+    - ``async``: submitters return at once and the rows are committed within
+      ``flush_interval``; on PostgreSQL the flush also skips waiting for the
+      WAL fsync (``synchronous_commit = off``). A crash can lose the buffer.
+    
+    If a flush fails, its tickets are retried one by one so a single bad
+    row only fails its own ticket.
+    """
+    
+    def __init__(self, app, batch_size: int = 500, flush_interval: float = 0.2,
+                 durability: str = 'batched', use_copy: bool = True, max_pending: Optional[int] = None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.use_copy = use_copy
+        self.max_pending = max_pending or batch_size * 10
+        self._pending: List[IngestTicket] = []
+        self._pending_rows = 0
+        self._oldest = 0.0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._writing = 0
+        self._closed = False
+        self._stats = {'rows': 0, 'flushes': 0, 'copy_flushes': 0, 'failed_tickets': 0}
+    
+    def submit(self, rows: Iterable[Dict[str, Any]], after: Optional[Callable] = None,
+               wait: Optional[bool] = None) -> IngestTicket:
+        """
+        Queue rows (PSLRAnalysis.row_values dicts) for insertion.
+        
+        ``wait`` defaults to the durability mode: callers block in
+        ``immediate`` and ``batched`` mode and return at once in ``async``.
+        """
+        now = datetime.utcnow()
+        rows = list(rows)
+        # Compression happens here, in the submitting thread, not in the flush
+        ticket = IngestTicket([self._complete(row, now) for row in rows],
+                              [self._blob_values(row) for row in rows], after=after)
+        
+        if self.durability == 'immediate':
+            self._write([ticket])
+        else:
+            self._enqueue(ticket)
+        
+        if wait is None:
+            wait = self.durability != 'async'
+        if wait:
+            ticket.wait()
+        return ticket
+    
+    @staticmethod
+    def _complete(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+        # executemany needs identical keys; COPY bypasses column defaults
+        values = {column: row.get(column) for column in COLUMNS}
+        if values['created_at'] is None:
+            values['created_at'] = now
+        return values
+    
+    @staticmethod
+    def _blob_values(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if all(row.get(field) is None for field in BLOB_FIELDS):
+            return None
+        codec = blobs.default_codec()
+        values = {field: blobs.compress(row.get(field), codec) for field in BLOB_FIELDS}
+        values['codec'] = codec
+        return values
+    
+    def _enqueue(self, ticket: IngestTicket):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BulkWriter is closed")
+            # Backpressure: producers wait while the buffer is full
+            while self._pending_rows >= self.max_pending:
+                self._cond.wait()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(ticket)
+            self._pending_rows += len(ticket.rows) or 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name='pslr-ingest', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+    
+    def _take(self) -> List[IngestTicket]:
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            self._writing += 1
+        self._cond.notify_all()
+        return batch
+    
+    def _write_taken(self, batch: List[IngestTicket]):
+        try:
+            self._write(batch)
+        finally:
+            with self._cond:
+                self._writing -= 1
+                self._cond.notify_all()
+    
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = self._oldest + self.flush_interval
+                while self._pending_rows < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take()
+            # flush() may have taken the buffer while this thread was waiting
+            if batch:
+                self._write_taken(batch)
+    
+    def flush(self):
+        """Write everything buffered so far and wait for flushes already under way"""
+        with self._cond:
+            batch = self._take()
+        if batch:
+            self._write_taken(batch)
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+    
+    def close(self):
+        """Flush the buffer and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+    
+    def _write(self, batch: List[IngestTicket]):
+        with self._flush_lock, self.app.app_context():
+            try:
+                self._execute(batch)
+                return
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch[0], e)
+                    return
+                logger.warning("Bulk flush of %d tickets failed (%s); retrying one by one", len(batch), e)
+            for ticket in batch:
+                try:
+                    self._execute([ticket])
+                except Exception as e:
+                    self._fail(ticket, e)
+    
+    def _fail(self, ticket: IngestTicket, error: BaseException):
+        logger.error("Ingest of %d rows failed: %s", len(ticket.rows), error)
+        self._stats['failed_tickets'] += 1
+        ticket._resolve(error=error)
+    
+    def _execute(self, batch: List[IngestTicket]):
+        rows = [row for ticket in batch for row in ticket.rows]
+        blob_rows = [blob for ticket in batch for blob in ticket.blob_rows]
+        used_copy = False
+        
+        with db.engine.begin() as connection:
+            postgres = connection.dialect.name == 'postgresql'
+            if self.durability == 'async' and postgres:
+                connection.execute(text('SET LOCAL synchronous_commit = off'))
+            
+            ids: List[int] = []
+            if rows:
+                used_copy = (postgres and self.use_copy and len(rows) > 1
+                             and connection.dialect.driver == 'psycopg2')
+                if used_copy:
+                    ids = self._copy(connection, rows)
+                else:
+                    ids = self._insert(connection, _TABLE, rows, returning=True)
+                
+                blob_rows = [dict(blob, analysis_id=analysis_id)
+                             for analysis_id, blob in zip(ids, blob_rows) if blob is not None]
+                if blob_rows:
+                    if used_copy:
+                        self._copy_rows(connection, _BLOB_TABLE, blob_rows)
+                    else:
+                        self._insert(connection, _BLOB_TABLE, blob_rows)
+                record_inserts(connection, ((row['concept'], row['model']) for row in rows))
+            
+            offset = 0
+            for ticket in batch:
+                ticket_ids = ids[offset:offset + len(ticket.rows)]
+                offset += len(ticket.rows)
+                if ticket.after is not None:
+                    ticket.after(connection, ticket_ids)
+        
+        offset = 0
+        for ticket in batch:
+            ticket._resolve(ids[offset:offset + len(ticket.rows)])
+            offset += len(ticket.rows)
+        
+        self._stats['rows'] += len(rows)
+        self._stats['flushes'] += 1
+        self._stats['copy_flushes'] += used_copy
+    
+    @staticmethod
+    def _insert(connection, table, rows: List[Dict[str, Any]], returning: bool = False) -> List[int]:
+        if not returning:
+            connection.execute(insert(table), rows)
+            return []
+        if connection.dialect.insert_executemany_returning_sort_by_parameter_order:
+            # Batched multi-row VALUES with the new IDs in parameter order
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            return list(connection.execute(stmt, rows).scalars())
+        return [connection.execute(insert(table), row).inserted_primary_key[0] for row in rows]
+    
+    @classmethod
+    def _copy(cls, connection, rows: List[Dict[str, Any]]) -> List[int]:
+        """COPY analysis rows with IDs drawn from the serial sequence up front"""
+        ids = list(connection.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :n)"),
+            {'table': _TABLE.name, 'n': len(rows)}
+        ).scalars())
+        cls._copy_rows(connection, _TABLE, [dict(row, id=analysis_id) for analysis_id, row in zip(ids, rows)])
+        return ids
+    
+    @staticmethod
+    def _copy_rows(connection, table, rows: List[Dict[str, Any]]):
+        """Stream rows through psycopg2's COPY FROM STDIN (CSV)"""
+        columns = list(rows[0])
+        buffer = copy_buffer(columns, rows)
+        
+        cursor = connection.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            pending = self._pending_rows
+        stats = dict(self._stats)
+        stats.update(pending=pending, durability=self.durability, batch_size=self.batch_size,
+                     flush_interval=self.flush_interval)
+        return stats
@@ -12,3 +12,6 @@ with app.app_context():
     print("Tables:")
     print("- pslr_analysis")
     print("- batch_experiments")
+    print("- batch_experiment_items")
+    print("- analysis_jobs")
+    print("- pslr_stats, pslr_concept_stats, pslr_model_stats")
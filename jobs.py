@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asynchronous Analysis Jobs for PSLR Platform
+Queues analyses off the request thread; state lives in the database
+"""
+
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import update
+
+import metrics
+from models import db, PSLRAnalysis, AnalysisJob
+
+
+class JobQueue:
+    """
+    Runs analyses on a background thread pool so web workers return at once.
+    
+    Job state is stored in the ``analysis_jobs`` table, which makes it
+    readable from any gunicorn worker. Jobs still queued when their worker
+    process exits are lost (the API key is never persisted) and stay in the
+    ``queued`` state; clients should resubmit them. New analyses go through
+    the BulkWriter and the job is completed in the same transaction.
+    """
+    
+    def __init__(self, app, analyzer, writer, max_workers: int = 8):
+        self.app = app
+        self.analyzer = analyzer
+        self.writer = writer
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pslr-job')
+    
+    def submit(self, concept: str, language: str, model: str, api_key: str,
+               use_cache: bool = True) -> AnalysisJob:
+        job = AnalysisJob(id=uuid.uuid4().hex, concept=concept, language=language,
+                          model=model, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self.executor.submit(self._run, job.id, concept, language, model, api_key, use_cache)
+        return job
+    
+    def _run(self, job_id: str, concept: str, language: str, model: str, api_key: str,
+             use_cache: bool):
+        with self.app.app_context():
+            try:
+                job = db.session.get(AnalysisJob, job_id)
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                
+                result = self.analyzer.analyze(concept, language, model, api_key, use_cache=use_cache)
+                values = {'status': 'completed' if result['success'] else 'failed',
+                          'error': result.get('error')}
+                
+                if result['success'] and not result['cached']:
+                    def store(connection, ids):
+                        result['id'] = ids[0]
+                        connection.execute(update(AnalysisJob).where(AnalysisJob.id == job_id)
+                                           .values(analysis_id=ids[0], result=result,
+                                                   finished_at=datetime.utcnow(), **values))
+                    
+                    with metrics.stage(model, 'db_write'):
+                        self.writer.submit([PSLRAnalysis.row_values(result)], after=store, wait=True)
+                    return
+                
+                job.result = result
+                job.finished_at = datetime.utcnow()
+                for name, value in values.items():
+                    setattr(job, name, value)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                job = db.session.get(AnalysisJob, job_id)
+                if job is not None:
+                    job.status = 'failed'
+                    job.error = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+    
+    @staticmethod
+    def get(job_id: str) -> Optional[AnalysisJob]:
+        return db.session.get(AnalysisJob, job_id)
+    
+    def events(self, job_id: str, poll_interval: float = 0.5, timeout: float = 120) -> Iterator[str]:
+        """Server-sent events for a job: one ``status`` event per change, then ``result``"""
+        deadline = time.monotonic() + timeout
+        last_status = None
+        while True:
+            db.session.expire_all()
+            job = db.session.get(AnalysisJob, job_id)
+            if job is None:
+                yield sse_event('error', {'error': 'Job not found'})
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield sse_event('status', {'job_id': job.id, 'status': job.status})
+            if job.finished:
+                yield sse_event('result', job.to_dict())
+                return
+            if time.monotonic() > deadline:
+                yield sse_event('timeout', {'job_id': job.id, 'status': job.status})
+                return
+            # Release the connection between polls
+            db.session.rollback()
+            time.sleep(poll_interval)
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -8,61 +8,310 @@ Unified interface for multiple LLM providers
 import re
 import json
 import time
+import asyncio
+import hashlib
+import inspect
+import importlib
+import threading
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import metrics
+from ratelimit import Slot, estimate_tokens
+from resilience import CircuitOpenError, ProviderTimeout, error_type, is_timeout
+from response_parser import extract_pslr, extract_pslr_list
+
+
+class ClientRegistry:
+    """
+    Per-worker registry of provider SDK clients keyed by (provider, api_key, base_url).
+
+    Reusing the SDK object keeps its httpx connection pool (and TLS sessions)
+    warm between calls. Clients idle for longer than ``idle_ttl`` seconds, or
+    the least recently used ones beyond ``max_clients``, are closed. Keep
+    ``idle_ttl`` well above ``timeout`` so a client is never closed mid-call.
+    """
+    
+    def __init__(self, pool_size: int = 10, timeout: float = 60.0, connect_timeout: float = 10.0,
+                 idle_ttl: float = 600.0, max_clients: int = 64, max_retries: int = 2):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle_ttl = idle_ttl
+        self.max_clients = max_clients
+        self.max_retries = max_retries
+        self._clients: Dict[Tuple[str, str, Optional[str]], list] = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, **settings):
+        """Update pool settings; existing clients are closed so they pick them up"""
+        for name, value in settings.items():
+            if not hasattr(self, name) or name.startswith('_'):
+                raise AttributeError(f"Unknown client registry setting: {name}")
+            setattr(self, name, value)
+        self.close_all()
+    
+    def get(self, provider: str, api_key: str, base_url: Optional[str] = None):
+        """Return a pooled SDK client, building it on first use"""
+        key = (provider, hashlib.sha256(api_key.encode('utf-8')).hexdigest(), base_url)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = [self._build(provider, api_key, base_url), now]
+                self._clients[key] = entry
+                self._evict_overflow()
+            entry[1] = time.monotonic()
+            return entry[0]
+    
+    def _evict_idle(self, now: float):
+        for key in [k for k, (_, last_used) in self._clients.items() if now - last_used > self.idle_ttl]:
+            self._close(self._clients.pop(key)[0])
+    
+    def _evict_overflow(self):
+        while len(self._clients) > self.max_clients:
+            key = min(self._clients, key=lambda k: self._clients[k][1])
+            self._close(self._clients.pop(key)[0])
+    
+    def close_all(self):
+        with self._lock:
+            for client, _ in self._clients.values():
+                self._close(client)
+            self._clients.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers: Dict[str, int] = {}
+            for provider, _, _ in self._clients:
+                providers[provider] = providers.get(provider, 0) + 1
+        return {'clients': sum(providers.values()), 'providers': providers}
+    
+    @staticmethod
+    def _close(client):
+        try:
+            client.close()
+        except Exception:
+            pass
+    
+    def _http_client(self, sdk):
+        """
+        Pooled HTTP client for an SDK module.
+
+        Built from the SDK's own DefaultHttpxClient where it has one, since
+        SDKs reject a client from a different httpx package than their own
+        (e.g. httpx vs httpx2); Limits and Timeout come from that package too.
+        """
+        client_class = getattr(sdk, 'DefaultHttpxClient', None)
+        if client_class is None:
+            import httpx
+            client_class, http = httpx.Client, httpx
+        else:
+            base = next(cls for cls in client_class.__mro__[1:] if cls.__name__ == 'Client')
+            http = importlib.import_module(base.__module__.split('.')[0])
+        return client_class(
+            limits=http.Limits(max_connections=self.pool_size,
+                               max_keepalive_connections=self.pool_size,
+                               keepalive_expiry=self.idle_ttl),
+            timeout=http.Timeout(self.timeout, connect=self.connect_timeout),
+            event_hooks=metrics.EVENT_HOOKS
+        )
+    
+    def _build(self, provider: str, api_key: str, base_url: Optional[str]):
+        if provider == 'anthropic':
+            import anthropic
+            kwargs = {'base_url': base_url} if base_url else {}
+            return anthropic.Anthropic(api_key=api_key, http_client=self._http_client(anthropic),
+                                       max_retries=self.max_retries, **kwargs)
+        if provider == 'openai':
+            import openai
+            return openai.OpenAI(api_key=api_key, base_url=base_url, http_client=self._http_client(openai),
+                                 max_retries=self.max_retries)
+        raise ValueError(f"Unsupported provider: {provider}")
+
+
+# Shared by every client in this worker process
+client_registry = ClientRegistry()
+
+
+def _api_error(label: str, error: Exception) -> Exception:
+    """Wrap an SDK error for the user, keeping timeouts distinguishable"""
+    if is_timeout(error):
+        return ProviderTimeout(label, f"{label} API Timeout: {str(error)}")
+    return Exception(f"{label} API Error: {str(error)}")
+
+
+@lru_cache(maxsize=None)
+def _accepts(method, name: str) -> bool:
+    """Whether an SDK method takes keyword ``name`` (for features missing from older SDK versions)"""
+    try:
+        return name in inspect.signature(method).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _stream_usage_options(client) -> Dict[str, Any]:
+    """Ask for usage in the final streamed chunk (needs openai>=1.26; older SDKs stream without it)"""
+    if _accepts(type(client.chat.completions).create, 'stream_options'):
+        return {"stream_options": {"include_usage": True}}
+    return {}
+
+
+def _openai_usage(usage) -> Optional[Dict[str, int]]:
+    """Token usage of an OpenAI-compatible response (OpenAI and DeepSeek report cache hits)"""
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) or getattr(usage, 'prompt_cache_hit_tokens', None)
+    return {'input_tokens': usage.prompt_tokens, 'output_tokens': usage.completion_tokens,
+            'cache_read_tokens': cached or 0}
+
+
+def _anthropic_usage(usage) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {'input_tokens': usage.input_tokens, 'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+            'cache_read_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+            'cache_write_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0}
+
+
+def _google_usage(metadata) -> Optional[Dict[str, int]]:
+    if metadata is None:
+        return None
+    return {'input_tokens': metadata.prompt_token_count, 'output_tokens': metadata.candidates_token_count,
+            'cache_read_tokens': getattr(metadata, 'cached_content_token_count', 0) or 0}
+
+
+def _google_text(chunk) -> str:
+    """Text of a Gemini response chunk; ``chunk.text`` raises on part-less (finish / blocked) chunks"""
+    candidates = getattr(chunk, 'candidates', None)
+    if not candidates or candidates[0].content is None:
+        return ''
+    return ''.join(getattr(part, 'text', '') or '' for part in candidates[0].content.parts)
 
 
 class LLMClient:
-    """Base class for LLM API clients"""
+    """Base class for LLM API clients (``usage`` holds the token counts of the last call, if reported)"""
+    
+    # API endpoint; None uses the SDK default (see configure_base_urls)
+    BASE_URL: Optional[str] = None
     
     def __init__(self, api_key: str):
         self.api_key = api_key
+        self.usage: Optional[Dict[str, int]] = None
     
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         raise NotImplementedError
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        """Yield the completion as text chunks (providers without streaming yield it whole)"""
+        yield self.call(system_prompt, user_prompt, max_tokens=max_tokens)
 
 
 class OpenAIClient(LLMClient):
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    MODEL = "gpt-4o"
+    
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=self.api_key)
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
             response = client.chat.completions.create(
-                model="gpt-4o",
+                model=self.MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
+            self.usage = _openai_usage(response.usage)
             return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"OpenAI API Error: {str(e)}")
+            raise _api_error('OpenAI', e) from e
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        try:
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
+            response = client.chat.completions.create(
+                model=self.MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                stream=True,
+                **_stream_usage_options(client)
+            )
+            for chunk in response:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.usage = _openai_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise _api_error('OpenAI', e) from e
 
 
 class AnthropicClient(LLMClient):
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    MODEL = "claude-3-5-sonnet-20241022"
+    
+    @staticmethod
+    def system_blocks(system_prompt: str) -> List[Dict[str, Any]]:
+        """The system prompt as a cacheable prefix (below the model's minimum length it is simply not cached)"""
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+    
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=self.api_key)
+            client = client_registry.get('anthropic', self.api_key, self.BASE_URL)
             response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=1000,
+                model=self.MODEL,
+                max_tokens=max_tokens,
                 temperature=0.3,
-                system=system_prompt,
+                system=self.system_blocks(system_prompt),
                 messages=[{"role": "user", "content": user_prompt}]
             )
+            self.usage = _anthropic_usage(response.usage)
             return response.content[0].text
         except Exception as e:
-            raise Exception(f"Anthropic API Error: {str(e)}")
+            raise _api_error('Anthropic', e) from e
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        try:
+            client = client_registry.get('anthropic', self.api_key, self.BASE_URL)
+            response = client.messages.create(
+                model=self.MODEL,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                system=self.system_blocks(system_prompt),
+                messages=[{"role": "user", "content": user_prompt}],
+                stream=True
+            )
+            for event in response:
+                if event.type == 'message_start':
+                    self.usage = _anthropic_usage(event.message.usage)
+                elif event.type == 'message_delta' and self.usage is not None:
+                    self.usage['output_tokens'] = event.usage.output_tokens
+                elif event.type == 'content_block_delta' and getattr(event.delta, 'text', None):
+                    yield event.delta.text
+        except Exception as e:
+            raise _api_error('Anthropic', e) from e
 
 
 class GoogleClient(LLMClient):
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    def _configure(self, genai):
+        if self.BASE_URL:
+            # REST transport so an http:// endpoint (e.g. benchmarks/fake_provider.py) works
+            genai.configure(api_key=self.api_key, transport='rest',
+                            client_options={'api_endpoint': self.BASE_URL})
+        else:
+            genai.configure(api_key=self.api_key)
+    
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         try:
             import google.generativeai as genai
-            genai.configure(api_key=self.api_key)
+            self._configure(genai)
             model = genai.GenerativeModel(
                 model_name='gemini-2.0-flash-exp',
                 system_instruction=system_prompt
@@ -71,22 +320,48 @@ class GoogleClient(LLMClient):
                 user_prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.3,
-                    max_output_tokens=1000,
+                    max_output_tokens=max_tokens,
                 )
             )
+            self.usage = _google_usage(getattr(response, 'usage_metadata', None))
             return response.text
         except Exception as e:
-            raise Exception(f"Google API Error: {str(e)}")
+            raise _api_error('Google', e) from e
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        try:
+            import google.generativeai as genai
+            self._configure(genai)
+            model = genai.GenerativeModel(
+                model_name='gemini-2.0-flash-exp',
+                system_instruction=system_prompt
+            )
+            response = model.generate_content(
+                user_prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.3,
+                    max_output_tokens=max_tokens,
+                ),
+                stream=True
+            )
+            for chunk in response:
+                # Every chunk carries the running totals; the last one has the final counts
+                usage = _google_usage(getattr(chunk, 'usage_metadata', None))
+                if usage is not None:
+                    self.usage = usage
+                text = _google_text(chunk)
+                if text:
+                    yield text
+        except Exception as e:
+            raise _api_error('Google', e) from e
 
 
 class DeepSeekClient(LLMClient):
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    BASE_URL = "https://api.deepseek.com"
+    
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         try:
-            from openai import OpenAI
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url="https://api.deepseek.com"
-            )
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
             response = client.chat.completions.create(
                 model="deepseek-chat",
                 messages=[
@@ -94,21 +369,42 @@ class DeepSeekClient(LLMClient):
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
+            self.usage = _openai_usage(response.usage)
             return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"DeepSeek API Error: {str(e)}")
+            raise _api_error('DeepSeek', e) from e
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        try:
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
+            response = client.chat.completions.create(
+                model="deepseek-chat",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                stream=True,
+                **_stream_usage_options(client)
+            )
+            for chunk in response:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.usage = _openai_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise _api_error('DeepSeek', e) from e
 
 
 class XAIClient(LLMClient):
-    def call(self, system_prompt: str, user_prompt: str) -> str:
+    BASE_URL = "https://api.x.ai/v1"
+    
+    def call(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> str:
         try:
-            from openai import OpenAI
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url="https://api.x.ai/v1"
-            )
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
             response = client.chat.completions.create(
                 model="grok-2-1212",
                 messages=[
@@ -116,35 +412,40 @@ class XAIClient(LLMClient):
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
+            self.usage = _openai_usage(response.usage)
             return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"xAI API Error: {str(e)}")
+            raise _api_error('xAI', e) from e
+    
+    def stream(self, system_prompt: str, user_prompt: str, max_tokens: int = 1000) -> Iterator[str]:
+        try:
+            client = client_registry.get('openai', self.api_key, self.BASE_URL)
+            response = client.chat.completions.create(
+                model="grok-2-1212",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                stream=True,
+                **_stream_usage_options(client)
+            )
+            for chunk in response:
+                if getattr(chunk, 'usage', None) is not None:
+                    self.usage = _openai_usage(chunk.usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise _api_error('xAI', e) from e
 
 
-class PSLRAnalyzer:
-    """PSLR (Physical-Spiritual-Logical-Relational) 분석 엔진"""
-    
-    MODEL_CLIENTS = {
-        "gpt-4o": OpenAIClient,
-        "claude": AnthropicClient,
-        "gemini": GoogleClient,
-        "deepseek": DeepSeekClient,
-        "grok": XAIClient
-    }
-    
-    MODEL_NAMES = {
-        "gpt-4o": "GPT-4o",
-        "claude": "Claude-3.5-Sonnet",
-        "gemini": "Gemini-2.0-Flash",
-        "deepseek": "DeepSeek-V3",
-        "grok": "Grok-2"
-    }
-    
-    def generate_system_prompt(self, language: str) -> str:
-        """Generate PSLR system prompt"""
-        return f"""You are an expert in ontological analysis using the PSLR (Physical-Spiritual-Logical-Relational) framework.
+@lru_cache(maxsize=64)
+def _system_prompt(language: str, version: int) -> str:
+    """PSLR system prompt text; identical for every call, so it doubles as the cacheable prefix"""
+    return f"""You are an expert in ontological analysis using the PSLR (Physical-Spiritual-Logical-Relational) framework.
 
 PSLR Framework:
 The framework represents any concept as a quaternion structure with four dimensions:
@@ -169,17 +470,177 @@ Response Format (JSON only):
 }}
 
 Verify: P + S + L + R = 2.0"""
+
+
+def configure_base_urls(urls: Dict[str, str]):
+    """Point models at other endpoints ({model: base URL}), e.g. a proxy or a local stub provider"""
+    unknown = set(urls) - set(PSLRAnalyzer.MODEL_CLIENTS)
+    if unknown:
+        raise ValueError(f"Unknown models in base URLs: {', '.join(sorted(unknown))}")
+    for model, url in urls.items():
+        if url:
+            PSLRAnalyzer.MODEL_CLIENTS[model].BASE_URL = url
+
+
+class PSLRStreamParser:
+    """Incrementally extracts P/S/L/R values from a partially received response"""
     
-    def parse_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse LLM response and extract PSLR values"""
-        # Find JSON in response
-        json_match = re.search(r'\{[^}]+\}', response_text, re.DOTALL)
-        if not json_match:
-            raise ValueError("No JSON found in response")
+    # A value only counts once the token after the number has arrived
+    FIELD_PATTERN = re.compile(r'"([PSLR])"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\n]')
+    
+    def __init__(self):
+        self.buffer = ''
+        self.fields: Dict[str, float] = {}
+        self._scan_from = 0
+    
+    def feed(self, text: str) -> Dict[str, float]:
+        """Add a chunk; returns the fields completed by it"""
+        self.buffer += text
+        found = {}
+        for match in self.FIELD_PATTERN.finditer(self.buffer, self._scan_from):
+            key = match.group(1)
+            if key not in self.fields:
+                self.fields[key] = found[key] = float(match.group(2))
+            self._scan_from = match.end()
+        # Re-scan a short tail so a field split across chunks is still found
+        self._scan_from = max(self._scan_from, len(self.buffer) - 32)
+        return found
+
+
+class PSLRAnalyzer:
+    """PSLR (Physical-Spiritual-Logical-Relational) 분석 엔진"""
+    
+    MODEL_CLIENTS = {
+        "gpt-4o": OpenAIClient,
+        "claude": AnthropicClient,
+        "gemini": GoogleClient,
+        "deepseek": DeepSeekClient,
+        "grok": XAIClient
+    }
+    
+    MODEL_NAMES = {
+        "gpt-4o": "GPT-4o",
+        "claude": "Claude-3.5-Sonnet",
+        "gemini": "Gemini-2.0-Flash",
+        "deepseek": "DeepSeek-V3",
+        "grok": "Grok-2"
+    }
+    
+    # max_tokens every client requests; providers count it against tokens/min up front
+    MAX_OUTPUT_TOKENS = 1000
+    
+    # Bump when the system prompt template changes (memoized prompts and cached prefixes are per version)
+    PROMPT_VERSION = 1
+    
+    def __init__(self, cache=None, max_workers: int = 16, singleflight=None, governor=None, guard=None,
+                 packing=None):
+        self.cache = cache
+        self.singleflight = singleflight
+        self.governor = governor
+        self.guard = guard
+        self.packing = packing
+        # Provider SDKs are blocking, so concurrent calls run on a shared thread pool
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pslr-call')
+    
+    def generate_system_prompt(self, language: str) -> str:
+        """Generate PSLR system prompt (built once per language and PROMPT_VERSION)"""
+        return _system_prompt(language, self.PROMPT_VERSION)
+    
+    @staticmethod
+    def generate_packed_prompt(concepts: List[str]) -> str:
+        """User prompt scoring several concepts in one call (answer is a JSON array)"""
+        numbered = "\n".join(f"{i}. {concept}" for i, concept in enumerate(concepts, 1))
+        return f"""Analyze each of the following {len(concepts)} concepts separately:
+
+{numbered}
+
+Respond with a JSON array only, one object per concept in the same order:
+[
+  {{"concept": "<concept as given>", "P": 0.XX, "S": 0.XX, "L": 0.XX, "R": 0.XX, "reasoning": "..."}}
+]
+
+Each object must satisfy P + S + L + R = 2.0 on its own."""
+    
+    def _check_breaker(self, model: str):
+        # Fail fast before queueing behind the rate limiter
+        if self.guard is not None and self.guard.rejects(model):
+            raise CircuitOpenError(model, f"{self.MODEL_NAMES[model]} is failing; circuit open, retry later")
+    
+    def _call_provider(self, model: str, client: LLMClient, system_prompt: str, user_prompt: str,
+                       **kwargs) -> str:
+        """
+        One completion under the model's deadline, hedging and breaker (if a guard is set).
+        
+        Each attempt runs on its own client object, so a hedged duplicate
+        cannot overwrite the usage of the answer that won; the winner's
+        usage is copied to ``client``. A duplicate only goes out if the
+        governor has a slot free for it right now, so hedging stays within
+        the model's concurrency and token limits.
+        """
+        def call(attempt: LLMClient):
+            with metrics.provider_call(model):
+                return attempt.call(system_prompt, user_prompt, **kwargs), attempt.usage
+        
+        if self.guard is None:
+            response_text, client.usage = call(client)
+            return response_text
         
-        json_str = json_match.group(0)
-        data = json.loads(json_str)
+        def hedge():
+            slot = Slot(None, model)
+            if self.governor is not None:
+                max_tokens = kwargs.get('max_tokens', self.MAX_OUTPUT_TOKENS)
+                slot = self.governor.try_slot(model, estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+                                              max_tokens)
+                if slot is None:
+                    return None
+            
+            def run():
+                try:
+                    response = call(type(client)(client.api_key))
+                    slot.complete(response[0])
+                    return response
+                finally:
+                    slot.release()
+            return run
         
+        response_text, client.usage = self.guard.call(model, lambda: call(type(client)(client.api_key)),
+                                                      hedge=hedge)
+        return response_text
+    
+    @contextmanager
+    def provider_slot(self, model: str, system_prompt: str, user_prompt: str,
+                      max_output_tokens: Optional[int] = None) -> Iterator[Slot]:
+        """Wait for the model's rate limits (if a governor is set) and hold an in-flight slot"""
+        if self.governor is None:
+            yield Slot(None, model)
+            return
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        with self.governor.slot(model, prompt_tokens, max_output_tokens or self.MAX_OUTPUT_TOKENS) as slot:
+            yield slot
+    
+    @staticmethod
+    def _extra_data(client: LLMClient, **extra) -> Optional[Dict[str, Any]]:
+        """Token usage (incl. prompt-cache reads) reported by the provider, for PSLRAnalysis.extra_data"""
+        if client.usage is None:
+            return None
+        return dict(extra, usage=client.usage)
+    
+    def _parse(self, model: str, response_text: str) -> Dict[str, Any]:
+        """parse_response(), timing the parse and normalize stages"""
+        with metrics.stage(model, 'parse'):
+            data = extract_pslr(response_text)
+        with metrics.stage(model, 'normalize'):
+            return self.normalize_result(data)
+    
+    def parse_response(self, response_text: str) -> Dict[str, Any]:
+        """Parse LLM response and extract PSLR values"""
+        # Find the JSON object in the response (fences, prose and nested braces allowed)
+        data = extract_pslr(response_text)
+        return self.normalize_result(data)
+    
+    @staticmethod
+    def normalize_result(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Coerce P/S/L/R to floats and rescale them so they sum to 2.0"""
         # Extract PSLR values
         result = {
             "P": float(data.get("P", 0)),
@@ -210,18 +671,50 @@ Verify: P + S + L + R = 2.0"""
         
         return result
     
-    def analyze(self, concept: str, language: str, model: str, api_key: str) -> Dict[str, Any]:
-        """Perform PSLR analysis on a concept"""
-        system_prompt = self.generate_system_prompt(language)
-        user_prompt = f"Analyze the concept: {concept}"
+    def analyze(self, concept: str, language: str, model: str, api_key: str,
+                use_cache: bool = True) -> Dict[str, Any]:
+        """Perform PSLR analysis on a concept, serving repeats from the result cache"""
+        if self.cache is not None:
+            if use_cache:
+                cached = self.cache.get(concept, language, model)
+                if cached is not None:
+                    return dict(cached, cached=True)
+            else:
+                self.cache.record_bypass()
         
-        client_class = self.MODEL_CLIENTS[model]
-        client = client_class(api_key)
+        def run():
+            result = self._analyze(concept, language, model, api_key)
+            if self.cache is not None and result['success']:
+                self.cache.set(concept, language, model, result)
+            return result
+        
+        # Identical concurrent requests share one provider call; explicit
+        # cache bypasses always get their own fresh sample
+        if self.singleflight is not None and use_cache:
+            key = json.dumps([concept.strip(), language, model, self.PROMPT_VERSION], ensure_ascii=False)
+            result, shared = self.singleflight.do(key, run, share=lambda result: result['success'])
+            if shared:
+                return dict(result, cached=True, coalesced=True)
+            return dict(result, cached=False)
+        
+        return dict(run(), cached=False)
+    
+    def _analyze(self, concept: str, language: str, model: str, api_key: str) -> Dict[str, Any]:
+        """Call the provider and parse its response (uncached)"""
+        with metrics.stage(model, 'prompt_build'):
+            system_prompt = self.generate_system_prompt(language)
+            user_prompt = f"Analyze the concept: {concept}"
+            
+            client_class = self.MODEL_CLIENTS[model]
+            client = client_class(api_key)
         
         try:
-            start_time = time.time()
-            response_text = client.call(system_prompt, user_prompt)
-            result = self.parse_response(response_text)
+            self._check_breaker(model)
+            with self.provider_slot(model, system_prompt, user_prompt) as slot:
+                start_time = time.time()
+                response_text = self._call_provider(model, client, system_prompt, user_prompt)
+                slot.complete(response_text)
+            result = self._parse(model, response_text)
             response_time = int((time.time() - start_time) * 1000)
             
             return {
@@ -233,7 +726,8 @@ Verify: P + S + L + R = 2.0"""
                 "timestamp": datetime.now().isoformat(),
                 "result": result,
                 "raw_response": response_text,
-                "response_time": response_time
+                "response_time": response_time,
+                "extra_data": self._extra_data(client)
             }
         except Exception as e:
             return {
@@ -242,5 +736,265 @@ Verify: P + S + L + R = 2.0"""
                 "language": language,
                 "model": model,
                 "error": str(e),
+                "error_type": error_type(e),
                 "timestamp": datetime.now().isoformat()
             }
+
+    def analyze_packed(self, concepts: List[str], language: str, model: str, api_key: str,
+                       use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze several concepts with packed prompts, N concepts per call.
+        
+        N comes from the packing tuner. Each element of the returned array
+        is matched to its concept (by name, else by position) and
+        normalized on its own, so one bad element only costs that concept;
+        concepts missing from a pack (truncated or malformed output) are
+        retried one per call. Returns a result per concept, shaped like
+        ``analyze()`` output with ``packed`` set to the pack size.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for concept in dict.fromkeys(concepts):
+            cached = self.cache.get(concept, language, model) if self.cache is not None and use_cache else None
+            if cached is not None:
+                results[concept] = dict(cached, cached=True)
+            else:
+                pending.append(concept)
+        if pending and self.cache is not None and not use_cache:
+            self.cache.record_bypass()
+        
+        while pending:
+            size = self.packing.size(model) if self.packing is not None else len(pending)
+            pack, pending = pending[:size], pending[size:]
+            packed = self._analyze_pack(pack, language, model, api_key)
+            for concept in pack:
+                result = packed.get(concept)
+                if result is None:
+                    result = self._analyze(concept, language, model, api_key)
+                if self.cache is not None and result['success']:
+                    self.cache.set(concept, language, model, result)
+                results[concept] = dict(result, cached=False)
+        return results
+    
+    def _analyze_pack(self, concepts: List[str], language: str, model: str,
+                      api_key: str) -> Dict[str, Dict[str, Any]]:
+        """One packed call; returns results for the concepts whose element parsed"""
+        with metrics.stage(model, 'prompt_build'):
+            system_prompt = self.generate_system_prompt(language)
+            user_prompt = self.generate_packed_prompt(concepts)
+            max_tokens = self.packing.max_tokens(model, len(concepts)) if self.packing is not None \
+                else self.MAX_OUTPUT_TOKENS
+            client = self.MODEL_CLIENTS[model](api_key)
+        
+        try:
+            self._check_breaker(model)
+            with self.provider_slot(model, system_prompt, user_prompt, max_tokens) as slot:
+                start_time = time.time()
+                response_text = self._call_provider(model, client, system_prompt, user_prompt,
+                                                    max_tokens=max_tokens)
+                slot.complete(response_text)
+            response_time = int((time.time() - start_time) * 1000)
+        except Exception:
+            # Provider failures surface through the per-concept fallback calls
+            return {}
+        try:
+            with metrics.stage(model, 'parse'):
+                elements = extract_pslr_list(response_text)
+        except ValueError:
+            elements = []
+        
+        by_name = {str(e.get("concept", "")).strip().casefold(): e for e in elements}
+        matched = {}
+        for i, concept in enumerate(concepts):
+            element = by_name.get(concept.strip().casefold())
+            if element is None and len(elements) == len(concepts):
+                element = elements[i]
+            if element is None:
+                continue
+            try:
+                with metrics.stage(model, 'normalize'):
+                    result = self.normalize_result(element)
+            except (TypeError, ValueError):
+                continue
+            matched[concept] = {
+                "success": True,
+                "concept": concept,
+                "language": language,
+                "model": model,
+                "model_name": self.MODEL_NAMES[model],
+                "timestamp": datetime.now().isoformat(),
+                "result": result,
+                "raw_response": json.dumps(element, ensure_ascii=False),
+                "response_time": response_time,
+                "packed": len(concepts),
+                "extra_data": self._extra_data(client, packed=len(concepts))
+            }
+        if self.packing is not None:
+            self.packing.record(model, len(concepts), len(matched), estimate_tokens(response_text))
+        return matched
+    
+    def analyze_stream(self, concept: str, language: str, model: str, api_key: str,
+                       use_cache: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream a PSLR analysis as (event, data) pairs.
+        
+        Emits ``token`` events as text arrives, a ``field`` event as soon as
+        each of P/S/L/R has been generated (raw, before normalization), and
+        finally one ``result`` event shaped like ``analyze()`` output, whose
+        ``success`` flag reports whether parsing succeeded.
+        """
+        if self.cache is not None:
+            if use_cache:
+                cached = self.cache.get(concept, language, model)
+                if cached is not None:
+                    yield 'result', dict(cached, cached=True)
+                    return
+            else:
+                self.cache.record_bypass()
+        
+        with metrics.stage(model, 'prompt_build'):
+            system_prompt = self.generate_system_prompt(language)
+            user_prompt = f"Analyze the concept: {concept}"
+            client = self.MODEL_CLIENTS[model](api_key)
+        parser = PSLRStreamParser()
+        
+        try:
+            self._check_breaker(model)
+            with self.provider_slot(model, system_prompt, user_prompt) as slot:
+                start_time = time.time()
+                
+                def tokens():
+                    with metrics.provider_call(model):
+                        yield from client.stream(system_prompt, user_prompt)
+                
+                # The guard enforces the deadline on the whole stream and records its outcome
+                for text in (self.guard.stream(model, tokens) if self.guard is not None else tokens()):
+                    yield 'token', {'text': text}
+                    for key, value in parser.feed(text).items():
+                        yield 'field', {'key': key, 'value': value}
+                slot.complete(parser.buffer)
+            result = self._parse(model, parser.buffer)
+            response_time = int((time.time() - start_time) * 1000)
+            
+            final = {
+                "success": True,
+                "concept": concept,
+                "language": language,
+                "model": model,
+                "model_name": self.MODEL_NAMES[model],
+                "timestamp": datetime.now().isoformat(),
+                "result": result,
+                "raw_response": parser.buffer,
+                "response_time": response_time,
+                "extra_data": self._extra_data(client)
+            }
+            if self.cache is not None:
+                self.cache.set(concept, language, model, final)
+            yield 'result', dict(final, cached=False)
+        except Exception as e:
+            yield 'result', {
+                "success": False,
+                "concept": concept,
+                "language": language,
+                "model": model,
+                "error": str(e),
+                "error_type": error_type(e),
+                "timestamp": datetime.now().isoformat(),
+                "cached": False
+            }
+    
+    def analyze_batch(self, model: str, items: List[Tuple[str, str, str]], transport, request_path: str,
+                      poll_interval: float = 30.0, batch_id: Optional[str] = None,
+                      on_submit=None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run ``items`` ((custom_id, concept, language)) through a provider batch API.
+        
+        Writes the JSONL request file to ``request_path``, submits it (unless
+        ``batch_id`` of an earlier submission is given, e.g. on resume),
+        calls ``on_submit(batch_id)``, polls every ``poll_interval`` seconds
+        until the batch has ended and yields (custom_id, result) pairs shaped
+        like ``analyze()`` output. Items the provider did not return come
+        back as failures. Batch results bypass the result cache.
+        """
+        import provider_batch
+        
+        requests = {custom_id: (concept, language) for custom_id, concept, language in items}
+        if batch_id is not None:
+            try:
+                transport.status(batch_id)
+            except Exception:
+                batch_id = None  # unknown to the provider (or the local stand-in restarted)
+        if batch_id is None:
+            lines = [transport.request_line(custom_id, self.generate_system_prompt(language),
+                                            f"Analyze the concept: {concept}", self.MAX_OUTPUT_TOKENS)
+                     for custom_id, (concept, language) in requests.items()]
+            provider_batch.write_requests(request_path, lines)
+            batch_id = transport.submit(request_path)
+            if on_submit is not None:
+                on_submit(batch_id)
+        
+        while transport.status(batch_id) != provider_batch.ENDED:
+            time.sleep(poll_interval)
+        
+        for custom_id, text, error in transport.results(batch_id):
+            if custom_id not in requests:
+                continue
+            concept, language = requests.pop(custom_id)
+            yield custom_id, self._batch_result(concept, language, model, text, error)
+        for custom_id, (concept, language) in requests.items():
+            yield custom_id, self._batch_result(concept, language, model, None, "Missing from batch output")
+    
+    def _batch_result(self, concept: str, language: str, model: str, text: Optional[str],
+                      error: Optional[str]) -> Dict[str, Any]:
+        base = {"concept": concept, "language": language, "model": model,
+                "timestamp": datetime.now().isoformat(), "cached": False}
+        if text is None:
+            return dict(base, success=False, error=f"Batch request failed: {error}",
+                        error_type='provider_error')
+        try:
+            result = self.parse_response(text)
+        except Exception as e:
+            return dict(base, success=False, error=str(e), error_type='provider_error')
+        # No per-request latency is observable through a batch
+        return dict(base, success=True, model_name=self.MODEL_NAMES[model], result=result,
+                    raw_response=text, response_time=None)
+    
+    async def analyze_many(self, concept: str, language: str, models: List[str],
+                           api_keys: Dict[str, str], timeout: Optional[float] = None,
+                           use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze one concept with several models concurrently.
+        
+        Returns once every call has finished or ``timeout`` seconds have passed,
+        whichever comes first; models still running at the deadline get a
+        failed result. Late calls keep running in the pool and still populate
+        the result cache when they finish.
+        """
+        loop = asyncio.get_running_loop()
+        futures = {
+            model: loop.run_in_executor(self.executor, self.analyze, concept, language,
+                                        model, api_keys[model], use_cache)
+            for model in models
+        }
+        if not futures:
+            return {}
+        
+        done, _ = await asyncio.wait(futures.values(), timeout=timeout)
+        
+        results = {}
+        for model, future in futures.items():
+            if future in done:
+                results[model] = future.result()
+            else:
+                future.cancel()
+                results[model] = {
+                    "success": False,
+                    "concept": concept,
+                    "language": language,
+                    "model": model,
+                    "error": f"Timed out after {timeout}s",
+                    "error_type": "timeout",
+                    "timestamp": datetime.now().isoformat(),
+                    "cached": False
+                }
+        return results
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus Metrics for PSLR Platform
+Per-stage analysis latency, per-endpoint request latency and the /metrics exposition
+"""
+
+import os
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Stages of one analysis, in order. connect and ttfb come from the httpx hooks
+# (OpenAI-compatible and Anthropic SDKs only); ttfb runs from sending the
+# request to the response headers, so it includes connect on a new
+# connection. generation is the rest of the provider call.
+STAGES = ('prompt_build', 'connect', 'ttfb', 'generation', 'parse', 'normalize', 'db_write')
+
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST if prometheus_client else 'text/plain; charset=utf-8'
+
+# Provider call running on this thread: (model, call state) for the httpx hooks
+_current_call: contextvars.ContextVar[Optional[Tuple[str, Dict[str, float]]]] = \
+    contextvars.ContextVar('pslr_provider_call', default=None)
+
+_enabled = prometheus_client is not None
+_stage_seconds = None
+_request_seconds = None
+
+if prometheus_client is not None:
+    # In gunicorn multiprocess mode (PROMETHEUS_MULTIPROC_DIR set) every worker
+    # writes these to per-process files that /metrics aggregates
+    _stage_seconds = Histogram('pslr_stage_seconds', 'Time spent in each stage of an analysis',
+                               ['provider', 'stage'], buckets=STAGE_BUCKETS)
+    _request_seconds = Histogram('pslr_request_seconds', 'HTTP request latency by endpoint',
+                                 ['endpoint', 'method', 'status'], buckets=REQUEST_BUCKETS)
+
+
+def configure(enabled: bool = True):
+    """Turn recording on or off (always off without prometheus_client)"""
+    global _enabled
+    _enabled = enabled and prometheus_client is not None
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def observe(provider: str, stage: str, seconds: float):
+    if _enabled:
+        _stage_seconds.labels(provider, stage).observe(seconds)
+
+
+@contextmanager
+def stage(provider: str, name: str) -> Iterator[None]:
+    """Time the enclosed block as one stage of ``provider``'s analysis"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(provider, name, time.perf_counter() - started)
+
+
+@contextmanager
+def provider_call(provider: str) -> Iterator[None]:
+    """
+    Time one provider call as ttfb + generation.
+
+    Enter it on the thread that makes the HTTP request (the guard runs
+    calls on its own threads), so the httpx hooks can attribute connect
+    and first-byte times to ``provider``. Without a hook observation (e.g.
+    the Gemini SDK) the whole call counts as generation.
+    """
+    state = {'started': time.perf_counter()}
+    token = _current_call.set((provider, state))
+    try:
+        yield
+    finally:
+        try:
+            _current_call.reset(token)
+        except ValueError:
+            pass  # a streaming generator closed from another context (client disconnected)
+        ended = time.perf_counter()
+        first_byte = state.get('first_byte')
+        observe(provider, 'generation', ended - (first_byte or state['started']))
+
+
+class _Trace:
+    """httpcore trace callback timing connection setup (TCP + TLS) of one request"""
+
+    def __init__(self, provider: str, state: Dict[str, float]):
+        self.provider = provider
+        self.state = state
+        self.sent = time.perf_counter()
+        self.connect_started: Optional[float] = None
+        self.connected: Optional[float] = None
+
+    def __call__(self, event: str, info: Dict[str, Any]):
+        if event == 'connection.connect_tcp.started':
+            self.connect_started = time.perf_counter()
+        elif event in ('connection.connect_tcp.complete', 'connection.start_tls.complete'):
+            self.connected = time.perf_counter()
+
+    def observe_connect(self):
+        # Only new connections are timed; a reused pooled connection has no connect stage
+        if self.connect_started is not None and self.connected is not None:
+            observe(self.provider, 'connect', self.connected - self.connect_started)
+
+
+def _on_request(request):
+    current = _current_call.get()
+    if current is None or not _enabled:
+        return
+    request.extensions['trace'] = _Trace(*current)
+
+
+def _on_response(response):
+    trace = response.request.extensions.get('trace')
+    if not isinstance(trace, _Trace):
+        return
+    now = time.perf_counter()
+    trace.observe_connect()
+    # Retries replace the first byte time, so ttfb is that of the answered attempt
+    trace.state['first_byte'] = now
+    observe(trace.provider, 'ttfb', now - trace.sent)
+
+
+# For httpx.Client(event_hooks=...) in the client registry
+EVENT_HOOKS = {'request': [_on_request], 'response': [_on_response]}
+
+
+def observe_request(endpoint: str, method: str, status: int, seconds: float):
+    if _enabled:
+        _request_seconds.labels(endpoint, method, str(status)).observe(seconds)
+
+
+def exposition() -> bytes:
+    """Text exposition of all metrics (aggregated across workers in multiprocess mode)"""
+    if prometheus_client is None:
+        return b''
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+    return prometheus_client.generate_latest()
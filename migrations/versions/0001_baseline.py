@@ -0,0 +1,73 @@
+"""Baseline schema (pslr_analysis, batch_experiments)
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+Databases created before migrations existed (via db.create_all) already
+have these tables; every step is skipped when its object exists, so this
+revision can be applied on top of them without stamping.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('pslr_analysis'):
+        op.create_table(
+            'pslr_analysis',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('concept', sa.String(length=200), nullable=False),
+            sa.Column('language', sa.String(length=10), nullable=False),
+            sa.Column('model', sa.String(length=50), nullable=False),
+            sa.Column('model_name', sa.String(length=100), nullable=False),
+            sa.Column('p_value', sa.Float(), nullable=False),
+            sa.Column('s_value', sa.Float(), nullable=False),
+            sa.Column('l_value', sa.Float(), nullable=False),
+            sa.Column('r_value', sa.Float(), nullable=False),
+            sa.Column('reasoning', sa.Text(), nullable=True),
+            sa.Column('raw_response', sa.Text(), nullable=True),
+            sa.Column('response_time', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('extra_data', sa.JSON(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_pslr_analysis_concept', 'pslr_analysis', ['concept'])
+        op.create_index('ix_pslr_analysis_model', 'pslr_analysis', ['model'])
+        op.create_index('ix_pslr_analysis_created_at', 'pslr_analysis', ['created_at'])
+
+    if not _has_table('batch_experiments'):
+        op.create_table(
+            'batch_experiments',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=True),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('total_concepts', sa.Integer(), nullable=True),
+            sa.Column('total_models', sa.Integer(), nullable=True),
+            sa.Column('total_analyses', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('progress', sa.Integer(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.Column('summary', sa.JSON(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('batch_experiments')
+    op.drop_index('ix_pslr_analysis_created_at', table_name='pslr_analysis')
+    op.drop_index('ix_pslr_analysis_model', table_name='pslr_analysis')
+    op.drop_index('ix_pslr_analysis_concept', table_name='pslr_analysis')
+    op.drop_table('pslr_analysis')
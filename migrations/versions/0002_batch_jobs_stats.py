@@ -0,0 +1,110 @@
+"""Batch items, async jobs, stats counters and history keyset index
+
+Revision ID: 0002_batch_jobs_stats
+Revises: 0001_baseline
+Create Date: 2026-10-16 00:00:01
+
+Steps are skipped when the object already exists (db.create_all at app
+startup creates new tables before `flask db upgrade` runs).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_batch_jobs_stats'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_index(table, name):
+    return any(ix['name'] == name for ix in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def upgrade():
+    if not _has_index('pslr_analysis', 'ix_pslr_analysis_created_at_id'):
+        op.create_index('ix_pslr_analysis_created_at_id', 'pslr_analysis', ['created_at', 'id'])
+
+    if not _has_table('batch_experiment_items'):
+        op.create_table(
+            'batch_experiment_items',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('experiment_id', sa.Integer(), nullable=False),
+            sa.Column('concept', sa.String(length=200), nullable=False),
+            sa.Column('language', sa.String(length=10), nullable=False),
+            sa.Column('model', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('analysis_id', sa.Integer(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['experiment_id'], ['batch_experiments.id']),
+            sa.ForeignKeyConstraint(['analysis_id'], ['pslr_analysis.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('experiment_id', 'concept', 'model', name='uq_batch_item')
+        )
+        op.create_index('ix_batch_experiment_items_experiment_id', 'batch_experiment_items', ['experiment_id'])
+        op.create_index('ix_batch_experiment_items_status', 'batch_experiment_items', ['status'])
+
+    if not _has_table('analysis_jobs'):
+        op.create_table(
+            'analysis_jobs',
+            sa.Column('id', sa.String(length=32), nullable=False),
+            sa.Column('concept', sa.String(length=200), nullable=False),
+            sa.Column('language', sa.String(length=10), nullable=False),
+            sa.Column('model', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('analysis_id', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['analysis_id'], ['pslr_analysis.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_analysis_jobs_created_at', 'analysis_jobs', ['created_at'])
+
+    if not _has_table('pslr_stats'):
+        op.create_table(
+            'pslr_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('total_analyses', sa.BigInteger(), nullable=False),
+            sa.Column('total_concepts', sa.Integer(), nullable=False),
+            sa.Column('total_models', sa.Integer(), nullable=False),
+            sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _has_table('pslr_concept_stats'):
+        op.create_table(
+            'pslr_concept_stats',
+            sa.Column('concept', sa.String(length=200), nullable=False),
+            sa.Column('count', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('concept')
+        )
+
+    if not _has_table('pslr_model_stats'):
+        op.create_table(
+            'pslr_model_stats',
+            sa.Column('model', sa.String(length=50), nullable=False),
+            sa.Column('count', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('model')
+        )
+
+
+def downgrade():
+    op.drop_table('pslr_model_stats')
+    op.drop_table('pslr_concept_stats')
+    op.drop_table('pslr_stats')
+    op.drop_index('ix_analysis_jobs_created_at', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
+    op.drop_index('ix_batch_experiment_items_status', table_name='batch_experiment_items')
+    op.drop_index('ix_batch_experiment_items_experiment_id', table_name='batch_experiment_items')
+    op.drop_table('batch_experiment_items')
+    op.drop_index('ix_pslr_analysis_created_at_id', table_name='pslr_analysis')
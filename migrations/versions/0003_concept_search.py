@@ -0,0 +1,54 @@
+"""Indexed concept search (pg_trgm GIN on PostgreSQL, FTS5 trigram on SQLite)
+
+Revision ID: 0003_concept_search
+Revises: 0002_batch_jobs_stats
+Create Date: 2026-10-16 00:00:02
+
+The index covers pslr_concept_stats, the one-row-per-concept dictionary,
+rather than every analysis row.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_concept_search'
+down_revision = '0002_batch_jobs_stats'
+branch_labels = None
+depends_on = None
+
+FTS = 'pslr_concept_fts'
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_pslr_concept_stats_concept_trgm "
+                   "ON pslr_concept_stats USING gin (concept gin_trgm_ops)")
+
+    elif dialect == 'sqlite':
+        op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS} USING fts5("
+                   f"concept, content='pslr_concept_stats', content_rowid='rowid', tokenize='trigram')")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {FTS}_ai AFTER INSERT ON pslr_concept_stats BEGIN "
+                   f"INSERT INTO {FTS}(rowid, concept) VALUES (new.rowid, new.concept); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {FTS}_ad AFTER DELETE ON pslr_concept_stats BEGIN "
+                   f"INSERT INTO {FTS}({FTS}, rowid, concept) VALUES ('delete', old.rowid, old.concept); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {FTS}_au AFTER UPDATE OF concept ON pslr_concept_stats BEGIN "
+                   f"INSERT INTO {FTS}({FTS}, rowid, concept) VALUES ('delete', old.rowid, old.concept); "
+                   f"INSERT INTO {FTS}(rowid, concept) VALUES (new.rowid, new.concept); END")
+        # Backfill from the existing dictionary
+        op.execute(f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_pslr_concept_stats_concept_trgm")
+
+    elif dialect == 'sqlite':
+        for suffix in ('au', 'ad', 'ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {FTS}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {FTS}")
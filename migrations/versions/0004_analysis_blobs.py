@@ -0,0 +1,36 @@
+"""Side table for compressed reasoning / raw_response blobs
+
+Revision ID: 0004_analysis_blobs
+Revises: 0003_concept_search
+Create Date: 2026-10-16 00:00:03
+
+Only creates the table. Existing text is moved by `flask backfill-blobs`
+(chunked, one commit per chunk) or, for whatever is left, by 0005.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_analysis_blobs'
+down_revision = '0003_concept_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('pslr_analysis_blobs'):
+        return
+    op.create_table(
+        'pslr_analysis_blobs',
+        sa.Column('analysis_id', sa.Integer(), nullable=False),
+        sa.Column('codec', sa.String(length=10), nullable=False),
+        sa.Column('reasoning', sa.LargeBinary(), nullable=True),
+        sa.Column('raw_response', sa.LargeBinary(), nullable=True),
+        sa.ForeignKeyConstraint(['analysis_id'], ['pslr_analysis.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('analysis_id')
+    )
+
+
+def downgrade():
+    op.drop_table('pslr_analysis_blobs')
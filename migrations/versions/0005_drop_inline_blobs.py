@@ -0,0 +1,54 @@
+"""Move remaining inline text into pslr_analysis_blobs and drop the columns
+
+Revision ID: 0005_drop_inline_blobs
+Revises: 0004_analysis_blobs
+Create Date: 2026-10-16 00:00:04
+
+Run `flask db upgrade 0004_analysis_blobs` and `flask backfill-blobs`
+first on large tables; this revision then only has stragglers to move.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import blobs
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_drop_inline_blobs'
+down_revision = '0004_analysis_blobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not blobs.has_inline_columns(bind):
+        return
+    blobs.backfill(bind)
+    with op.batch_alter_table('pslr_analysis') as batch_op:
+        batch_op.drop_column('raw_response')
+        batch_op.drop_column('reasoning')
+
+
+def downgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table('pslr_analysis') as batch_op:
+        batch_op.add_column(sa.Column('reasoning', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('raw_response', sa.Text(), nullable=True))
+
+    analysis = sa.table('pslr_analysis', sa.column('id', sa.Integer), sa.column('reasoning', sa.Text),
+                        sa.column('raw_response', sa.Text))
+    stored = sa.table('pslr_analysis_blobs', sa.column('analysis_id', sa.Integer), sa.column('codec', sa.String),
+                      sa.column('reasoning', sa.LargeBinary), sa.column('raw_response', sa.LargeBinary))
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.select(stored).where(stored.c.analysis_id > last_id)
+                            .order_by(stored.c.analysis_id).limit(1000)).all()
+        if not rows:
+            break
+        for row in rows:
+            bind.execute(sa.update(analysis).where(analysis.c.id == row.analysis_id).values(
+                reasoning=blobs.decompress(row.reasoning, row.codec),
+                raw_response=blobs.decompress(row.raw_response, row.codec)
+            ))
+        last_id = rows[-1].analysis_id
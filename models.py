@@ -9,12 +9,18 @@ from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import JSON
 
+import blobs
+
 db = SQLAlchemy()
 
 
 class PSLRAnalysis(db.Model):
     """PSLR 분석 결과 저장"""
     __tablename__ = 'pslr_analysis'
+    __table_args__ = (
+        # Keyset pagination order for /api/history
+        db.Index('ix_pslr_analysis_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -30,9 +36,7 @@ class PSLRAnalysis(db.Model):
     l_value = db.Column(db.Float, nullable=False)  # Logical
     r_value = db.Column(db.Float, nullable=False)  # Relational
     
-    # Additional data
-    reasoning = db.Column(db.Text)
-    raw_response = db.Column(db.Text)
+    # Additional data (reasoning / raw_response text lives compressed in PSLRAnalysisBlob)
     response_time = db.Column(db.Integer)  # milliseconds
     
     # Timestamps
@@ -41,6 +45,56 @@ class PSLRAnalysis(db.Model):
     # Metadata (JSON for flexibility)
     extra_data = db.Column(JSON)
     
+    # Loaded only when reasoning / raw_response is accessed
+    blob = db.relationship('PSLRAnalysisBlob', uselist=False, lazy='select',
+                           cascade='all, delete-orphan', passive_deletes=True)
+    
+    @property
+    def reasoning(self):
+        return self.blob.get_text('reasoning') if self.blob is not None else None
+    
+    @reasoning.setter
+    def reasoning(self, value):
+        self._set_blob_text('reasoning', value)
+    
+    @property
+    def raw_response(self):
+        return self.blob.get_text('raw_response') if self.blob is not None else None
+    
+    @raw_response.setter
+    def raw_response(self, value):
+        self._set_blob_text('raw_response', value)
+    
+    def _set_blob_text(self, field, value):
+        if self.blob is None:
+            if value is None:
+                return
+            self.blob = PSLRAnalysisBlob(codec=blobs.default_codec())
+        self.blob.set_text(field, value)
+    
+    @staticmethod
+    def row_values(result):
+        """Column values for a successful PSLRAnalyzer.analyze() result"""
+        return {
+            'concept': result['concept'],
+            'language': result['language'],
+            'model': result['model'],
+            'model_name': result['model_name'],
+            'p_value': result['result']['P'],
+            's_value': result['result']['S'],
+            'l_value': result['result']['L'],
+            'r_value': result['result']['R'],
+            'reasoning': result['result'].get('reasoning'),
+            'raw_response': result.get('raw_response', ''),
+            'response_time': result.get('response_time', 0),
+            'extra_data': result.get('extra_data')
+        }
+    
+    @classmethod
+    def from_result(cls, result):
+        """Build a row from a successful PSLRAnalyzer.analyze() result"""
+        return cls(**cls.row_values(result))
+    
     def to_dict(self):
         """Convert to dictionary for API response"""
         return {
@@ -65,6 +119,25 @@ class PSLRAnalysis(db.Model):
         return f'<PSLRAnalysis {self.concept} by {self.model_name}>'
 
 
+class PSLRAnalysisBlob(db.Model):
+    """분석 원문 저장 (압축된 reasoning / raw_response, 1:1)"""
+    __tablename__ = 'pslr_analysis_blobs'
+    
+    analysis_id = db.Column(db.Integer, db.ForeignKey('pslr_analysis.id', ondelete='CASCADE'), primary_key=True)
+    codec = db.Column(db.String(10), nullable=False, default='zlib')  # zlib, zstd
+    reasoning = db.Column(db.LargeBinary)
+    raw_response = db.Column(db.LargeBinary)
+    
+    def get_text(self, field):
+        return blobs.decompress(getattr(self, field), self.codec)
+    
+    def set_text(self, field, value):
+        setattr(self, field, blobs.compress(value, self.codec))
+    
+    def __repr__(self):
+        return f'<PSLRAnalysisBlob {self.analysis_id} ({self.codec})>'
+
+
 class BatchExperiment(db.Model):
     """배치 실험 추적"""
     __tablename__ = 'batch_experiments'
@@ -106,3 +179,121 @@ class BatchExperiment(db.Model):
     
     def __repr__(self):
         return f'<BatchExperiment {self.name} - {self.status}>'
+
+
+class BatchItem(db.Model):
+    """배치 실험 작업 단위 (concept × model) 및 체크포인트"""
+    __tablename__ = 'batch_experiment_items'
+    __table_args__ = (
+        db.UniqueConstraint('experiment_id', 'concept', 'model', name='uq_batch_item'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    experiment_id = db.Column(db.Integer, db.ForeignKey('batch_experiments.id'), nullable=False, index=True)
+    
+    # Work unit
+    concept = db.Column(db.String(200), nullable=False)
+    language = db.Column(db.String(10), nullable=False, default='en')
+    model = db.Column(db.String(50), nullable=False)
+    
+    # Checkpoint
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, completed, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('pslr_analysis.id'))
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'experiment_id': self.experiment_id,
+            'concept': self.concept,
+            'language': self.language,
+            'model': self.model,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.error,
+            'analysis_id': self.analysis_id
+        }
+    
+    def __repr__(self):
+        return f'<BatchItem {self.concept} × {self.model} - {self.status}>'
+
+
+class AnalysisJob(db.Model):
+    """비동기 분석 작업 (202 + job id 모드)"""
+    __tablename__ = 'analysis_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    
+    # Request
+    concept = db.Column(db.String(200), nullable=False)
+    language = db.Column(db.String(10), nullable=False, default='en')
+    model = db.Column(db.String(50), nullable=False)
+    
+    # Status
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, completed, failed
+    result = db.Column(JSON)
+    error = db.Column(db.Text)
+    analysis_id = db.Column(db.Integer, db.ForeignKey('pslr_analysis.id'))
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed')
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'concept': self.concept,
+            'language': self.language,
+            'model': self.model,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'analysis_id': self.analysis_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<AnalysisJob {self.id} - {self.status}>'
+
+
+class PlatformStats(db.Model):
+    """플랫폼 통계 카운터 (단일 행, 삽입 시 증분 갱신)"""
+    __tablename__ = 'pslr_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    total_analyses = db.Column(db.BigInteger, nullable=False, default=0)
+    total_concepts = db.Column(db.Integer, nullable=False, default=0)
+    total_models = db.Column(db.Integer, nullable=False, default=0)
+    reconciled_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'total_analyses': self.total_analyses,
+            'total_concepts': self.total_concepts,
+            'total_models': self.total_models
+        }
+
+
+class ConceptStat(db.Model):
+    """개념별 분석 수 (고유 개념 수 집계용)"""
+    __tablename__ = 'pslr_concept_stats'
+    
+    concept = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class ModelStat(db.Model):
+    """모델별 분석 수 (고유 모델 수 집계용)"""
+    __tablename__ = 'pslr_model_stats'
+    
+    model = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prompt Packing for PSLR Analysis
+AIMD tuning of how many concepts are scored per LLM call
+"""
+
+import math
+import threading
+from typing import Any, Dict
+
+
+class PackingTuner:
+    """
+    Per-model packing size, tuned additive-increase / multiplicative-decrease.
+
+    A packed call whose elements all parse grows the size by one; a call
+    that loses more than ``failure_threshold`` of its concepts (truncated
+    output, malformed array) halves it, relative to that call's size. The
+    size is also capped so that ``size`` answers at the observed tokens per
+    concept (times ``headroom``) fit in ``max_output_tokens``, which is
+    what usually truncates large packs.
+    """
+
+    def __init__(self, initial: int = 4, min_size: int = 1, max_size: int = 20,
+                 max_output_tokens: int = 4096, failure_threshold: float = 0.1,
+                 headroom: float = 1.5, tokens_per_concept: float = 120.0, smoothing: float = 0.2):
+        self.initial = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_output_tokens = max_output_tokens
+        self.failure_threshold = failure_threshold
+        self.headroom = headroom
+        self.tokens_per_concept = tokens_per_concept
+        self.smoothing = smoothing
+        self._models: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, model: str) -> Dict[str, float]:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = {'size': float(self.initial), 'tokens_per_concept': self.tokens_per_concept,
+                                           'failure_rate': 0.0, 'calls': 0, 'concepts': 0, 'lost': 0}
+        return state
+
+    def size(self, model: str) -> int:
+        """Concepts to put in the next packed call"""
+        with self._lock:
+            state = self._state(model)
+            fits = int(self.max_output_tokens // (state['tokens_per_concept'] * self.headroom))
+            return max(self.min_size, min(int(state['size']), fits))
+
+    def max_tokens(self, model: str, count: int) -> int:
+        """Output budget for a call packing ``count`` concepts"""
+        with self._lock:
+            per_concept = self._state(model)['tokens_per_concept']
+        return min(self.max_output_tokens, int(math.ceil(count * per_concept * self.headroom)) + 64)
+
+    def record(self, model: str, requested: int, parsed: int, output_tokens: int):
+        """Feed back one packed call: concepts asked, concepts parsed, tokens returned"""
+        with self._lock:
+            state = self._state(model)
+            lost = (requested - parsed) / requested if requested else 0.0
+            a = self.smoothing
+            state['failure_rate'] = (1 - a) * state['failure_rate'] + a * lost
+            if parsed:
+                state['tokens_per_concept'] = (1 - a) * state['tokens_per_concept'] + a * output_tokens / parsed
+            if lost > self.failure_threshold:
+                # Relative to the failed call's size, so packs failing concurrently halve it once
+                state['size'] = max(float(self.min_size), min(state['size'], requested / 2))
+            else:
+                state['size'] = min(float(self.max_size), state['size'] + 1)
+            state['calls'] += 1
+            state['concepts'] += requested
+            state['lost'] += requested - parsed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = list(self._models)
+        result = {}
+        for model in models:
+            size = self.size(model)
+            with self._lock:
+                state = dict(self._models[model])
+            result[model] = {
+                'size': size,
+                'failure_rate': round(state['failure_rate'], 4),
+                'tokens_per_concept': round(state['tokens_per_concept'], 1),
+                'calls': int(state['calls']),
+                'concepts': int(state['concepts']),
+                'lost': int(state['lost'])
+            }
+        return result
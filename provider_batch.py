@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Provider Batch APIs for PSLR Analysis
+JSONL batch transports for OpenAI, Anthropic and a local stand-in
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from llm_clients import client_registry, AnthropicClient, OpenAIClient
+
+# Normalised batch states
+RUNNING, ENDED = 'running', 'ended'
+
+# (custom_id, completion text or None, error or None)
+BatchResult = Tuple[str, Optional[str], Optional[str]]
+
+
+class BatchTransport:
+    """
+    One provider's asynchronous batch endpoint.
+
+    ``request_line`` builds one JSONL line of a request file, ``submit``
+    sends a request file and returns the provider's batch id, ``status``
+    returns RUNNING or ENDED (expired / cancelled batches count as ended,
+    their finished requests are still returned) and ``results`` yields
+    every returned request.
+    """
+
+    name = 'base'
+
+    @classmethod
+    def available(cls) -> bool:
+        """Whether the installed SDK has this batch endpoint"""
+        return True
+
+    def request_line(self, custom_id: str, system_prompt: str, user_prompt: str,
+                     max_tokens: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def submit(self, path: str) -> str:
+        raise NotImplementedError
+
+    def status(self, batch_id: str) -> str:
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        raise NotImplementedError
+
+
+def _has_module(name: str) -> bool:
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+def _chat_request_line(custom_id: str, model: str, system_prompt: str, user_prompt: str,
+                       max_tokens: int) -> Dict[str, Any]:
+    return {
+        'custom_id': custom_id,
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': {
+            'model': model,
+            'messages': [
+                {'role': 'system', 'content': system_prompt},
+                {'role': 'user', 'content': user_prompt}
+            ],
+            'temperature': 0.3,
+            'max_tokens': max_tokens
+        }
+    }
+
+
+class OpenAIBatchTransport(BatchTransport):
+    """OpenAI Batch API: upload the JSONL file, create a 24 h batch, download the output file"""
+
+    name = 'openai'
+
+    @classmethod
+    def available(cls) -> bool:
+        return _has_module('openai.resources.batches')  # openai>=1.13
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: str = OpenAIClient.MODEL):
+        self.client = client_registry.get('openai', api_key, base_url or OpenAIClient.BASE_URL)
+        self.model = model
+
+    def request_line(self, custom_id, system_prompt, user_prompt, max_tokens):
+        return _chat_request_line(custom_id, self.model, system_prompt, user_prompt, max_tokens)
+
+    def submit(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            uploaded = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint='/v1/chat/completions',
+                                           completion_window='24h')
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        return ENDED if batch.status in ('completed', 'failed', 'expired', 'cancelled') else RUNNING
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    yield _parse_chat_result(json.loads(line))
+
+
+def _parse_chat_result(record: Dict[str, Any]) -> BatchResult:
+    response = record.get('response') or {}
+    if record.get('error') or response.get('status_code') != 200:
+        error = record.get('error') or response.get('body', {}).get('error') or response
+        return record['custom_id'], None, json.dumps(error, ensure_ascii=False)
+    return record['custom_id'], response['body']['choices'][0]['message']['content'], None
+
+
+class AnthropicBatchTransport(BatchTransport):
+    """Anthropic Message Batches API (the request file is sent as a request list)"""
+
+    name = 'anthropic'
+
+    @classmethod
+    def available(cls) -> bool:
+        return _has_module('anthropic.resources.messages.batches')  # anthropic>=0.40 (out of beta)
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: str = AnthropicClient.MODEL):
+        self.client = client_registry.get('anthropic', api_key, base_url or AnthropicClient.BASE_URL)
+        self.model = model
+
+    def request_line(self, custom_id, system_prompt, user_prompt, max_tokens):
+        return {
+            'custom_id': custom_id,
+            'params': {
+                'model': self.model,
+                'max_tokens': max_tokens,
+                'temperature': 0.3,
+                'system': system_prompt,
+                'messages': [{'role': 'user', 'content': user_prompt}]
+            }
+        }
+
+    def submit(self, path: str) -> str:
+        with open(path, encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        return self.client.messages.batches.create(requests=requests).id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.client.messages.batches.retrieve(batch_id)
+        return ENDED if batch.processing_status == 'ended' else RUNNING
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        for entry in self.client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == 'succeeded':
+                yield entry.custom_id, result.message.content[0].text, None
+            else:
+                error = getattr(result, 'error', None)
+                yield entry.custom_id, None, f"{result.type}: {error}" if error else result.type
+
+
+def fake_completion(system_prompt: str, user_prompt: str) -> str:
+    """Deterministic PSLR answer derived from the prompt (for the local transport)"""
+    digest = hashlib.sha256(user_prompt.encode('utf-8')).digest()
+    weights = [1 + b for b in digest[:4]]
+    values = [round(2.0 * w / sum(weights), 2) for w in weights]
+    return json.dumps(dict(zip('PSLR', values), reasoning='Local batch stand-in'))
+
+
+class LocalBatchTransport(BatchTransport):
+    """
+    In-process stand-in for a provider batch server.
+
+    Accepts OpenAI-format request files, "processes" them after
+    ``latency`` seconds with ``responder(system_prompt, user_prompt)`` and
+    keeps its state in memory, so it exercises the whole submit / poll /
+    results path without network access.
+    """
+
+    name = 'local'
+
+    def __init__(self, responder: Callable[[str, str], str] = fake_completion, latency: float = 0.0,
+                 model: str = 'local'):
+        self.responder = responder
+        self.latency = latency
+        self.model = model
+        self._batches: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def request_line(self, custom_id, system_prompt, user_prompt, max_tokens):
+        return _chat_request_line(custom_id, self.model, system_prompt, user_prompt, max_tokens)
+
+    def submit(self, path: str) -> str:
+        with open(path, encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch_id = f'batch_{uuid.uuid4().hex}'
+        with self._lock:
+            self._batches[batch_id] = (time.monotonic() + self.latency, requests)
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        with self._lock:
+            ready_at, _ = self._batches[batch_id]
+        return ENDED if time.monotonic() >= ready_at else RUNNING
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        with self._lock:
+            _, requests = self._batches[batch_id]
+        for request in requests:
+            messages = {m['role']: m['content'] for m in request['body']['messages']}
+            try:
+                yield request['custom_id'], self.responder(messages['system'], messages['user']), None
+            except Exception as e:
+                yield request['custom_id'], None, str(e)
+
+
+# Models whose providers offer a batch endpoint
+TRANSPORTS = {
+    'gpt-4o': OpenAIBatchTransport,
+    'claude': AnthropicBatchTransport,
+}
+
+_local_transport = LocalBatchTransport()
+
+
+def supports(model: str, kind: str = 'provider') -> bool:
+    """Whether ``model`` can run through a batch transport (``kind='local'`` covers every model)"""
+    if kind == 'local':
+        return True
+    transport = TRANSPORTS.get(model)
+    return transport is not None and transport.available()
+
+
+def get_transport(model: str, api_key: str, kind: str = 'provider',
+                  base_url: Optional[str] = None) -> Optional[BatchTransport]:
+    """Transport for ``model``, or None if it has no batch endpoint (or the SDK is too old for it)"""
+    if kind == 'local':
+        return _local_transport
+    if not supports(model, kind):
+        return None
+    return TRANSPORTS[model](api_key, base_url=base_url)
+
+
+def write_requests(path: str, lines: List[Dict[str, Any]]):
+    """Write a JSONL request file (kept next to the experiment for auditing)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Provider Rate Limiting for PSLR Analysis
+Token buckets (requests/min, tokens/min) and in-flight caps per provider
+"""
+
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+LIMIT_KEYS = ('rpm', 'tpm', 'concurrency')
+
+# Reservation on a token bucket: refill, take ``amount`` even if that goes
+# negative, and return how long the caller must wait for its turn (ms).
+# Borrowing against the future keeps waiters in arrival order.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+tokens = tokens - amount
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 60000)
+if tokens >= 0 then return 0 end
+return math.ceil(-tokens / rate * 1000)
+"""
+
+# Take ``amount`` only if the bucket holds it now; 1 if taken, 0 otherwise
+_TRY_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+local taken = 0
+if tokens >= amount then
+  tokens = tokens - amount
+  taken = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 60000)
+return taken
+"""
+
+# Credit back (or charge) the difference between estimated and actual tokens
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+  redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[2]), tokens + tonumber(ARGV[1]))))
+end
+return 0
+"""
+
+# In-flight leases: a sorted set of lease ids scored by expiry, so a worker
+# that dies mid-call only holds its slot until the lease runs out
+_LEASE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[1]) then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+  redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[2]))
+  return 1
+end
+return 0
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class MemoryBackend:
+    """Process-local buckets and in-flight counters (the ``memory://`` stand-in)"""
+
+    def __init__(self):
+        self._buckets: Dict[str, list] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def reserve(self, key: str, rate: float, capacity: float, amount: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [capacity, now])
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate) - amount
+            bucket[0], bucket[1] = tokens, now
+        return 0.0 if tokens >= 0 else -tokens / rate
+
+    def try_reserve(self, key: str, rate: float, capacity: float, amount: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [capacity, now])
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            taken = tokens >= amount
+            bucket[0], bucket[1] = tokens - amount if taken else tokens, now
+        return taken
+
+    def adjust(self, key: str, capacity: float, delta: float):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(capacity, bucket[0] + delta)
+
+    def acquire(self, key: str, limit: int, lease_ttl: float, poll_interval: float) -> str:
+        with self._released:
+            while self._in_flight.get(key, 0) >= limit:
+                self._released.wait()
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return key
+
+    def try_acquire(self, key: str, limit: int, lease_ttl: float) -> Optional[str]:
+        with self._released:
+            if self._in_flight.get(key, 0) >= limit:
+                return None
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return key
+
+    def release(self, key: str, lease: str):
+        with self._released:
+            self._in_flight[key] -= 1
+            self._released.notify()
+
+    def in_flight(self, key: str) -> int:
+        with self._lock:
+            return self._in_flight.get(key, 0)
+
+
+class RedisBackend:
+    """Buckets and leases in Redis, shared by every gunicorn worker"""
+
+    def __init__(self, url: str):
+        import redis
+        self.redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._reserve = self.redis.register_script(_RESERVE_SCRIPT)
+        self._try_reserve = self.redis.register_script(_TRY_RESERVE_SCRIPT)
+        self._adjust = self.redis.register_script(_ADJUST_SCRIPT)
+        self._lease = self.redis.register_script(_LEASE_SCRIPT)
+
+    def reserve(self, key: str, rate: float, capacity: float, amount: float) -> float:
+        # rate is per second; the script works in milliseconds of Redis server time
+        return int(self._reserve(keys=[key], args=[rate, capacity, amount])) / 1000.0
+
+    def try_reserve(self, key: str, rate: float, capacity: float, amount: float) -> bool:
+        return bool(int(self._try_reserve(keys=[key], args=[rate, capacity, amount])))
+
+    def adjust(self, key: str, capacity: float, delta: float):
+        self._adjust(keys=[key], args=[delta, capacity])
+
+    def acquire(self, key: str, limit: int, lease_ttl: float, poll_interval: float) -> str:
+        lease = uuid.uuid4().hex
+        while not int(self._lease(keys=[key], args=[limit, int(lease_ttl * 1000), lease])):
+            time.sleep(poll_interval)
+        return lease
+
+    def try_acquire(self, key: str, limit: int, lease_ttl: float) -> Optional[str]:
+        lease = uuid.uuid4().hex
+        return lease if int(self._lease(keys=[key], args=[limit, int(lease_ttl * 1000), lease])) else None
+
+    def release(self, key: str, lease: str):
+        self.redis.zrem(key, lease)
+
+    def in_flight(self, key: str) -> int:
+        return int(self.redis.zcount(key, int(time.time() * 1000), '+inf'))
+
+
+class Slot:
+    """
+    A granted provider call.
+
+    ``reserved`` tokens (prompt plus the full output budget, as providers
+    count them) were taken up front; ``complete()`` credits back what the
+    response did not use. A slot from ``try_slot()`` also holds its
+    in-flight lease until ``release()``.
+    """
+
+    def __init__(self, governor: Optional['ProviderGovernor'], provider: str,
+                 prompt_tokens: int = 0, reserved: int = 0):
+        self.governor = governor
+        self.provider = provider
+        self.prompt_tokens = prompt_tokens
+        self.reserved = reserved
+        self.waited = 0.0
+        self._lease = None  # (backend, key, lease) held by try_slot() slots
+
+    def complete(self, response_text: Optional[str]):
+        if self.governor is None:
+            return
+        used = self.prompt_tokens + (estimate_tokens(response_text) if response_text else 0)
+        self.governor._settle(self.provider, used - self.reserved)
+        self.reserved = used
+
+    def release(self):
+        if self._lease is not None:
+            backend, key, lease = self._lease
+            self._lease = None
+            try:
+                backend.release(key, lease)
+            except Exception:
+                pass  # Redis lease expires on its own
+
+
+class ProviderGovernor:
+    """
+    Per-provider requests/min, tokens/min and in-flight limits.
+
+    Callers over a limit wait for their turn instead of failing: each call
+    reserves one request and its estimated tokens from the provider's
+    buckets, sleeps until the reservation matures, then takes an in-flight
+    slot. Buckets hold ``burst`` seconds' worth of allowance. With a
+    ``redis://`` storage URL the buckets and slots are shared across
+    workers; if Redis is unreachable the governor falls back to the
+    process-local backend rather than blocking analyses.
+
+    ``limits`` maps provider name to ``{'rpm', 'tpm', 'concurrency'}``;
+    missing or zero values are unlimited, and providers not listed use
+    ``default``.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default: Optional[Dict[str, Any]] = None, storage_url: str = 'memory://',
+                 burst: float = 10.0, lease_ttl: float = 300.0, poll_interval: float = 0.05,
+                 prefix: str = 'pslr:rl:'):
+        self.limits = limits or {}
+        self.default = default or {}
+        self.burst = burst
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self.local = MemoryBackend()
+        self.backend = self.local
+        if storage_url and storage_url.startswith(('redis://', 'rediss://', 'unix://')):
+            try:
+                self.backend = RedisBackend(storage_url)
+            except ImportError:
+                self.backend = self.local
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ProviderGovernor':
+        default = {'rpm': config['RATELIMIT_RPM'], 'tpm': config['RATELIMIT_TPM'],
+                   'concurrency': config['RATELIMIT_CONCURRENCY']}
+        limits = json.loads(config['RATELIMIT_PROVIDER_LIMITS'] or '{}')
+        for provider, overrides in limits.items():
+            unknown = set(overrides) - set(LIMIT_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown rate limit for {provider}: {', '.join(sorted(unknown))}")
+            limits[provider] = dict(default, **overrides)
+        return cls(limits, default=default, storage_url=config['RATELIMIT_STORAGE_URL'],
+                   burst=config['RATELIMIT_BURST'])
+
+    def limits_for(self, provider: str) -> Dict[str, Any]:
+        return self.limits.get(provider, self.default)
+
+    def _call(self, method: str, *args):
+        """Run a backend operation, falling back to the local backend; returns (backend, result)"""
+        try:
+            return self.backend, getattr(self.backend, method)(*args)
+        except Exception:
+            if self.backend is self.local:
+                raise
+            return self.local, getattr(self.local, method)(*args)
+
+    @contextmanager
+    def slot(self, provider: str, prompt_tokens: int = 0, max_output_tokens: int = 0) -> Iterator[Slot]:
+        """Block until ``provider`` may take another call, then hold an in-flight slot"""
+        limits = self.limits_for(provider)
+        reserved = prompt_tokens + max_output_tokens
+        slot = Slot(self, provider, prompt_tokens, reserved)
+        started = time.monotonic()
+
+        wait = 0.0
+        for name, amount in (('rpm', 1), ('tpm', reserved)):
+            if limits.get(name) and amount:
+                rate = limits[name] / 60.0
+                key = f'{self.prefix}{provider}:{name}'
+                _, delay = self._call('reserve', key, rate, max(rate * self.burst, amount), amount)
+                wait = max(wait, delay)
+        if wait > 0:
+            time.sleep(wait)
+
+        backend, lease = None, None
+        lease_key = f'{self.prefix}{provider}:inflight'
+        if limits.get('concurrency'):
+            backend, lease = self._call('acquire', lease_key, int(limits['concurrency']),
+                                        self.lease_ttl, self.poll_interval)
+        slot.waited = time.monotonic() - started
+        self._record(provider, slot.waited)
+        try:
+            yield slot
+        finally:
+            if lease is not None:
+                try:
+                    backend.release(lease_key, lease)
+                except Exception:
+                    pass  # Redis lease expires on its own
+
+    def try_slot(self, provider: str, prompt_tokens: int = 0, max_output_tokens: int = 0) -> Optional[Slot]:
+        """
+        A slot only if ``provider`` has room right now, without waiting or
+        borrowing against its buckets (e.g. for a hedged duplicate call);
+        None otherwise. The caller must ``release()`` it.
+        """
+        limits = self.limits_for(provider)
+        reserved = prompt_tokens + max_output_tokens
+        slot = Slot(self, provider, prompt_tokens, reserved)
+
+        if limits.get('concurrency'):
+            lease_key = f'{self.prefix}{provider}:inflight'
+            backend, lease = self._call('try_acquire', lease_key, int(limits['concurrency']), self.lease_ttl)
+            if lease is None:
+                return None
+            slot._lease = (backend, lease_key, lease)
+
+        taken = []
+        for name, amount in (('rpm', 1), ('tpm', reserved)):
+            if limits.get(name) and amount:
+                rate = limits[name] / 60.0
+                key, capacity = f'{self.prefix}{provider}:{name}', max(rate * self.burst, amount)
+                if not self._call('try_reserve', key, rate, capacity, amount)[1]:
+                    for key, capacity, amount in taken:
+                        self._call('adjust', key, capacity, amount)
+                    slot.release()
+                    return None
+                taken.append((key, capacity, amount))
+        self._record(provider, 0.0)
+        return slot
+
+    def _settle(self, provider: str, delta: int):
+        limits = self.limits_for(provider)
+        if limits.get('tpm') and delta:
+            rate = limits['tpm'] / 60.0
+            self._call('adjust', f'{self.prefix}{provider}:tpm', max(rate * self.burst, 1), -delta)
+
+    def _record(self, provider: str, waited: float):
+        with self._lock:
+            stats = self._stats.setdefault(provider, {'calls': 0, 'waited': 0, 'wait_seconds': 0.0})
+            stats['calls'] += 1
+            if waited > 0.001:
+                stats['waited'] += 1
+                stats['wait_seconds'] += waited
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = {provider: dict(stats, wait_seconds=round(stats['wait_seconds'], 3))
+                         for provider, stats in self._stats.items()}
+        for provider, stats in providers.items():
+            stats['limits'] = self.limits_for(provider)
+            try:
+                stats['in_flight'] = self._call('in_flight', f'{self.prefix}{provider}:inflight')[1]
+            except Exception:
+                stats['in_flight'] = None
+        return {'backend': 'redis' if self.backend is not self.local else 'memory', 'providers': providers}
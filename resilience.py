@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Provider Resilience for PSLR Analysis
+Per-provider deadlines, hedged requests and circuit breakers
+"""
+
+import json
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class ProviderError(Exception):
+    """A provider call failed; ``provider`` names the provider (model key or SDK label)"""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(message)
+        self.provider = provider
+
+
+class ProviderTimeout(ProviderError):
+    """The provider did not answer within its deadline (or the SDK timed out)"""
+
+
+class CircuitOpenError(ProviderError):
+    """The provider's breaker is open, so the call was not attempted"""
+
+
+def is_timeout(error: BaseException) -> bool:
+    """True for timeouts from httpx, the provider SDKs, google-api-core or the stdlib"""
+    if isinstance(error, (TimeoutError, ProviderTimeout)):
+        return True
+    return any('Timeout' in cls.__name__ or cls.__name__ == 'DeadlineExceeded'
+               for cls in type(error).__mro__)
+
+
+def error_type(error: BaseException) -> str:
+    """Short machine-readable kind of a failed analysis"""
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    if is_timeout(error) or is_timeout(error.__cause__ or error):
+        return 'timeout'
+    return 'provider_error'
+
+
+def is_provider_fault(error: BaseException) -> bool:
+    """
+    Whether an error says the provider is unhealthy (timeouts, 5xx, 429,
+    connection failures) rather than the request being bad (other 4xx,
+    e.g. a user's invalid API key), so one bad key cannot open a breaker.
+    """
+    for e in (error, error.__cause__):
+        if e is None:
+            continue
+        if is_timeout(e):
+            return True
+        status = getattr(e, 'status_code', None) or getattr(e, 'code', None)
+        if isinstance(status, int) and 400 <= status < 500:
+            return status == 429
+        if isinstance(status, int):
+            return True
+    return True
+
+
+class LatencyWindow:
+    """Latencies of the last ``size`` successful calls, for the hedge delay"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    ``failure_threshold`` consecutive failures open it; after ``cooldown``
+    seconds one probe call is let through (half-open), and its outcome
+    closes or re-opens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at)) \
+                if self.state == self.OPEN else 0.0
+            return {'state': self.state, 'failures': self.failures, 'rejected': self.rejected,
+                    'retry_in': round(retry_in, 1)}
+
+
+class ProviderGuard:
+    """
+    Runs provider calls under a deadline, hedging and a per-provider breaker.
+
+    The call runs on a guard thread and the caller waits at most the
+    provider's deadline, so a hung connection no longer pins the request
+    thread until gunicorn kills it. If the call is still running after the
+    provider's recent ``hedge_quantile`` latency (never sooner than
+    ``hedge_min_delay``), one duplicate is sent and the first success wins.
+    Hedges are limited to ``hedge_budget`` of calls so a slow provider
+    cannot double its own load, and a caller can make each hedge ask for
+    its own admission (e.g. a rate-limiter slot) and skip it when there is
+    none. Abandoned attempts finish (or hit the SDK timeout) in the
+    background. Streams get the deadline and breaker but no hedging.
+    """
+
+    def __init__(self, deadline: float = 30.0, deadlines: Optional[Dict[str, float]] = None,
+                 hedge: bool = True, hedge_quantile: float = 0.95, hedge_min_delay: float = 0.5,
+                 hedge_budget: float = 0.1, failure_threshold: int = 5, cooldown: float = 30.0,
+                 max_workers: int = 32):
+        self.deadline = deadline
+        self.deadlines = deadlines or {}
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pslr-guard')
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyWindow] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ProviderGuard':
+        return cls(
+            deadline=config['PROVIDER_DEADLINE'],
+            deadlines=json.loads(config['PROVIDER_DEADLINES'] or '{}'),
+            hedge=config['HEDGE_ENABLED'],
+            hedge_quantile=config['HEDGE_QUANTILE'],
+            hedge_min_delay=config['HEDGE_MIN_DELAY'],
+            hedge_budget=config['HEDGE_BUDGET'],
+            failure_threshold=config['BREAKER_FAILURE_THRESHOLD'],
+            cooldown=config['BREAKER_COOLDOWN']
+        )
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                breaker = self._breakers[provider] = CircuitBreaker(self.failure_threshold, self.cooldown)
+                self._latency[provider] = LatencyWindow()
+                self._stats[provider] = {'calls': 0, 'hedged': 0, 'hedge_wins': 0, 'hedge_skipped': 0,
+                                         'timeouts': 0, 'errors': 0}
+            return breaker
+
+    def _count(self, provider: str, name: str):
+        with self._lock:
+            self._stats[provider][name] += 1
+
+    def rejects(self, provider: str) -> bool:
+        """True while the breaker is open and cooling down (does not use up the half-open probe)"""
+        snapshot = self.breaker(provider).snapshot()
+        return snapshot['state'] == CircuitBreaker.OPEN and snapshot['retry_in'] > 0
+
+    def check(self, provider: str):
+        """Raise CircuitOpenError if the provider's breaker rejects the call"""
+        if not self.breaker(provider).allow():
+            raise CircuitOpenError(provider, f"{provider} is failing; circuit open, retry later")
+
+    def record(self, provider: str, error: Optional[BaseException] = None, seconds: Optional[float] = None):
+        """Feed the outcome of a call made outside ``call()`` (e.g. a stream)"""
+        breaker = self.breaker(provider)
+        self._count(provider, 'calls')
+        if error is None:
+            breaker.record_success()
+            if seconds is not None:
+                self._latency[provider].add(seconds)
+        else:
+            self._record_error(provider, error)
+
+    def _record_error(self, provider: str, error: BaseException):
+        if is_provider_fault(error):
+            self.breaker(provider).record_failure()
+        else:
+            self.breaker(provider).record_success()  # the provider answered, the request was bad
+        self._count(provider, 'timeouts' if is_timeout(error) else 'errors')
+
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        if not self.hedge:
+            return None
+        with self._lock:
+            stats = self._stats[provider]
+            if stats['hedged'] >= self.hedge_budget * max(stats['calls'], 1):
+                return None
+        p = self._latency[provider].quantile(self.hedge_quantile)
+        return None if p is None else max(p, self.hedge_min_delay)
+
+    def call(self, provider: str, fn: Callable[[], Any],
+             hedge: Optional[Callable[[], Optional[Callable[[], Any]]]] = None) -> Any:
+        """
+        Run ``fn`` with the provider's deadline, hedging and breaker.
+
+        ``hedge`` is asked for the duplicate when it is due and returns the
+        callable to run, or None to skip hedging this call (without it the
+        duplicate is ``fn`` itself).
+        """
+        self.check(provider)
+        breaker = self.breaker(provider)
+        deadline = self.deadlines.get(provider, self.deadline)
+        started = time.monotonic()
+        end = started + deadline
+
+        def attempt(run=fn):
+            begun = time.monotonic()
+            return run(), time.monotonic() - begun
+
+        primary = self.executor.submit(attempt)
+        pending = {primary}
+        hedge_at = self._hedge_delay(provider)
+        error: Optional[BaseException] = None
+
+        while pending:
+            now = time.monotonic()
+            hedge_pending = hedge_at is not None and len(pending) == 1 and primary in pending
+            timeout = min(end, started + hedge_at) - now if hedge_pending else end - now
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                self._count(provider, 'calls')
+                if future is not primary:
+                    self._count(provider, 'hedge_wins')
+                breaker.record_success()
+                self._latency[provider].add(seconds)
+                return result
+            if time.monotonic() >= end:
+                break
+            if hedge_pending and not done:
+                hedge_at = None
+                duplicate = hedge() if hedge is not None else fn
+                if duplicate is None:
+                    self._count(provider, 'hedge_skipped')
+                    continue
+                self._count(provider, 'hedged')
+                pending.add(self.executor.submit(attempt, duplicate))
+
+        self._count(provider, 'calls')
+        if error is not None and not pending:
+            self._record_error(provider, error)
+            raise error
+        breaker.record_failure()
+        self._count(provider, 'timeouts')
+        raise ProviderTimeout(provider, f"{provider} did not respond within {deadline:g}s")
+
+    def stream(self, provider: str, fn: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """
+        Iterate ``fn()`` on a guard thread under the provider's deadline and breaker.
+
+        The deadline covers the whole stream; if the provider stalls past
+        it, ProviderTimeout is raised here and the pump thread stops at its
+        next item (or when the SDK times out).
+        """
+        self.check(provider)
+        deadline = self.deadlines.get(provider, self.deadline)
+        started = time.monotonic()
+        end = started + deadline
+        items: queue.Queue = queue.Queue()
+        finished = object()
+        abandoned = threading.Event()
+
+        def pump():
+            iterator = fn()
+            try:
+                for item in iterator:
+                    if abandoned.is_set():
+                        break
+                    items.put((item, None))
+                items.put((finished, None))
+            except Exception as e:
+                items.put((finished, e))
+            finally:
+                close = getattr(iterator, 'close', None)
+                if close is not None:
+                    close()
+
+        self.executor.submit(pump)
+        try:
+            while True:
+                try:
+                    item, error = items.get(timeout=max(end - time.monotonic(), 0))
+                except queue.Empty:
+                    self._count(provider, 'calls')
+                    self.breaker(provider).record_failure()
+                    self._count(provider, 'timeouts')
+                    raise ProviderTimeout(provider, f"{provider} did not finish streaming within {deadline:g}s")
+                if item is finished:
+                    if error is not None:
+                        self.record(provider, error=error)
+                        raise error
+                    self.record(provider, seconds=time.monotonic() - started)
+                    return
+                yield item
+        finally:
+            abandoned.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = list(self._breakers)
+        result = {}
+        for provider in providers:
+            p = self._latency[provider].quantile(self.hedge_quantile)
+            with self._lock:
+                stats = dict(self._stats[provider])
+            result[provider] = dict(
+                self._breakers[provider].snapshot(),
+                deadline=self.deadlines.get(provider, self.deadline),
+                hedge_delay_ms=None if p is None else round(max(p, self.hedge_min_delay) * 1000),
+                **stats
+            )
+        return result
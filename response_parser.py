@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response Parser for PSLR Analysis
+Linear-time extraction of JSON objects/arrays from free-form LLM output
+"""
+
+import re
+import json
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+_CLOSERS = {'}': '{', ']': '['}
+_DECODER = json.JSONDecoder()
+
+# Only brackets and quotes matter to the scanner; everything else is skipped in C
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+# Remainder of a JSON string literal after its opening quote (unrolled, no backtracking blow-up)
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Cheap pre-check for strip_trailing_commas (may also match inside strings)
+_TRAILING_COMMA = re.compile(r',\s*[}\]]')
+
+# How many levels below a block that failed to parse are still tried on their own
+MAX_RETRY_LEVELS = 3
+
+
+def find_json_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Return (start, end) spans of every balanced {...} / [...] block in ``text``.
+
+    See _scan_spans for the scan; this drops the nesting levels.
+    """
+    return [(start, end) for start, end, _ in _scan_spans(text)]
+
+
+def _scan_spans(text: str) -> List[Tuple[int, int, int]]:
+    """
+    Return (start, end, level) of every balanced {...} / [...] block in ``text``.
+
+    The text is scanned once, jumping between bracket and quote characters
+    with a bracket stack. String literals are only skipped inside a
+    candidate block, so apostrophes and quotes in the surrounding prose (or
+    markdown fences) cannot desynchronise the scan, and braces inside JSON
+    strings (e.g. in the reasoning) are ignored. Spans are ordered by start
+    position, outermost first; ``level`` is the number of enclosing blocks.
+    """
+    spans = []
+    stack: List[Tuple[str, int]] = []
+    pos = 0
+
+    while True:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            break
+        ch, i = match.group(), match.start()
+        pos = i + 1
+
+        if ch == '"':
+            if stack:
+                tail = _STRING_TAIL.match(text, pos)
+                if tail is None:
+                    break  # unterminated string: nothing after it can close
+                pos = tail.end()
+        elif ch == '{' or ch == '[':
+            stack.append((ch, i))
+        elif stack and stack[-1][0] == _CLOSERS[ch]:
+            spans.append((stack.pop()[1], pos, len(stack)))
+
+    spans.sort()
+    return spans
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket (outside of strings)"""
+    out = []
+    in_string = False
+    escaped = False
+    pending_comma = None
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if pending_comma is not None:
+            if ch.isspace():
+                pending_comma.append(ch)
+                continue
+            if ch not in '}]':
+                out.append(',')
+            out.extend(pending_comma[1:])
+            pending_comma = None
+
+        if ch == ',':
+            pending_comma = [',']
+            continue
+        if ch == '"':
+            in_string = True
+        out.append(ch)
+
+    if pending_comma is not None:
+        out.extend(pending_comma)
+    return ''.join(out)
+
+
+def loads_lenient(text: str) -> Any:
+    """json.loads that also accepts trailing commas"""
+    try:
+        return json.loads(text)
+    except RecursionError:
+        raise ValueError("JSON nested too deeply")
+    except ValueError:
+        # The pure-Python comma pass only runs when there is a comma to strip
+        if _TRAILING_COMMA.search(text) is None:
+            raise
+        try:
+            return json.loads(strip_trailing_commas(text))
+        except RecursionError:
+            raise ValueError("JSON nested too deeply")
+
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """
+    Yield every parseable top-level JSON value found in ``text``.
+
+    Blocks inside one that failed to parse are still tried (e.g. the
+    complete elements of a malformed array), but only down to
+    MAX_RETRY_LEVELS below the outermost failed block. Each level tried
+    costs at most one pass over the text, so prose full of nested
+    unbalanced braces stays linear instead of re-parsing every nested span.
+    """
+    covered_until = -1
+    failed_level = None  # level of the outermost failed block we are inside
+    failed_end = -1
+    for start, end, level in _scan_spans(text):
+        # Blocks nested inside one that already parsed are part of it
+        if start < covered_until:
+            continue
+        if start >= failed_end:
+            failed_level = None
+        elif level - failed_level > MAX_RETRY_LEVELS:
+            continue
+        try:
+            value = loads_lenient(text[start:end])
+        except ValueError:
+            if failed_level is None:
+                failed_level, failed_end = level, end
+            continue
+        covered_until = end
+        yield value
+
+
+def extract_json(text: str, predicate: Optional[Callable[[Any], bool]] = None) -> Any:
+    """Return the first JSON value in ``text`` accepted by ``predicate``"""
+    for value in iter_json_values(text):
+        if predicate is None or predicate(value):
+            return value
+    raise ValueError("No JSON found in response")
+
+
+def find_pslr_object(value: Any) -> Optional[dict]:
+    """Locate the dict carrying P/S/L/R keys, allowing one wrapper level"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        if any(key in value for key in ('P', 'S', 'L', 'R')):
+            return value
+        for nested in value.values():
+            if isinstance(nested, dict) and any(key in nested for key in ('P', 'S', 'L', 'R')):
+                return nested
+    return None
+
+
+def extract_pslr(text: str) -> dict:
+    """Return the P/S/L/R object from an LLM response"""
+    # Fast path: well-formed JSON starting at the first brace decodes entirely in C
+    start = text.find('{')
+    if start >= 0:
+        try:
+            found = find_pslr_object(_DECODER.raw_decode(text, start)[0])
+            if found is not None:
+                return found
+        except (ValueError, RecursionError):
+            pass
+
+    for value in iter_json_values(text):
+        found = find_pslr_object(value)
+        if found is not None:
+            return found
+    raise ValueError("No JSON found in response")
+
+
+def _is_pslr(value: Any) -> bool:
+    return isinstance(value, dict) and any(key in value for key in ('P', 'S', 'L', 'R'))
+
+
+def extract_pslr_list(text: str) -> List[dict]:
+    """
+    Return the P/S/L/R objects of a packed (JSON array) response, in order.
+
+    Accepts a bare array or one wrapped in an object. If the array is cut
+    off (output token limit) or otherwise malformed, the elements that are
+    complete objects are still returned, so one bad element does not lose
+    the whole pack.
+    """
+    items = []
+    for value in iter_json_values(text):
+        if isinstance(value, dict) and not _is_pslr(value):
+            value = next((nested for nested in value.values() if isinstance(nested, list)), value)
+        if isinstance(value, list):
+            found = [item for item in value if _is_pslr(item)]
+            if found:
+                return found
+        elif _is_pslr(value):
+            items.append(value)
+    if not items:
+        raise ValueError("No JSON found in response")
+    return items
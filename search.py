@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concept Search for PSLR Platform
+Indexed substring / prefix search over the distinct-concept dictionary
+
+Search runs against pslr_concept_stats (one row per concept, maintained on
+insert) instead of pslr_analysis, so the index stays small:
+- PostgreSQL: pg_trgm GIN index, ranked by similarity()
+- SQLite: FTS5 trigram shadow table kept in sync by triggers
+Matching concepts are then joined to analyses through the B-tree index on
+pslr_analysis.concept. Other backends fall back to LIKE on the dictionary.
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import case, func, literal, literal_column, select, text
+from sqlalchemy.exc import OperationalError
+
+from models import db, PSLRAnalysis, ConceptStat
+
+FTS_TABLE = 'pslr_concept_fts'
+
+# Trigram indexes cannot serve patterns shorter than one trigram
+MIN_INDEXED_LENGTH = 3
+
+SQLITE_FTS_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"concept, content='pslr_concept_stats', content_rowid='rowid', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON pslr_concept_stats BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, concept) VALUES (new.rowid, new.concept); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON pslr_concept_stats BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, concept) VALUES ('delete', old.rowid, old.concept); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF concept ON pslr_concept_stats BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, concept) VALUES ('delete', old.rowid, old.concept); "
+    f"INSERT INTO {FTS_TABLE}(rowid, concept) VALUES (new.rowid, new.concept); END",
+]
+
+_CONCEPT_ROWID = literal_column('pslr_concept_stats.rowid')
+
+_fts_available = {}
+
+
+def ensure_search_index():
+    """
+    Create the SQLite FTS5 shadow table for dev databases (PostgreSQL uses the migration).
+    
+    SQLite builds without FTS5 or older than 3.34 (no trigram tokenizer)
+    cannot create it; search then falls back to LIKE instead of failing
+    startup.
+    """
+    if db.engine.dialect.name != 'sqlite' or _has_fts():
+        return
+    try:
+        with db.engine.begin() as connection:
+            for statement in SQLITE_FTS_DDL:
+                connection.execute(text(statement))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    except OperationalError:
+        _fts_available[str(db.engine.url)] = False
+        return
+    _fts_available.clear()
+
+
+def _has_fts() -> bool:
+    url = str(db.engine.url)
+    if url not in _fts_available:
+        with db.engine.connect() as connection:
+            _fts_available[url] = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': FTS_TABLE}
+            ).first() is not None
+    return _fts_available[url]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _matching_concepts(term: str, mode: str = 'contains'):
+    """SELECT of ConceptStat rows matching ``term`` using the backend's index"""
+    prefix = _escape_like(term) + '%'
+    pattern = prefix if mode == 'prefix' else '%' + _escape_like(term) + '%'
+    stmt = select(ConceptStat.concept, ConceptStat.count)
+    dialect = db.engine.dialect.name
+    
+    if dialect == 'postgresql':
+        # ILIKE is served by the gin_trgm_ops index
+        return stmt.where(ConceptStat.concept.ilike(pattern, escape='\\'))
+    
+    if dialect == 'sqlite' and len(term) >= MIN_INDEXED_LENGTH and _has_fts():
+        fts_rows = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :phrase") \
+            .bindparams(phrase=_fts_phrase(term))
+        stmt = stmt.where(_CONCEPT_ROWID.in_(fts_rows))
+        if mode == 'prefix':
+            stmt = stmt.where(ConceptStat.concept.ilike(prefix, escape='\\'))
+        return stmt
+    
+    return stmt.where(ConceptStat.concept.ilike(pattern, escape='\\'))
+
+
+def concept_filter(term: str, mode: str = 'contains'):
+    """WHERE clause restricting PSLRAnalysis rows to concepts matching ``term``"""
+    concepts = _matching_concepts(term, mode).with_only_columns(ConceptStat.concept)
+    return PSLRAnalysis.concept.in_(concepts.scalar_subquery())
+
+
+def search_concepts(term: str, mode: str = 'contains', limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Ranked concept search for autocomplete.
+    
+    Exact matches rank first, then prefix matches, then (on PostgreSQL)
+    trigram similarity, shorter concepts and finally analysis count.
+    """
+    term = term.strip()
+    if not term:
+        return []
+    
+    lowered = func.lower(ConceptStat.concept)
+    exact = case((lowered == term.lower(), 2),
+                 (ConceptStat.concept.ilike(_escape_like(term) + '%', escape='\\'), 1),
+                 else_=0)
+    if db.engine.dialect.name == 'postgresql':
+        similarity = func.similarity(ConceptStat.concept, term)
+    else:
+        similarity = literal(0.0)
+    
+    stmt = _matching_concepts(term, mode).add_columns(exact.label('tier'), similarity.label('similarity')) \
+        .order_by(exact.desc(), similarity.desc(), func.length(ConceptStat.concept), ConceptStat.count.desc()) \
+        .limit(limit)
+    
+    return [{
+        'concept': row.concept,
+        'count': row.count,
+        'score': round(row.tier + float(row.similarity or 0), 4)
+    } for row in db.session.execute(stmt)]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Similar Concepts for PSLR Platform
+Grid spatial index over per-(concept, model) mean PSLR vectors
+"""
+
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analytics import PairMeans, _vector_dict
+
+POOLED = '*'
+
+
+class GridIndex:
+    """
+    Uniform grid over 4-D points with exact k-nearest-neighbour queries.
+    
+    Points are bucketed by ``floor(v / cell)``. A query scans Chebyshev
+    rings of cells around the query cell and stops once the k-th best
+    distance is no larger than the distance to the nearest unscanned ring,
+    so typical queries touch a handful of cells. Moving a point is O(1).
+    """
+    
+    def __init__(self, cell: float = 0.1):
+        self.cell = cell
+        self.cells: Dict[Tuple[int, ...], set] = {}
+        self.points: Dict[int, np.ndarray] = {}
+        self._keys: Dict[int, Tuple[int, ...]] = {}
+        # Bounding box of occupied cells (only grows), bounds the ring search
+        self._lo: Optional[List[int]] = None
+        self._hi: Optional[List[int]] = None
+    
+    def __len__(self):
+        return len(self.points)
+    
+    def _key(self, point: np.ndarray) -> Tuple[int, ...]:
+        return tuple(int(math.floor(x / self.cell)) for x in point)
+    
+    def upsert(self, item: int, point: np.ndarray):
+        key = self._key(point)
+        old = self._keys.get(item)
+        if old is not None and old != key:
+            bucket = self.cells[old]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[old]
+        self.cells.setdefault(key, set()).add(item)
+        self._keys[item] = key
+        self.points[item] = point
+        if self._lo is None:
+            self._lo, self._hi = list(key), list(key)
+        else:
+            self._lo = [min(a, b) for a, b in zip(self._lo, key)]
+            self._hi = [max(a, b) for a, b in zip(self._hi, key)]
+    
+    def _ring(self, center: Tuple[int, ...], r: int):
+        if r == 0:
+            return [center] if center in self.cells else []
+        # Enumerating the shell is (2r+1)^4 - (2r-1)^4 cells; past that, filter occupied cells instead
+        if (2 * r + 1) ** 4 - (2 * r - 1) ** 4 > len(self.cells):
+            return [key for key in self.cells
+                    if max(abs(a - b) for a, b in zip(key, center)) == r]
+        ring = []
+        for offset in itertools.product(range(-r, r + 1), repeat=len(center)):
+            if max(abs(o) for o in offset) == r:
+                key = tuple(c + o for c, o in zip(center, offset))
+                if key in self.cells:
+                    ring.append(key)
+        return ring
+    
+    def query(self, point: np.ndarray, k: int, exclude: Optional[int] = None) -> List[Tuple[float, int]]:
+        """Up to ``k`` (distance, item) pairs, nearest first (Euclidean)"""
+        if not self.cells:
+            return []
+        center = self._key(point)
+        max_ring = max(max(c - lo, hi - c) for c, lo, hi in zip(center, self._lo, self._hi))
+        items = np.empty(0, dtype=np.int64)
+        distances = np.empty(0)
+        for r in range(max_ring + 1):
+            ring = [item for key in self._ring(center, r) for item in self.cells[key] if item != exclude]
+            if ring:
+                # One vectorised distance pass per ring, then keep the k best so far
+                points = np.array([self.points[item] for item in ring])
+                items = np.concatenate([items, ring])
+                distances = np.concatenate([distances, np.sqrt(((points - point) ** 2).sum(axis=1))])
+                if len(items) > k:
+                    keep = np.argpartition(distances, k - 1)[:k]
+                    items, distances = items[keep], distances[keep]
+            # Anything beyond ring r is at least r cells away along some axis
+            if len(items) >= k and distances.max() <= r * self.cell:
+                break
+        order = np.lexsort((items, distances))
+        return [(float(distances[i]), int(items[i])) for i in order]
+
+
+class SimilarityIndex:
+    """
+    Nearest concepts per model over PairMeans, plus a pooled all-model index.
+    
+    Grids are updated in place from PairMeans change notifications, so new
+    analyses only move the cells they touched.
+    """
+    
+    def __init__(self, pair_means: PairMeans, cell: float = 0.1):
+        self.pair_means = pair_means
+        self.cell = cell
+        self.grids: Dict[str, GridIndex] = {}
+        pair_means.subscribe(self._on_change)
+    
+    def _on_change(self, model_idx: np.ndarray, concept_idx: np.ndarray):
+        means = self.pair_means
+        for m, c in zip(model_idx.tolist(), concept_idx.tolist()):
+            grid = self.grids.setdefault(means.models[m], GridIndex(self.cell))
+            grid.upsert(c, means.means(m, c))
+        
+        n_models = len(means.models)
+        pooled = self.grids.setdefault(POOLED, GridIndex(self.cell))
+        for c in np.unique(concept_idx).tolist():
+            counts = means.counts[:n_models, c]
+            pooled.upsert(c, means.sums[:n_models, c].sum(axis=0) / max(counts.sum(), 1))
+    
+    def query(self, concept: str, model: Optional[str] = None, k: int = 10) -> Optional[Dict[str, Any]]:
+        """Concepts whose mean vector under ``model`` is closest to ``concept``'s; None if unknown"""
+        means = self.pair_means
+        with means.lock:
+            grid = self.grids.get(model or POOLED)
+            c = means.concept_id(concept)
+            if grid is None or c is None or c not in grid.points:
+                return None
+            point = grid.points[c]
+            neighbours = grid.query(point, k, exclude=c)
+            
+            if model:
+                m = means.model_id(model)
+                count = lambda i: int(means.counts[m, i])
+            else:
+                count = lambda i: int(means.counts[:len(means.models), i].sum())
+            
+            return {
+                'concept': concept,
+                'model': model or POOLED,
+                'vector': _vector_dict(point),
+                'count': count(c),
+                'neighbors': [{
+                    'concept': means.concepts[i],
+                    'distance': round(distance, 6),
+                    'vector': _vector_dict(grid.points[i]),
+                    'count': count(i)
+                } for distance, i in neighbours]
+            }
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-flight Request Coalescing for PSLR Analysis
+Concurrent identical calls share one in-flight execution
+"""
+
+import json
+import time
+import uuid
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    """One in-flight execution that followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.shared = False
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    Within a process the first caller (the leader) runs the function while
+    later callers block on its result. When ``redis_url`` is set the leader
+    also takes a short-lived Redis lock and publishes its result, so leaders
+    in other gunicorn workers wait for it instead of issuing the same call.
+    If the remote leader disappears without publishing, the waiter runs the
+    call itself, so coalescing never turns into a failed analysis.
+
+    Only results accepted by ``share`` are handed to followers or published
+    to Redis. When the leader fails (an error result or an exception, e.g.
+    from its own bad API key), every follower makes its own call instead.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, lock_ttl: float = 120,
+                 result_ttl: float = 30, poll_interval: float = 0.1,
+                 prefix: str = 'pslr:sf:'):
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self.redis = None
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            except ImportError:
+                self.redis = None
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'local_shared': 0, 'remote_shared': 0, 'leader_failures': 0}
+
+    def do(self, key: str, fn: Callable[[], Any],
+           share: Callable[[Any], bool] = lambda result: True) -> Tuple[Any, bool]:
+        """Run ``fn`` once per key across concurrent callers; returns (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if not call.shared:
+                self._count('leader_failures')
+                return fn(), False
+            self._count('local_shared')
+            return call.result, True
+
+        try:
+            call.result, shared = self._run_leader(key, fn, share)
+            call.shared = shared or share(call.result)
+            return call.result, shared
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_leader(self, key: str, fn: Callable[[], Any], share: Callable[[Any], bool]) -> Tuple[Any, bool]:
+        if self.redis is None:
+            self._count('leaders')
+            return fn(), False
+
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        lock_key, result_key = self.prefix + 'lock:' + digest, self.prefix + 'result:' + digest
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception:
+            acquired = True  # Redis unavailable: behave as a process-local leader
+            token = None
+
+        if not acquired:
+            result = self._wait_remote(lock_key, result_key)
+            if result is not None:
+                self._count('remote_shared')
+                return result, True
+            # The remote leader died or timed out; do the work here instead
+            self._count('leaders')
+            return fn(), False
+
+        self._count('leaders')
+        try:
+            result = fn()
+            if token is not None and share(result):
+                try:
+                    self.redis.setex(result_key, int(self.result_ttl), json.dumps(result))
+                except Exception:
+                    pass
+            return result, False
+        finally:
+            if token is not None:
+                self._release(lock_key, token)
+
+    def _wait_remote(self, lock_key: str, result_key: str) -> Optional[Any]:
+        deadline = time.monotonic() + self.lock_ttl
+        while time.monotonic() < deadline:
+            try:
+                raw = self.redis.get(result_key)
+                if raw is not None:
+                    return json.loads(raw)
+                if not self.redis.exists(lock_key):
+                    raw = self.redis.get(result_key)
+                    return json.loads(raw) if raw is not None else None
+            except Exception:
+                return None
+            time.sleep(self.poll_interval)
+        return None
+
+    def _release(self, lock_key: str, token: str):
+        # Only delete the lock if it is still ours (it may have expired and been re-taken)
+        script = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+        try:
+            self.redis.eval(script, 1, lock_key, token)
+        except Exception:
+            pass
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        stats['shared'] = self.redis is not None
+        return stats
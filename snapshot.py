@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vector Snapshots for PSLR Platform
+Append-only memory-mapped columnar snapshot of stored PSLR vectors
+"""
+
+import os
+import json
+import fcntl
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import select
+
+from models import db, PSLRAnalysis
+
+SNAPSHOT_VERSION = 1
+
+# Column file -> (dtype, values per row); all little-endian so files are portable
+COLUMN_FILES = {
+    'ids': ('<i8', 1),
+    'vectors': ('<f4', 4),
+    'model_ids': ('<i4', 1),
+    'concept_ids': ('<i4', 1),
+    'language_ids': ('<i4', 1),
+}
+META_FILE = 'meta.json'
+LOCK_FILE = '.lock'
+
+
+class Snapshot:
+    """
+    A loaded snapshot: zero-copy ``np.memmap`` columns plus the label dictionary.
+    
+    ``vectors`` is (rows, 4) float32 in P, S, L, R order; ``model_ids``,
+    ``concept_ids`` and ``language_ids`` index into ``models``, ``concepts``
+    and ``languages``.
+    """
+    
+    def __init__(self, path: str, meta: Dict[str, Any], columns: Dict[str, np.ndarray],
+                 dictionary: Dict[str, List[str]]):
+        self.path = path
+        self.meta = meta
+        self.ids = columns['ids']
+        self.vectors = columns['vectors']
+        self.model_ids = columns['model_ids']
+        self.concept_ids = columns['concept_ids']
+        self.language_ids = columns['language_ids']
+        self.models = np.array(dictionary['models'], dtype=object)
+        self.concepts = np.array(dictionary['concepts'], dtype=object)
+        self.languages = np.array(dictionary['languages'], dtype=object)
+    
+    def __len__(self):
+        return self.meta['rows']
+    
+    def to_columns(self):
+        """View as analytics.VectorColumns (no copy of the vectors)"""
+        from analytics import VectorColumns
+        return VectorColumns(self.vectors, self.model_ids, self.models, self.concept_ids, self.concepts)
+
+
+def _read_json(path: str, default=None):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _column_path(path: str, name: str, generation: int) -> str:
+    return os.path.join(path, f'{name}.{generation}.bin')
+
+
+def _dictionary_path(path: str, generation: int) -> str:
+    return os.path.join(path, f'dictionary.{generation}.json')
+
+
+def load(path: str) -> Snapshot:
+    """Memory-map a snapshot directory; only ``meta['rows']`` rows are visible"""
+    meta = _read_json(os.path.join(path, META_FILE))
+    if meta is None:
+        raise FileNotFoundError(f"No snapshot in {path}")
+    dictionary = _read_json(_dictionary_path(path, meta['generation']))
+    rows = meta['rows']
+    
+    columns = {}
+    for name, (dtype, width) in COLUMN_FILES.items():
+        shape = (rows, width) if width > 1 else (rows,)
+        if rows == 0:
+            columns[name] = np.empty(shape, dtype=dtype)
+        else:
+            columns[name] = np.memmap(_column_path(path, name, meta['generation']), dtype=dtype,
+                                      mode='r', shape=shape)
+    return Snapshot(path, meta, columns, dictionary)
+
+
+@contextmanager
+def _writer_lock(path: str):
+    # One refresher at a time across workers / cron runs
+    with open(os.path.join(path, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def refresh(path: str, full: bool = False, chunk_size: int = 50000, lookback: int = 5000) -> Dict[str, Any]:
+    """
+    Append PSLRAnalysis rows with ``id`` above the snapshot watermark.
+    
+    IDs are not committed in order under concurrent writers, so the last
+    ``lookback`` ids below the watermark are re-read and the rows not yet in
+    the snapshot are appended too (rows are therefore only roughly in id
+    order). A row committed more than ``lookback`` ids late is only picked
+    up by ``full=True``.
+    
+    Column files are appended first and ``meta.json`` (row count and
+    watermark) is replaced atomically last, so readers never see a partial
+    refresh; bytes past ``meta['rows']`` left by an interrupted refresh are
+    truncated on the next one. Label ids are append-only and stay stable
+    across refreshes. Rows updated or deleted after they were snapshotted
+    are only picked up by ``full=True``, which writes a new generation of
+    column files so existing readers keep their mappings.
+    """
+    os.makedirs(path, exist_ok=True)
+    with _writer_lock(path):
+        previous = _read_json(os.path.join(path, META_FILE))
+        if previous is None or full:
+            meta = {'version': SNAPSHOT_VERSION, 'rows': 0, 'last_id': 0,
+                    'generation': previous['generation'] + 1 if previous else 1,
+                    'columns': {name: {'dtype': dtype, 'width': width}
+                                for name, (dtype, width) in COLUMN_FILES.items()}}
+            dictionary = {'models': [], 'concepts': [], 'languages': []}
+        else:
+            meta = dict(previous)
+            dictionary = _read_json(_dictionary_path(path, meta['generation']))
+        lookups = {key: {label: i for i, label in enumerate(labels)} for key, labels in dictionary.items()}
+        
+        horizon = max(meta['last_id'] - lookback, 0)
+        seen = np.empty(0, dtype='<i8')
+        if meta['rows']:
+            ids = np.fromfile(_column_path(path, 'ids', meta['generation']), dtype='<i8', count=meta['rows'])
+            seen = ids[ids > horizon]
+        
+        files = {}
+        for name, (dtype, width) in COLUMN_FILES.items():
+            f = open(_column_path(path, name, meta['generation']), 'r+b' if meta['rows'] else 'w+b')
+            f.truncate(meta['rows'] * width * np.dtype(dtype).itemsize)
+            f.seek(0, os.SEEK_END)
+            files[name] = f
+        
+        stmt = select(PSLRAnalysis.id, PSLRAnalysis.model, PSLRAnalysis.concept, PSLRAnalysis.language,
+                      PSLRAnalysis.p_value, PSLRAnalysis.s_value, PSLRAnalysis.l_value, PSLRAnalysis.r_value) \
+            .where(PSLRAnalysis.id > horizon).order_by(PSLRAnalysis.id)
+        result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        
+        added = 0
+        try:
+            for partition in result.partitions():
+                if len(seen):
+                    fresh = ~np.isin(np.fromiter((row[0] for row in partition), dtype='<i8'), seen)
+                    partition = [row for row, keep in zip(partition, fresh) if keep]
+                    if not partition:
+                        continue
+                ids, models, concepts, languages, *values = zip(*partition)
+                arrays = {
+                    'ids': np.array(ids, dtype='<i8'),
+                    'vectors': np.array(values, dtype='<f4').T,
+                    'model_ids': _encode(models, 'models', dictionary, lookups),
+                    'concept_ids': _encode(concepts, 'concepts', dictionary, lookups),
+                    'language_ids': _encode(languages, 'languages', dictionary, lookups),
+                }
+                for name, array in arrays.items():
+                    np.ascontiguousarray(array).tofile(files[name])
+                added += len(ids)
+                meta['last_id'] = max(meta['last_id'], int(ids[-1]))
+        finally:
+            for f in files.values():
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+        db.session.commit()
+        
+        meta['rows'] += added
+        meta['updated_at'] = datetime.utcnow().isoformat()
+        _write_json_atomic(_dictionary_path(path, meta['generation']), dictionary)
+        _write_json_atomic(os.path.join(path, META_FILE), meta)
+        
+        # Mappings of a replaced generation stay valid after unlink
+        if previous is not None and previous['generation'] != meta['generation']:
+            stale = [_column_path(path, name, previous['generation']) for name in COLUMN_FILES]
+            for stale_path in stale + [_dictionary_path(path, previous['generation'])]:
+                try:
+                    os.remove(stale_path)
+                except FileNotFoundError:
+                    pass
+    
+    return {'added': added, 'rows': meta['rows'], 'last_id': meta['last_id']}
+
+
+def _encode(labels, key: str, dictionary: Dict[str, List[str]], lookups: Dict[str, Dict[str, int]]) -> np.ndarray:
+    lookup = lookups[key]
+    codes = np.empty(len(labels), dtype='<i4')
+    for i, label in enumerate(labels):
+        code = lookup.get(label)
+        if code is None:
+            code = lookup[label] = len(dictionary[key])
+            dictionary[key].append(label)
+        codes[i] = code
+    return codes
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental Platform Statistics for PSLR Platform
+Counters maintained on insert so /api/stats is a single-row read
+"""
+
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select, update, delete
+
+from models import db, PSLRAnalysis, PlatformStats, ConceptStat, ModelStat
+
+STATS_ROW_ID = 1
+
+
+def _insert_ignore(connection, table, values: Dict) -> bool:
+    """Insert a row unless its key exists; True if a new row was created"""
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        exists = connection.execute(
+            select(func.count()).select_from(table).filter_by(**values)
+        ).scalar()
+        if exists:
+            return False
+        connection.execute(insert(table).values(**values))
+        return True
+    result = connection.execute(dialect_insert(table).values(**values).on_conflict_do_nothing())
+    return result.rowcount == 1
+
+
+def record_inserts(connection, pairs: Iterable[Tuple[str, str]]):
+    """
+    Fold newly inserted (concept, model) pairs into the counters.
+    
+    Runs on the inserting connection, so the counters commit or roll back
+    together with the analyses. ORM inserts are recorded automatically by
+    the after_insert hook below; Core bulk inserts must call this directly.
+    """
+    concepts = Counter()
+    models = Counter()
+    total = 0
+    for concept, model in pairs:
+        concepts[concept] += 1
+        models[model] += 1
+        total += 1
+    if not total:
+        return
+    
+    concept_table = ConceptStat.__table__
+    model_table = ModelStat.__table__
+    
+    new_concepts = 0
+    for concept, count in concepts.items():
+        new_concepts += _insert_ignore(connection, concept_table, {'concept': concept, 'count': 0})
+        connection.execute(update(concept_table).where(concept_table.c.concept == concept)
+                           .values(count=concept_table.c.count + count))
+    
+    new_models = 0
+    for model, count in models.items():
+        new_models += _insert_ignore(connection, model_table, {'model': model, 'count': 0})
+        connection.execute(update(model_table).where(model_table.c.model == model)
+                           .values(count=model_table.c.count + count))
+    
+    stats_table = PlatformStats.__table__
+    connection.execute(update(stats_table).where(stats_table.c.id == STATS_ROW_ID).values(
+        total_analyses=stats_table.c.total_analyses + total,
+        total_concepts=stats_table.c.total_concepts + new_concepts,
+        total_models=stats_table.c.total_models + new_models
+    ))
+
+
+@event.listens_for(PSLRAnalysis, 'after_insert')
+def _after_analysis_insert(mapper, connection, target):
+    record_inserts(connection, [(target.concept, target.model)])
+
+
+def reconcile(interval: Optional[float] = None) -> bool:
+    """
+    Recompute every counter from the analysis table.
+    
+    With ``interval`` the run is skipped (returns False) unless the last
+    reconciliation is older than that many seconds; the check-and-claim is
+    a single UPDATE, so only one worker wins each period.
+    """
+    connection = db.session.connection()
+    stats_table = PlatformStats.__table__
+    now = datetime.utcnow()
+    
+    _insert_ignore(connection, stats_table, {
+        'id': STATS_ROW_ID, 'total_analyses': 0, 'total_concepts': 0, 'total_models': 0
+    })
+    if interval is not None:
+        claimed = connection.execute(
+            update(stats_table).where(stats_table.c.id == STATS_ROW_ID).where(
+                (stats_table.c.reconciled_at.is_(None)) |
+                (stats_table.c.reconciled_at < now - timedelta(seconds=interval))
+            ).values(reconciled_at=now)
+        ).rowcount
+        if not claimed:
+            db.session.commit()
+            return False
+    
+    for stat_model, column in ((ConceptStat, PSLRAnalysis.concept), (ModelStat, PSLRAnalysis.model)):
+        table = stat_model.__table__
+        connection.execute(delete(table))
+        connection.execute(insert(table).from_select(
+            [table.c[column.key], table.c.count],
+            select(column, func.count()).group_by(column)
+        ))
+    
+    connection.execute(update(stats_table).where(stats_table.c.id == STATS_ROW_ID).values(
+        total_analyses=select(func.coalesce(func.sum(ConceptStat.count), 0)).scalar_subquery(),
+        total_concepts=select(func.count()).select_from(ConceptStat.__table__).scalar_subquery(),
+        total_models=select(func.count()).select_from(ModelStat.__table__).scalar_subquery(),
+        reconciled_at=now
+    ))
+    db.session.commit()
+    return True
+
+
+def get_stats() -> Dict[str, int]:
+    """O(1) read of the counters (reconciling first on an empty database)"""
+    stats = db.session.get(PlatformStats, STATS_ROW_ID)
+    if stats is None:
+        reconcile()
+        stats = db.session.get(PlatformStats, STATS_ROW_ID)
+    return stats.to_dict()
+
+
+class StatsReconciler:
+    """Background thread that periodically reconciles the counters"""
+    
+    def __init__(self, app, interval: float):
+        self.app = app
+        self.interval = interval
+        self._thread = threading.Thread(target=self._loop, name='pslr-stats-reconcile', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self.app.app_context():
+                try:
+                    reconcile(interval=self.interval)
+                except Exception:
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Tests for /api/analytics parameter bounds"""
+
+import pytest
+
+from models import db, PSLRAnalysis
+
+
+@pytest.fixture(scope='module')
+def analyses(app):
+    with app.app_context():
+        for i in range(3):
+            for model, p in (('analytics-a', 0.1 * i), ('analytics-b', 0.5)):
+                db.session.add(PSLRAnalysis.from_result({
+                    'concept': f'analytics {i}', 'language': 'en', 'model': model, 'model_name': model,
+                    'result': {'P': p, 'S': 0.5, 'L': 0.5, 'R': 0.5, 'reasoning': 'r'}, 'response_time': 10
+                }))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('top, expected', [('-1', 1), ('0', 1), ('2', 2), ('1000000', 3)])
+def test_top_is_clamped(client, analyses, top, expected):
+    response = client.get(f'/api/analytics?model=analytics-a,analytics-b&top={top}')
+    assert response.status_code == 200
+    assert len(response.get_json()['concepts']['top_spread']) == expected
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Tests for /api/batch request validation and listing"""
+
+import pytest
+
+from models import db, BatchExperiment
+
+
+@pytest.mark.parametrize('body', [
+    ['not', 'an', 'object'],
+    {'concepts': 'Love', 'api_keys': {'gpt-4o': 'key'}},
+    {'concepts': ['Love', 1], 'api_keys': {'gpt-4o': 'key'}},
+    {'concepts': ['Love'], 'models': 'gpt-4o', 'api_keys': {'gpt-4o': 'key'}},
+    {'concepts': ['Love'], 'models': [['gpt-4o']], 'api_keys': {'gpt-4o': 'key'}},
+    {'concepts': ['Love'], 'api_keys': ['key']},
+    {'concepts': ['Love'], 'api_keys': {'gpt-4o': {'key': 'key'}}},
+])
+def test_malformed_batch_is_rejected(client, body):
+    response = client.post('/api/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('limit, expected', [('-1', 1), ('0', 1), ('2', 2), ('1000000', 100)])
+def test_list_limit_is_clamped(client, app, limit, expected):
+    with app.app_context():
+        missing = 101 - BatchExperiment.query.count()
+        db.session.add_all([BatchExperiment(name=f'listed {i}') for i in range(max(missing, 0))])
+        db.session.commit()
+    response = client.get(f'/api/batch?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.get_json()) == expected
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Tests for the analysis result cache"""
+
+from cache import AnalysisCache
+
+
+def test_prompt_version_is_part_of_the_key():
+    old = AnalysisCache(version=1)
+    new = AnalysisCache(version=2)
+    new.local = old.local  # same storage, as with a shared Redis tier across a deploy
+    old.set('Love', 'en', 'gpt-4o', {'success': True, 'P': 0.5})
+    assert old.get(' Love ', 'en', 'gpt-4o') == {'success': True, 'P': 0.5}
+    assert new.get('Love', 'en', 'gpt-4o') is None
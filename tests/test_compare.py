@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for /api/analyze/compare request validation"""
+
+import pytest
+
+
+@pytest.mark.parametrize('timeout', ['soon', -1, 0, None, True, [5], 'nan'])
+def test_invalid_timeout_is_rejected(client, timeout):
+    response = client.post('/api/analyze/compare', json={
+        'concept': 'love', 'models': ['gpt-4o'], 'api_keys': {'gpt-4o': 'k'}, 'timeout': timeout
+    })
+    assert response.status_code == 400
+    assert 'timeout' in response.get_json()['error']
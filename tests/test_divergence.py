@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Tests for /api/divergence parameter bounds and its ranking cache"""
+
+import pytest
+
+from models import db, PSLRAnalysis
+
+
+@pytest.fixture(scope='module')
+def analyses(app):
+    with app.app_context():
+        for i in range(5):
+            for model, p in (('gpt-4o', 0.1 * i), ('claude', 0.5)):
+                db.session.add(PSLRAnalysis.from_result({
+                    'concept': f'divergence {i}', 'language': 'en', 'model': model, 'model_name': model,
+                    'result': {'P': p, 'S': 0.5, 'L': 0.5, 'R': 0.5, 'reasoning': 'r'}, 'response_time': 10
+                }))
+        db.session.commit()
+
+
+def test_top_and_min_models_are_clamped(client, app, analyses):
+    ranking = client.get('/api/divergence?top=-1&min_models=-5').get_json()['ranking']
+    assert len(ranking['top']) == 1
+    assert ranking == client.get('/api/divergence?top=0&min_models=2').get_json()['ranking']
+
+    ranking = client.get(f"/api/divergence?top={10 ** 9}").get_json()['ranking']
+    assert len(ranking['top']) == min(ranking['concepts'], app.config['DIVERGENCE_MAX_TOP'])
+
+
+def test_ranking_cache_does_not_grow_per_request(client, analyses):
+    import app as app_module
+    client.get('/api/divergence')
+    cached = len(app_module.divergence_tracker._cache)
+    for top in range(1, 30):
+        client.get(f'/api/divergence?top={top}&min_models={top + 100}')
+        client.get(f'/api/divergence?model_a=gpt-4o&model_b=unknown-{top}')
+    assert len(app_module.divergence_tracker._cache) <= cached + 2
+
+
+def test_pair_ranking_is_sorted_and_sliced(client, analyses):
+    full = client.get('/api/divergence?model_a=gpt-4o&model_b=claude&top=100').get_json()['ranking']['top']
+    scores = [item['divergence'] for item in full]
+    assert scores == sorted(scores, reverse=True)
+    top = client.get('/api/divergence?model_a=gpt-4o&model_b=claude&top=2').get_json()['ranking']['top']
+    assert top == full[:2]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Tests for /api/history limits and keyset pagination"""
+
+from datetime import datetime
+
+import pytest
+
+from models import db, PSLRAnalysis
+
+
+@pytest.fixture(scope='module')
+def analyses(app):
+    with app.app_context():
+        for i in range(3):
+            db.session.add(PSLRAnalysis.from_result({
+                'concept': f'history {i}', 'language': 'en', 'model': 'history', 'model_name': 'History',
+                'result': {'P': 0.5, 'S': 0.5, 'L': 0.5, 'R': 0.5, 'reasoning': 'r'}, 'response_time': 10
+            }))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('limit', ['0', '-1', '-100'])
+def test_non_positive_limit_returns_one_item(client, analyses, limit):
+    response = client.get(f'/api/history?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
+
+
+def test_limit_is_capped(client, app, analyses):
+    # Other test modules share the database, so only this module's rows are counted
+    response = client.get(f"/api/history?model=history&limit={app.config['HISTORY_MAX_LIMIT'] + 1}")
+    assert response.status_code == 200
+    assert len(response.get_json()) == 3
+
+
+def test_keyset_pages_cover_every_row_once(client, app):
+    with app.app_context():
+        created_at = datetime(2026, 1, 1)
+        for i in range(5):
+            analysis = PSLRAnalysis.from_result({
+                'concept': f'page {i}', 'language': 'en', 'model': 'keyset', 'model_name': 'Keyset',
+                'result': {'P': 0.5, 'S': 0.5, 'L': 0.5, 'R': 0.5, 'reasoning': 'r'}, 'response_time': 10
+            })
+            analysis.created_at = created_at  # ties are broken by id
+            db.session.add(analysis)
+        db.session.commit()
+
+    ids, url = [], '/api/history?model=keyset&limit=2&compact=1'
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids.extend(item['id'] for item in response.get_json())
+        url = response.headers.get('Link', '').partition('<')[2].partition('>')[0]
+    assert len(ids) == 5
+    assert ids == sorted(ids, reverse=True)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for the COPY input written by ingest.BulkWriter"""
+
+from datetime import datetime
+
+import blobs
+from ingest import copy_buffer
+
+
+def read_copy_csv(text):
+    """Decode CSV COPY input the way PostgreSQL does: an unquoted empty field is NULL"""
+    rows = []
+    for line in text.splitlines():
+        fields, i = [], 0
+        while True:
+            if line[i:i + 1] == '"':
+                value, i = '', i + 1
+                while True:
+                    end = line.index('"', i)
+                    value += line[i:end]
+                    if line[end + 1:end + 2] == '"':
+                        value += '"'
+                        i = end + 2
+                    else:
+                        i = end + 1
+                        break
+            else:
+                end = line.find(',', i)
+                end = len(line) if end == -1 else end
+                value = line[i:end] or None
+                i = end
+            fields.append(value)
+            if i >= len(line):
+                break
+            i += 1  # the comma
+        rows.append(fields)
+    return rows
+
+
+def test_none_columns_round_trip_as_null():
+    columns = ['concept', 'response_time', 'extra_data', 'reasoning', 'created_at', 'p_value']
+    rows = [
+        {'concept': 'love', 'response_time': None, 'extra_data': None, 'reasoning': None,
+         'created_at': datetime(2024, 1, 2, 3, 4, 5), 'p_value': 0.5},
+        {'concept': 'say "hi", twice', 'response_time': 120, 'extra_data': {'usage': {'input_tokens': 3}},
+         'reasoning': blobs.compress('why'), 'created_at': datetime(2024, 1, 2), 'p_value': 1.25},
+        {'concept': '', 'response_time': 0, 'extra_data': [], 'reasoning': b'',
+         'created_at': datetime(2024, 1, 3), 'p_value': 0.0},
+    ]
+
+    decoded = read_copy_csv(copy_buffer(columns, rows).getvalue())
+
+    assert decoded[0] == ['love', None, None, None, '2024-01-02T03:04:05', '0.5']
+    assert decoded[1][:3] == ['say "hi", twice', '120', '{"usage": {"input_tokens": 3}}']
+    assert decoded[1][3] == '\\x' + blobs.compress('why').hex()
+    # Empty values stay empty values, not NULL
+    assert decoded[2][:4] == ['', '0', '[]', '\\x']
+
+
+def test_every_field_of_a_null_row_is_bare():
+    buffer = copy_buffer(['a', 'b', 'c'], [{'a': None, 'b': None, 'c': None}])
+    assert buffer.getvalue() == ',,\n'
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Tests for async analysis jobs and their event stream"""
+
+import pytest
+
+from jobs import JobQueue
+from models import db, PSLRAnalysis, AnalysisJob
+
+
+class FakeAnalyzer:
+    def analyze(self, concept, language, model, api_key, use_cache=True):
+        return {'success': True, 'cached': False, 'concept': concept, 'language': language, 'model': model,
+                'model_name': 'GPT-4o', 'response_time': 10,
+                'result': {'P': 0.4, 'S': 0.3, 'L': 0.2, 'R': 0.1, 'reasoning': 'r'}}
+
+
+@pytest.fixture
+def job(app):
+    with app.app_context():
+        job = AnalysisJob(id='f' * 32, concept='job events', language='en', model='gpt-4o', status='completed',
+                          result={'success': True})
+        db.session.merge(job)
+        db.session.commit()
+    return 'f' * 32
+
+
+def test_events_need_threaded_workers(client, job):
+    response = client.get(f'/api/jobs/{job}/events')
+    assert response.status_code == 501
+    assert response.get_json()['status_url'] == f'/api/jobs/{job}'
+
+
+def test_events_stream_on_threaded_workers(client, job):
+    response = client.get(f'/api/jobs/{job}/events', environ_overrides={'wsgi.multithread': True})
+    assert response.status_code == 200
+    assert b'event: result' in response.data
+
+
+def test_job_result_is_written_through_the_ingest_writer(app):
+    import app as app_module
+    queue = JobQueue(app, FakeAnalyzer(), app_module.ingest_writer, max_workers=1)
+    with app.app_context():
+        job_id = queue.submit('job writer', 'en', 'gpt-4o', 'key').id
+        queue.executor.shutdown(wait=True)
+
+        db.session.expire_all()
+        job = db.session.get(AnalysisJob, job_id)
+        assert job.status == 'completed'
+        assert job.analysis_id is not None
+        assert job.result['id'] == job.analysis_id
+        assert db.session.get(PSLRAnalysis, job.analysis_id).concept == 'job writer'
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Tests for the additive-increase / multiplicative-decrease packing size"""
+
+from packing import PackingTuner
+
+
+def test_clean_calls_grow_the_size_by_one_up_to_the_cap():
+    tuner = PackingTuner(initial=4, max_size=6, tokens_per_concept=10)
+    for expected in (5, 6, 6):
+        tuner.record('m', requested=tuner.size('m'), parsed=tuner.size('m'), output_tokens=10 * tuner.size('m'))
+        assert tuner.size('m') == expected
+
+
+def test_lossy_calls_halve_relative_to_their_own_size():
+    tuner = PackingTuner(initial=16, tokens_per_concept=10)
+    # Two packs of 16 failing concurrently halve the size once, not twice
+    tuner.record('m', requested=16, parsed=8, output_tokens=80)
+    tuner.record('m', requested=16, parsed=8, output_tokens=80)
+    assert tuner.size('m') == 8
+    tuner.record('m', requested=8, parsed=0, output_tokens=0)
+    tuner.record('m', requested=4, parsed=0, output_tokens=0)
+    tuner.record('m', requested=2, parsed=0, output_tokens=0)
+    tuner.record('m', requested=1, parsed=0, output_tokens=0)
+    assert tuner.size('m') == 1
+
+
+def test_size_is_capped_by_the_output_budget():
+    tuner = PackingTuner(initial=20, max_output_tokens=1000, headroom=1.0, tokens_per_concept=100, smoothing=1.0)
+    assert tuner.size('m') == 10
+    tuner.record('m', requested=10, parsed=10, output_tokens=2000)  # 200 tokens per concept
+    assert tuner.size('m') == 5
+    assert tuner.max_tokens('m', 5) == 1000
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Tests for the token buckets and in-flight limits of the provider governor"""
+
+import threading
+import time
+
+from ratelimit import MemoryBackend, ProviderGovernor
+
+
+def test_bucket_starts_full_and_charges_debt():
+    backend = MemoryBackend()
+    assert backend.reserve('k', rate=1.0, capacity=2.0, amount=1) == 0.0
+    assert backend.reserve('k', rate=1.0, capacity=2.0, amount=1) == 0.0
+    # Overdrawn by one token at one token per second
+    assert 0.9 < backend.reserve('k', rate=1.0, capacity=2.0, amount=1) <= 1.0
+
+
+def test_bucket_refills_up_to_capacity():
+    backend = MemoryBackend()
+    assert backend.try_reserve('k', rate=100.0, capacity=2.0, amount=2)
+    assert not backend.try_reserve('k', rate=100.0, capacity=2.0, amount=2)
+    time.sleep(0.05)
+    assert backend.try_reserve('k', rate=100.0, capacity=2.0, amount=2)
+    time.sleep(0.05)
+    assert not backend.try_reserve('k', rate=100.0, capacity=2.0, amount=3)
+
+
+def test_requests_over_rpm_wait_for_their_turn():
+    governor = ProviderGovernor({'fake': {'rpm': 600}}, burst=0.1)  # 10/s, one request of burst
+    started = time.monotonic()
+    for _ in range(3):
+        with governor.slot('fake'):
+            pass
+    assert time.monotonic() - started >= 0.15
+
+
+def test_concurrency_limit_blocks_until_release():
+    governor = ProviderGovernor({'fake': {'concurrency': 1}}, poll_interval=0.01)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with governor.slot('fake'):
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    entered.wait()
+    assert governor.try_slot('fake') is None
+    release.set()
+    thread.join()
+    slot = governor.try_slot('fake')
+    assert slot is not None
+    slot.release()
+    assert governor.stats()['providers']['fake']['in_flight'] == 0
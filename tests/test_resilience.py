@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Tests for resilience.ProviderGuard hedging and stream deadlines"""
+
+import threading
+import time
+
+import pytest
+
+from ratelimit import ProviderGovernor
+from resilience import ProviderGuard, ProviderTimeout
+
+
+def warmed_guard(**kwargs):
+    """A guard whose hedge delay is known (20 fast successful calls recorded)"""
+    guard = ProviderGuard(hedge_min_delay=0.05, hedge_budget=1.0, **kwargs)
+    for _ in range(20):
+        guard.call('m', lambda: 'ok')
+    return guard
+
+
+def test_hedge_is_skipped_without_a_governor_slot():
+    governor = ProviderGovernor(default={'concurrency': 1})
+    guard = warmed_guard()
+    duplicates = []
+
+    def hedge():
+        slot = governor.try_slot('m')
+        if slot is None:
+            return None
+        duplicates.append(slot)
+        return lambda: 'duplicate'
+
+    with governor.slot('m'):  # the primary holds the only slot
+        assert guard.call('m', lambda: time.sleep(0.3) or 'primary', hedge=hedge) == 'primary'
+
+    stats = guard.stats()['m']
+    assert duplicates == []
+    assert stats['hedged'] == 0 and stats['hedge_skipped'] == 1
+
+
+def test_hedge_runs_in_its_own_slot():
+    governor = ProviderGovernor(default={'concurrency': 2})
+    guard = warmed_guard()
+    in_flight = []
+
+    def hedge():
+        slot = governor.try_slot('m')
+        if slot is None:
+            return None
+
+        def run():
+            try:
+                in_flight.append(governor.local.in_flight('pslr:rl:m:inflight'))
+                return 'duplicate'
+            finally:
+                slot.release()
+        return run
+
+    with governor.slot('m'):
+        assert guard.call('m', lambda: time.sleep(0.3) or 'primary', hedge=hedge) == 'duplicate'
+    assert in_flight == [2]
+    assert governor.local.in_flight('pslr:rl:m:inflight') == 0
+    assert guard.stats()['m']['hedge_wins'] == 1
+
+
+def test_try_slot_does_not_borrow_tokens():
+    governor = ProviderGovernor(default={'tpm': 600}, burst=1.0)  # 10 tokens/s, bucket of 10
+    slot = governor.try_slot('m', prompt_tokens=8)
+    assert slot is not None
+    assert governor.try_slot('m', prompt_tokens=8) is None
+    slot.release()
+
+
+def test_stream_deadline_is_enforced():
+    guard = ProviderGuard(deadline=0.2)
+    release = threading.Event()
+
+    def tokens():
+        yield 'a'
+        release.wait(2)  # a stalled provider
+        yield 'b'
+
+    received = []
+    started = time.monotonic()
+    with pytest.raises(ProviderTimeout):
+        for token in guard.stream('m', tokens):
+            received.append(token)
+    release.set()
+
+    assert received == ['a']
+    assert time.monotonic() - started < 1.0
+    assert guard.stats()['m']['timeouts'] == 1
+
+
+def test_stream_records_errors():
+    guard = ProviderGuard()
+
+    def tokens():
+        yield 'a'
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        list(guard.stream('m', tokens))
+    assert guard.stats()['m']['errors'] == 1
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for response_parser"""
+
+import time
+
+import pytest
+
+from response_parser import extract_pslr, extract_pslr_list, iter_json_values, strip_trailing_commas
+
+VALID = '{"P": 0.5, "S": 0.5, "L": 0.5, "R": 0.5, "reasoning": "x"}'
+
+
+def test_trailing_commas_are_stripped_outside_strings():
+    assert strip_trailing_commas('{"a": [1, 2, ], "b": "x,]",\n}') == '{"a": [1, 2 ], "b": "x,]"\n}'
+
+
+def test_valid_elements_of_a_malformed_array_are_kept():
+    text = '{"results": [{"P": 0.5, "S": 0.5, "L": 0.5, "R": 0.5,}, {"P": oops}, {"P": 1, "S": 0, "L": 1, "R": 0}]'
+    assert [item['P'] for item in extract_pslr_list(text)] == [0.5, 1]
+
+
+def test_values_nested_in_invalid_blocks_are_found():
+    text = 'noise { bad [{"P": 1, "S": 1,}, {"P": 2}] x } and {"R": 3,}'
+    assert list(iter_json_values(text)) == [[{'P': 1, 'S': 1}, {'P': 2}], {'R': 3}]
+
+
+@pytest.mark.parametrize('build', [
+    lambda n: '{ a ' * n + '} ' * n + VALID,
+    lambda n: '{"a": ' * n + 'x' + '}' * n + VALID,
+    lambda n: '[{"a": 1,},' * n + ']' * n + VALID,
+], ids=['prose', 'deep', 'commas'])
+def test_nested_invalid_braces_stay_linear(build):
+    def timed(n):
+        started = time.perf_counter()
+        assert extract_pslr(build(n))['P'] == 0.5
+        return time.perf_counter() - started
+
+    timed(500)  # warm up
+    small, large = timed(2000), timed(8000)
+    # 4x the input: linear is ~4x the time, the old quadratic retry was ~16x
+    assert large < max(small * 8, 0.05)
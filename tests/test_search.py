@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Tests for concept search on SQLite builds without the FTS5 trigram tokenizer"""
+
+from flask import Flask
+
+import search
+from models import db, ConceptStat
+
+
+def test_missing_trigram_tokenizer_falls_back_to_like(monkeypatch, tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'old.db')
+    db.init_app(app)
+    # What SQLite < 3.34 reports for tokenize='trigram'
+    monkeypatch.setattr(search, 'SQLITE_FTS_DDL', [
+        f"CREATE VIRTUAL TABLE {search.FTS_TABLE} USING fts5(concept, tokenize='no_such_tokenizer')"
+    ])
+    with app.app_context():
+        db.create_all()
+        search.ensure_search_index()
+        assert search._fts_available[str(db.engine.url)] is False
+
+        db.session.add_all([ConceptStat(concept='Freedom', count=2), ConceptStat(concept='Love', count=1)])
+        db.session.commit()
+        assert [row['concept'] for row in search.search_concepts('eedo')] == ['Freedom']
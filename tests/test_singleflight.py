@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Regression tests for singleflight.SingleFlight"""
+
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def test_successful_result_is_shared():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = {'n': 0}
+
+    def leader():
+        calls['n'] += 1
+        started.set()
+        time.sleep(0.3)
+        return {'success': True, 'P': 0.5}
+
+    def follower():
+        calls['n'] += 1
+        return {'success': True, 'P': 0.9}
+
+    results = [None, None]
+    t1 = threading.Thread(target=lambda: results.__setitem__(0, flight.do('k', leader)))
+    t1.start()
+    started.wait(2)
+    t2 = threading.Thread(target=lambda: results.__setitem__(1, flight.do('k', follower)))
+    t2.start()
+    t1.join(5)
+    t2.join(5)
+
+    assert calls['n'] == 1
+    assert results[0] == ({'success': True, 'P': 0.5}, False)
+    assert results[1] == ({'success': True, 'P': 0.5}, True)
+
+
+def test_failed_result_is_not_shared():
+    flight = SingleFlight()
+    started = threading.Event()
+    share = lambda result: result['success']
+
+    def leader():
+        started.set()
+        time.sleep(0.3)
+        return {'success': False, 'error': 'Invalid API key'}
+
+    results = [None, None]
+    t1 = threading.Thread(target=lambda: results.__setitem__(0, flight.do('k', leader, share=share)))
+    t1.start()
+    started.wait(2)
+    t2 = threading.Thread(target=lambda: results.__setitem__(
+        1, flight.do('k', lambda: {'success': True, 'P': 0.5}, share=share)))
+    t2.start()
+    t1.join(5)
+    t2.join(5)
+
+    assert results[0] == ({'success': False, 'error': 'Invalid API key'}, False)
+    # The follower made its own call with its own key
+    assert results[1] == ({'success': True, 'P': 0.5}, False)
+    assert flight.stats()['leader_failures'] == 1
+
+
+def test_leader_exception_is_not_shared():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def leader():
+        started.set()
+        time.sleep(0.3)
+        raise RuntimeError('provider down')
+
+    def run_leader():
+        try:
+            flight.do('k', leader)
+        except RuntimeError as e:
+            errors.append(e)
+
+    results = []
+    t1 = threading.Thread(target=run_leader)
+    t1.start()
+    started.wait(2)
+    t2 = threading.Thread(target=lambda: results.append(flight.do('k', lambda: 'own')))
+    t2.start()
+    t1.join(5)
+    t2.join(5)
+
+    assert len(errors) == 1
+    assert results == [('own', False)]
+    assert flight.stats()['in_flight'] == 0
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Tests for token usage and text extraction of streamed provider responses"""
+
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from llm_clients import DeepSeekClient, XAIClient, _google_text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from fake_provider import FakeProviderServer  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def provider():
+    server = FakeProviderServer(('127.0.0.1', 0), latency_ms=5, distribution='fixed')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/v1'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('client_class', [DeepSeekClient, XAIClient])
+def test_openai_compatible_streams_report_usage(monkeypatch, provider, client_class):
+    monkeypatch.setattr(client_class, 'BASE_URL', provider)
+    client = client_class('key')
+    text = ''.join(client.stream('system', 'Analyze the concept "Love"'))
+    assert text
+    assert client.usage['input_tokens'] > 0
+    assert client.usage['output_tokens'] > 0
+
+
+def part(text):
+    return SimpleNamespace(text=text)
+
+
+def test_gemini_chunks_without_parts_yield_no_text():
+    content = SimpleNamespace(parts=[part('{"P": '), part('0.5')])
+    assert _google_text(SimpleNamespace(candidates=[SimpleNamespace(content=content)])) == '{"P": 0.5'
+    # The final finish-reason chunk and safety-blocked chunks have no parts
+    assert _google_text(SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[]))])) == ''
+    assert _google_text(SimpleNamespace(candidates=[])) == ''